@@ -0,0 +1,94 @@
+import itertools
+import threading
+from datetime import datetime
+
+import pytest
+
+from video_generation.base import (
+    BaseVideoGenerator, TaskStatus, VideoProvider, VideoTaskResponse, VideoTaskStatus,
+    task_cancel, task_query, task_submission
+)
+from video_generation.poller import TaskPoller
+
+
+class FakeGenerator(BaseVideoGenerator):
+    """
+    按脚本返回状态的生成器，不访问网络
+
+    scripts 为任务ID到状态序列的映射，每次查询取下一个状态，最后一个状态保持不变；
+    提示词以 "fail" 开头的提交抛出 RuntimeError；提示词按提交顺序记录在 submitted 中，
+    设置 gate 后提交会先等待它被 set()。
+    """
+
+    supports_cancel = True
+
+    def __init__(self, provider=VideoProvider.LUMA, scripts=None, listed=None, bulk=False):
+        self._provider = provider
+        super().__init__("key")
+        self.status_cache = None
+        self.eta_estimator = None
+        self.poller = TaskPoller(interval=0.01)
+        self.supports_bulk_status = bulk
+        self.scripts = {task_id: list(states) for task_id, states in (scripts or {}).items()}
+        self.listed = listed or {}  # 列表接口能返回的任务及其状态
+        self.queries = []
+        self.list_calls = []
+        self.cancelled = []
+        self.submitted = []
+        self.gate = None
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def _get_provider(self):
+        return self._provider
+
+    def status(self, task_id, state):
+        now = datetime.now()
+        return VideoTaskStatus(task_id, self.provider, state, 1.0 if state == TaskStatus.COMPLETED else 0.0,
+                               now, now, video_url=f"https://cdn.example.com/{task_id}.mp4")
+
+    def _next_state(self, task_id):
+        with self._lock:
+            self.queries.append(task_id)
+            states = self.scripts.get(task_id) or [TaskStatus.PROCESSING]
+            return states.pop(0) if len(states) > 1 else states[0]
+
+    def _respond(self, request):
+        with self._lock:
+            self.submitted.append(request.prompt)
+        if self.gate is not None:
+            self.gate.wait()
+        if (request.prompt or "").startswith("fail"):
+            raise RuntimeError(request.prompt)
+        return VideoTaskResponse(f"t{next(self._ids)}", self.provider, TaskStatus.PENDING, datetime.now())
+
+    @task_submission
+    def text_to_video(self, request):
+        return self._respond(request)
+
+    @task_submission
+    def image_to_video(self, request):
+        return self._respond(request)
+
+    @task_submission
+    def subject_reference(self, request):
+        return self._respond(request)
+
+    @task_query
+    def get_task_status(self, task_id):
+        return self.status(task_id, self._next_state(task_id))
+
+    @task_cancel
+    def cancel_task(self, task_id):
+        with self._lock:
+            self.cancelled.append(task_id)
+        return True
+
+    def _list_task_statuses(self, task_ids):
+        self.list_calls.append(list(task_ids))
+        return {task_id: self.status(task_id, self.listed[task_id]) for task_id in task_ids if task_id in self.listed}
+
+
+@pytest.fixture
+def fake_generator():
+    return FakeGenerator
@@ -0,0 +1,106 @@
+import asyncio
+
+import pytest
+
+from video_generation.base import TaskStatus, TextToVideoRequest, VideoProvider, VideoTaskResponse
+from video_generation.batch import TaskHandle, as_completed, submit_many
+from video_generation.deadline import Deadline
+from video_generation.errors import DeadlineExceeded, SubmissionError
+
+PROCESSING, COMPLETED, FAILED = TaskStatus.PROCESSING, TaskStatus.COMPLETED, TaskStatus.FAILED
+
+
+def test_submit_many_keeps_order_with_partial_failures(fake_generator):
+    luma = fake_generator()
+    vidu = fake_generator(provider=VideoProvider.VIDU)
+    prompts = ["a", "fail b", "c", "fail d", "e"]
+    jobs = [(luma if i % 2 else vidu, TextToVideoRequest(prompt)) for i, prompt in enumerate(prompts)]
+    results = submit_many(jobs, max_concurrency=3)
+
+    assert len(results) == len(prompts)
+    for i, (result, prompt) in enumerate(zip(results, prompts)):
+        if prompt.startswith("fail"):
+            assert isinstance(result, SubmissionError)
+            assert (result.index, result.request.prompt, str(result.cause)) == (i, prompt, prompt)
+        else:
+            assert isinstance(result, VideoTaskResponse)
+            assert result.provider == jobs[i][0].provider
+    # 失败的提交不占用运行额度
+    assert (luma.key_pool.backlog()[0], vidu.key_pool.backlog()[0]) == (0, 3)
+
+
+def test_submit_many_expired_deadline_fails_every_request(fake_generator):
+    generator = fake_generator()
+    results = submit_many([(generator, TextToVideoRequest("a"))] * 3, deadline=Deadline(0))
+    assert all(isinstance(result, SubmissionError) and isinstance(result.cause, DeadlineExceeded)
+               for result in results)
+    assert generator.key_pool.backlog()[0] == 0
+
+
+def test_submit_many_empty():
+    assert submit_many([]) == []
+
+
+def handles(generator, *task_ids):
+    return [TaskHandle(generator, task_id) for task_id in task_ids]
+
+
+def test_as_completed_yields_in_completion_order(fake_generator):
+    generator = fake_generator(scripts={"slow": [PROCESSING] * 5 + [COMPLETED], "fast": [FAILED]})
+    items = list(as_completed(handles(generator, "slow", "fast"), timeout=2))
+    assert [(item.handle.task_id, item.status.status) for item in items] == [("fast", FAILED), ("slow", COMPLETED)]
+    assert generator.poller.watching() == 0
+
+
+def test_as_completed_break_cancels_pending(fake_generator):
+    generator = fake_generator(scripts={"slow": [PROCESSING], "fast": [COMPLETED]})
+    for item in as_completed(handles(generator, "slow", "fast"), timeout=2, cancel_pending=True):
+        assert item.handle.task_id == "fast"
+        break
+    assert generator.cancelled == ["slow"]
+    assert generator.poller.watching() == 0
+
+
+def test_as_completed_timeout_cancels_pending(fake_generator):
+    generator = fake_generator(scripts={"a": [PROCESSING], "b": [PROCESSING]})
+    with pytest.raises(DeadlineExceeded):
+        list(as_completed(handles(generator, "a", "b"), timeout=0.1, cancel_pending=True))
+    assert sorted(generator.cancelled) == ["a", "b"]
+
+
+def test_async_as_completed_break_cancels_pending(fake_generator):
+    generator = fake_generator(scripts={"slow": [PROCESSING], "fast": [COMPLETED]})
+
+    async def first():
+        stream = as_completed(handles(generator, "slow", "fast"), timeout=2, cancel_pending=True)
+        iterator = stream.__aiter__()
+        try:
+            async for item in iterator:
+                return item.handle.task_id
+        finally:
+            await iterator.aclose()
+
+    assert asyncio.run(first()) == "fast"
+    assert generator.cancelled == ["slow"]
+    assert generator.poller.watching() == 0
+
+
+def test_async_as_completed_cancelled_while_waiting(fake_generator):
+    generator = fake_generator(scripts={"a": [PROCESSING], "b": [PROCESSING]})
+
+    async def consume():
+        stream = as_completed(handles(generator, "a", "b"), cancel_pending=True)
+        iterator = stream.__aiter__()
+        try:
+            async for _ in iterator:
+                pass
+        finally:
+            await iterator.aclose()
+
+    async def main():
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(consume(), 0.2)
+
+    asyncio.run(main())
+    assert sorted(generator.cancelled) == ["a", "b"]
+    assert generator.poller.watching() == 0
@@ -0,0 +1,54 @@
+import requests
+
+from video_generation.base import TaskStatus, TextToVideoRequest
+from video_generation.keypool import ApiKeyPool
+
+PROCESSING, COMPLETED = TaskStatus.PROCESSING, TaskStatus.COMPLETED
+
+
+def test_listed_tasks_are_not_polled_individually(fake_generator):
+    generator = fake_generator(bulk=True, listed={"t1": PROCESSING, "t3": PROCESSING},
+                               scripts={"t2": [COMPLETED]})
+    statuses = generator.get_task_statuses(["t1", "t2", "t3", "t1"])
+    assert list(statuses) == ["t1", "t2", "t3"]
+    assert [statuses[task_id].status for task_id in statuses] == [PROCESSING, COMPLETED, PROCESSING]
+    assert generator.list_calls == [["t1", "t2", "t3"]]
+    assert generator.queries == ["t2"]
+
+
+def test_list_failure_falls_back_to_single_polls(fake_generator, monkeypatch):
+    generator = fake_generator(bulk=True, listed={"t1": PROCESSING})
+
+    def broken(task_ids):
+        raise requests.ConnectionError("list endpoint down")
+
+    monkeypatch.setattr(generator, "_list_task_statuses", broken)
+    statuses = generator.get_task_statuses(["t1", "t2"])
+    assert set(statuses) == {"t1", "t2"}
+    assert sorted(generator.queries) == ["t1", "t2"]
+
+
+def test_failed_single_polls_are_left_out(fake_generator, monkeypatch):
+    generator = fake_generator()
+    original = generator.get_task_status
+
+    def flaky(task_id, deadline=None):
+        if task_id == "bad":
+            raise requests.HTTPError("500")
+        return original(task_id, deadline=deadline)
+
+    monkeypatch.setattr(generator, "get_task_status", flaky)
+    assert list(generator.get_task_statuses(["ok", "bad"])) == ["ok"]
+    assert generator.list_calls == []
+
+
+def test_list_requests_are_grouped_by_submitting_key(fake_generator):
+    generator = fake_generator(bulk=True)
+    generator.key_pool = ApiKeyPool(["a", "b"])
+    task_ids = [generator.text_to_video(TextToVideoRequest("x")).task_id for _ in range(4)]
+    generator.listed = {task_id: PROCESSING for task_id in task_ids}
+    assert set(generator.get_task_statuses(task_ids)) == set(task_ids)
+    assert len(generator.list_calls) == 2
+    for ids in generator.list_calls:
+        assert len({generator.key_pool.key_for(task_id) for task_id in ids}) == 1
+    assert generator.queries == []
@@ -0,0 +1,56 @@
+import pytest
+
+from video_generation.base import TaskStatus
+from video_generation.callback import CallbackServer
+from video_generation.history import TaskHistory
+from video_generation.providers.luma import LumaVideoGenerator
+
+
+def completed(task_id):
+    return {"id": task_id, "state": "completed", "assets": {"video": f"https://cdn.example.com/{task_id}.mp4"}}
+
+
+def test_wildcard_host_requires_public_url():
+    with pytest.raises(ValueError):
+        CallbackServer(port=0).start()
+    with pytest.raises(RuntimeError):
+        CallbackServer(port=0).callback_url(LumaVideoGenerator("key"))
+
+
+def test_callback_url_uses_bound_port_or_public_url():
+    generator = LumaVideoGenerator("key")
+    server = CallbackServer(host="127.0.0.1", port=0)
+    with pytest.raises(RuntimeError):
+        server.callback_url(generator)
+    with server:
+        assert server.callback_url(generator) == f"http://127.0.0.1:{server.port}/callbacks/luma"
+    public = CallbackServer(public_url="https://worker-1.example.com/", token="secret")
+    assert public.callback_url(generator) == "https://worker-1.example.com/callbacks/luma?token=secret"
+
+
+def test_failing_listener_does_not_fail_delivery():
+    generator = LumaVideoGenerator("key")
+    server = CallbackServer(public_url="https://worker-1.example.com", fallback_interval=None)
+    server.register(generator)
+    received = []
+
+    def broken(status):
+        raise RuntimeError("boom")
+
+    server.add_listener(broken)
+    server.add_listener(received.append)
+    status = server.handle("luma", completed("t1"))
+    assert status.status == TaskStatus.COMPLETED
+    assert [item.task_id for item in received] == ["t1"]
+    assert server.result(generator, "t1") is status
+
+
+def test_callbacks_are_not_counted_as_polls():
+    generator = LumaVideoGenerator("key")
+    generator.task_history = TaskHistory()
+    generator.task_history.submitted("luma", "t1", "ray-2", "720p", 5)
+    server = CallbackServer(public_url="https://worker-1.example.com", fallback_interval=None)
+    server.register(generator)
+    server.handle("luma", {"id": "t1", "state": "dreaming"})
+    server.handle("luma", completed("t1"))
+    assert generator.task_history.group_by_provider()["luma"]["avg_polls"] == 0
@@ -0,0 +1,126 @@
+import time
+from datetime import datetime
+
+import pytest
+
+from video_generation.base import TaskStatus, VideoProvider, VideoTaskStatus
+from video_generation.coordination import Coordinator, SqliteCoordinationBackend
+from video_generation.providers.luma import LumaVideoGenerator
+
+LUMA = VideoProvider.LUMA.value
+
+
+class FakePoller:
+    """记录订阅，由测试手动推送状态，不发起查询"""
+
+    def __init__(self):
+        self.listeners = {}
+
+    def subscribe(self, generator, task_id, listener):
+        self.listeners[task_id] = listener
+
+        def unsubscribe():
+            self.listeners.pop(task_id, None)
+        return unsubscribe
+
+    def push(self, task_id, status):
+        now = datetime.now()
+        self.listeners[task_id](VideoTaskStatus(task_id, VideoProvider.LUMA, status, 1.0, now, now))
+
+
+@pytest.fixture
+def db(tmp_path):
+    return str(tmp_path / "coordination.db")
+
+
+def make_node(db, node_id, lease_ttl=30.0, max_tasks=1000):
+    poller = FakePoller()
+    coordinator = Coordinator(SqliteCoordinationBackend(db), [LumaVideoGenerator("key")], node_id=node_id,
+                              lease_ttl=lease_ttl, max_tasks=max_tasks, poller=poller)
+    return coordinator, poller
+
+
+def test_tracked_task_is_owned_by_submitting_node(db):
+    a, a_poller = make_node(db, "a")
+    b, b_poller = make_node(db, "b")
+    a.track(a.generators[LUMA], "t1")
+    b.sync()
+    assert a.owned() == {(LUMA, "t1")}
+    assert b.owned() == set()
+    assert set(a_poller.listeners) == {"t1"}
+    assert b_poller.listeners == {}
+
+
+def test_unowned_tasks_are_claimed_once(db):
+    backend = SqliteCoordinationBackend(db)
+    for i in range(4):
+        backend.add(LUMA, f"t{i}", "gone", ttl=-1)
+    a, _ = make_node(db, "a", max_tasks=3)
+    b, _ = make_node(db, "b")
+    a.sync()
+    b.sync()
+    assert len(a.owned()) == 3
+    assert len(b.owned()) == 1
+    assert not a.owned() & b.owned()
+
+
+def test_renew_keeps_lease(db):
+    a, _ = make_node(db, "a", lease_ttl=0.3)
+    b, _ = make_node(db, "b", lease_ttl=0.3)
+    a.track(a.generators[LUMA], "t1")
+    for _ in range(3):
+        time.sleep(0.15)
+        a.sync()
+        b.sync()
+    assert a.owned() == {(LUMA, "t1")}
+    assert b.owned() == set()
+
+
+def test_expired_lease_is_taken_over(db):
+    a, _ = make_node(db, "a", lease_ttl=0.2)
+    b, b_poller = make_node(db, "b", lease_ttl=30.0)
+    a.track(a.generators[LUMA], "t1")
+    time.sleep(0.3)
+    b.sync()
+    assert b.owned() == {(LUMA, "t1")}
+    assert set(b_poller.listeners) == {"t1"}
+
+
+def test_stale_owner_is_rejected(db):
+    a, a_poller = make_node(db, "a", lease_ttl=0.2)
+    b, _ = make_node(db, "b", lease_ttl=30.0)
+    a.track(a.generators[LUMA], "t1")
+    time.sleep(0.3)
+    b.sync()
+
+    # 原节点恢复后续约失败，停止轮询，迟到的完成也不会删除接管节点的任务
+    a.sync()
+    assert a.owned() == set()
+    assert a_poller.listeners == {}
+    a.backend.complete(LUMA, "t1", "a")
+    assert a.backend.count() == 1
+    assert b.owned() == {(LUMA, "t1")}
+
+
+def test_complete_removes_task_and_notifies(db):
+    a, a_poller = make_node(db, "a")
+    finished = []
+    a.add_listener(finished.append)
+    a.track(a.generators[LUMA], "t1")
+
+    a_poller.push("t1", TaskStatus.PROCESSING)
+    assert a.backend.count() == 1 and finished == []
+
+    a_poller.push("t1", TaskStatus.COMPLETED)
+    assert a.backend.count() == 0
+    assert [status.task_id for status in finished] == ["t1"]
+    assert a.owned() == set()
+
+
+def test_stop_releases_leases_for_immediate_takeover(db):
+    a, _ = make_node(db, "a")
+    b, _ = make_node(db, "b")
+    a.track(a.generators[LUMA], "t1")
+    a.stop()
+    b.sync()
+    assert b.owned() == {(LUMA, "t1")}
@@ -0,0 +1,111 @@
+import threading
+import time
+
+import pytest
+
+from video_generation.base import TextToVideoRequest, VideoProvider
+from video_generation.deadline import Deadline
+from video_generation.errors import DeadlineExceeded
+from video_generation.jobqueue import JobQueue, Priority
+from video_generation.keypool import ApiKeyPool
+
+
+def wait_until(predicate, timeout=2.0):
+    end = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < end, "等待超时"
+        time.sleep(0.005)
+
+
+def occupy(queue, generator):
+    """用一个卡在 gate 上的请求占满唯一的工作线程"""
+    generator.gate = threading.Event()
+    future = queue.submit(generator, TextToVideoRequest("blocker"), tenant="blocker")
+    wait_until(lambda: generator.submitted == ["blocker"])
+    return future
+
+
+def test_higher_priority_is_submitted_first(fake_generator):
+    generator = fake_generator()
+    with JobQueue(workers=1) as queue:
+        occupy(queue, generator)
+        futures = [queue.submit(generator, TextToVideoRequest(name), priority=priority)
+                   for name, priority in (("batch", Priority.BATCH), ("normal", Priority.NORMAL),
+                                          ("interactive", Priority.INTERACTIVE))]
+        generator.gate.set()
+        for future in futures:
+            future.result(timeout=2)
+    assert generator.submitted == ["blocker", "interactive", "normal", "batch"]
+
+
+def test_tenants_share_by_weight(fake_generator):
+    generator = fake_generator()
+    with JobQueue(workers=1, weights={"web": 3}) as queue:
+        occupy(queue, generator)
+        futures = [queue.submit(generator, TextToVideoRequest("backfill"), tenant="backfill") for _ in range(8)]
+        futures += [queue.submit(generator, TextToVideoRequest("web"), tenant="web") for _ in range(4)]
+        generator.gate.set()
+        for future in futures:
+            future.result(timeout=2)
+    order = generator.submitted[1:]
+    # 权重为 3 的租户每轮提交 3 个，后到的租户不会排在整批回填之后
+    assert order[:4].count("web") == 3
+    assert order[:8].count("web") == 4
+
+
+def test_queued_job_expires_while_workers_are_busy(fake_generator):
+    generator = fake_generator()
+    queue = JobQueue(workers=1)
+    try:
+        occupy(queue, generator)
+        started = time.monotonic()
+        future = queue.submit(generator, TextToVideoRequest("late"), deadline=Deadline(0.1))
+        assert isinstance(future.exception(timeout=2), DeadlineExceeded)
+        assert time.monotonic() - started < 1
+        assert generator.submitted == ["blocker"]
+    finally:
+        generator.gate.set()
+        queue.stop()
+
+
+def test_cancelled_job_is_not_submitted(fake_generator):
+    generator = fake_generator()
+    with JobQueue(workers=1) as queue:
+        occupy(queue, generator)
+        future = queue.submit(generator, TextToVideoRequest("cancelled"))
+        assert future.cancel()
+        generator.gate.set()
+    assert generator.submitted == ["blocker"]
+    assert queue.pending() == 0
+
+
+def test_full_generator_does_not_block_others(fake_generator):
+    busy = fake_generator()
+    busy.key_pool = ApiKeyPool(["key"], max_running=1)
+    idle = fake_generator(provider=VideoProvider.VIDU)
+    queue = JobQueue(workers=2, capacity_check_interval=0.01)
+    try:
+        queue.submit(busy, TextToVideoRequest("first")).result(timeout=2)
+        waiting = queue.submit(busy, TextToVideoRequest("second"))
+        assert queue.submit(idle, TextToVideoRequest("other")).result(timeout=2).provider == VideoProvider.VIDU
+        assert not waiting.done()
+        # 第一个任务结束释放额度后，等待中的请求随即提交
+        busy.key_pool.forget("t1")
+        waiting.result(timeout=2)
+    finally:
+        queue.stop()
+    assert busy.submitted == ["first", "second"]
+
+
+def test_stopped_queue_rejects_and_cancels(fake_generator):
+    generator = fake_generator()
+    queue = JobQueue(workers=1)
+    occupy(queue, generator)
+    pending = queue.submit(generator, TextToVideoRequest("pending"))
+    # stop() 等待进行中的提交结束，稍后再放行占位的请求
+    threading.Timer(0.05, generator.gate.set).start()
+    queue.stop(cancel_pending=True)
+    assert pending.cancelled()
+    assert generator.submitted == ["blocker"]
+    with pytest.raises(RuntimeError):
+        queue.submit(generator, TextToVideoRequest("after"))
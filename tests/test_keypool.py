@@ -0,0 +1,260 @@
+import threading
+import time
+
+import pytest
+
+from video_generation.deadline import Deadline, deadline_scope
+from video_generation.errors import DeadlineExceeded
+from video_generation.keypool import ApiKey, ApiKeyPool, current_key
+
+
+def test_lease_prefers_least_loaded_key():
+    pool = ApiKeyPool(["a", "b"])
+    with pool.lease() as first:
+        with pool.lease() as second:
+            assert {first.key, second.key} == {"a", "b"}
+            assert current_key() is second
+        assert current_key() is first
+    assert current_key() is None
+
+
+def test_concurrent_leases_respect_max_concurrency():
+    pool = ApiKeyPool([ApiKey("a", max_concurrency=2), ApiKey("b", max_concurrency=1)])
+    active = {"a": 0, "b": 0}
+    peak = {"a": 0, "b": 0}
+    lock = threading.Lock()
+
+    def work():
+        with pool.lease() as key:
+            with lock:
+                active[key.key] += 1
+                peak[key.key] = max(peak[key.key], active[key.key])
+            time.sleep(0.02)
+            with lock:
+                active[key.key] -= 1
+
+    threads = [threading.Thread(target=work) for _ in range(12)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert peak["a"] <= 2 and peak["b"] <= 1
+    assert all(key.in_flight == 0 for key in pool.keys)
+
+
+def test_lease_waits_for_release_within_deadline():
+    pool = ApiKeyPool([ApiKey("a", max_concurrency=1)])
+    held = threading.Event()
+    release = threading.Event()
+
+    def hold():
+        with pool.lease():
+            held.set()
+            release.wait()
+
+    thread = threading.Thread(target=hold)
+    thread.start()
+    held.wait()
+    with deadline_scope(Deadline(0.1)):
+        with pytest.raises(DeadlineExceeded):
+            with pool.lease():
+                pass
+    threading.Timer(0.05, release.set).start()
+    with deadline_scope(Deadline(2.0)):
+        with pool.lease() as key:
+            assert key.key == "a"
+    thread.join()
+
+
+@pytest.mark.parametrize("status_code", [401, 403])
+def test_auth_failure_cools_key_down(status_code):
+    pool = ApiKeyPool(["a", "b"], auth_cooldown=60)
+    a = pool.keys[0]
+    pool.report(a, status_code)
+    assert a.failures == 1
+    for _ in range(4):
+        with pool.lease() as key:
+            assert key.key == "b"
+
+
+def test_quota_cooldown_uses_retry_after():
+    pool = ApiKeyPool(["a"], quota_cooldown=60)
+    key = pool.keys[0]
+    pool.report(key, 429, retry_after=0.1)
+    with deadline_scope(Deadline(0.05)):
+        with pytest.raises(DeadlineExceeded):
+            with pool.lease():
+                pass
+    started = time.monotonic()
+    with deadline_scope(Deadline(2.0)):
+        with pool.lease():
+            pass
+    assert time.monotonic() - started < 1.0
+
+
+def test_success_resets_failures():
+    pool = ApiKeyPool(["a"])
+    key = pool.keys[0]
+    pool.report(key, 500)
+    pool.report(key, 429, retry_after=0.0)
+    assert key.failures == 1
+    pool.report(key, 200)
+    assert key.failures == 0
+
+
+def test_rate_limit_refills_tokens():
+    pool = ApiKeyPool([ApiKey("a", rate=20)])
+    started = time.monotonic()
+    with deadline_scope(Deadline(5.0)):
+        for _ in range(25):
+            with pool.lease():
+                pass
+    # 令牌桶容量 20，其余 5 次按每秒 20 个补充
+    assert time.monotonic() - started >= 0.2
+
+
+def test_bound_task_uses_pinned_key_even_in_cooldown():
+    pool = ApiKeyPool(["a", "b"])
+    b = pool.keys[1]
+    pool.bind("task-1", b)
+    pool.report(b, 401)
+    assert pool.key_for("task-1") == "b"
+    with pool.lease("task-1") as key:
+        assert key is b
+    with pool.lease() as key:
+        assert key.key == "a"
+
+    pool.forget("task-1")
+    assert pool.key_for("task-1") is None
+
+
+def test_bindings_are_bounded():
+    pool = ApiKeyPool(["a", "b"], max_bindings=2)
+    for i in range(3):
+        pool.bind(f"t{i}", pool.keys[0])
+    assert pool.key_for("t0") is None
+    assert pool.key_for("t2") == "a"
+
+
+def test_slots_are_held_until_forget():
+    pool = ApiKeyPool(["a"], max_running=1)
+    with pool.lease(slot=True) as key:
+        pass
+    pool.bind("t1", key, slot=True)
+    assert pool.backlog() == (1, 1, 0)
+    assert not pool.has_capacity()
+    with deadline_scope(Deadline(0.05)):
+        with pytest.raises(DeadlineExceeded):
+            with pool.lease(slot=True):
+                pass
+    assert pool.backlog() == (1, 1, 0)
+
+    pool.forget("t1")
+    assert pool.backlog() == (0, 1, 0)
+    pool.forget("t1")
+    assert pool.backlog() == (0, 1, 0)
+
+
+def test_failed_submit_returns_slot():
+    pool = ApiKeyPool(["a"], max_running=1)
+    with pytest.raises(RuntimeError):
+        with pool.lease(slot=True):
+            raise RuntimeError("submit failed")
+    assert pool.backlog() == (0, 1, 0)
+
+
+def test_unbound_slot_is_reclaimed_after_timeout():
+    pool = ApiKeyPool(["a"], max_running=1, slot_timeout=0.1)
+    with pool.lease(slot=True):
+        pass
+    # 租约正常结束但没有 bind（例如提交后构造响应失败）
+    assert pool.backlog() == (1, 1, 0)
+    with deadline_scope(Deadline(2.0)):
+        with pool.lease(slot=True) as key:
+            pass
+    pool.bind("t2", key, slot=True)
+    assert pool.backlog() == (1, 1, 0)
+    pool.forget("t2")
+    assert pool.backlog() == (0, 1, 0)
+
+
+def test_bound_slot_expires_after_timeout():
+    pool = ApiKeyPool(["a"], max_running=1, slot_timeout=0.1)
+    with pool.lease(slot=True) as key:
+        pass
+    pool.bind("t1", key, slot=True)
+    with deadline_scope(Deadline(2.0)):
+        with pool.lease(slot=True) as key:
+            pass
+    pool.bind("t2", key, slot=True)
+    pool.forget("t1")
+    assert pool.backlog() == (1, 1, 0)
+
+
+def test_queued_submissions_are_served_in_order():
+    pool = ApiKeyPool(["a"], max_running=1)
+    with pool.lease(slot=True) as key:
+        pass
+    pool.bind("t0", key, slot=True)
+
+    order = []
+
+    def submit(i):
+        with deadline_scope(Deadline(5.0)):
+            with pool.lease(slot=True) as key:
+                order.append(i)
+        pool.bind(f"t{i}", key, slot=True)
+
+    threads = []
+    for i in range(1, 4):
+        thread = threading.Thread(target=submit, args=(i,))
+        thread.start()
+        threads.append(thread)
+        while pool.backlog()[2] < i:
+            time.sleep(0.005)
+    assert pool.backlog() == (1, 1, 3)
+    assert not pool.has_capacity()
+
+    for i in range(3):
+        pool.forget(f"t{i}")
+        while len(order) < i + 1:
+            time.sleep(0.005)
+    for thread in threads:
+        thread.join()
+    assert order == [1, 2, 3]
+    assert pool.backlog() == (1, 1, 0)
+
+
+def test_backlog_capacity_per_key():
+    assert ApiKeyPool(["a", "b"]).backlog() == (0, None, 0)
+    assert ApiKeyPool([ApiKey("a", max_running=2), "b"], max_running=3).backlog() == (0, 5, 0)
+    assert ApiKeyPool([ApiKey("a", max_running=2), "b"]).backlog() == (0, None, 0)
+
+
+def test_terminal_status_from_callback_or_cache_releases_slot():
+    from datetime import datetime
+
+    import requests
+
+    from video_generation.base import TaskStatus, TextToVideoRequest, VideoProvider, VideoTaskStatus
+    from video_generation.providers.luma import LumaVideoGenerator
+    from video_generation.statuscache import MemoryStatusCache
+
+    class Transport:
+        def request(self, method, url, headers=None, timeout=None, **kwargs):
+            response = requests.Response()
+            response.status_code = 201
+            response._content = b'{"id": "t1", "state": "queued"}'
+            return response
+
+    generator = LumaVideoGenerator(ApiKeyPool(["a"], max_running=1))
+    generator.transport = Transport()
+    generator.status_cache = MemoryStatusCache()
+    generator.eta_estimator = None
+    generator.submit(TextToVideoRequest(prompt="cat"))
+    assert generator.key_pool.backlog() == (1, 1, 0)
+
+    now = datetime.now()
+    generator.status_cache.put(VideoTaskStatus("t1", VideoProvider.LUMA, TaskStatus.COMPLETED, 1.0, now, now))
+    assert generator.get_task_status("t1").status == TaskStatus.COMPLETED
+    assert generator.key_pool.backlog() == (0, 1, 0)
@@ -0,0 +1,116 @@
+import struct
+
+import pytest
+
+from video_generation import mp4
+from video_generation.base import TextToVideoRequest
+from video_generation.errors import InvalidVideoError
+
+
+def box(kind, *children):
+    payload = b"".join(children)
+    return struct.pack(">I4s", 8 + len(payload), kind) + payload
+
+
+def mvhd(timescale=1000, duration=5000, version=0):
+    if version == 1:
+        return box(b"mvhd", struct.pack(">I", 1 << 24), bytes(16), struct.pack(">IQ", timescale, duration), bytes(80))
+    return box(b"mvhd", bytes(12), struct.pack(">II", timescale, duration), bytes(80))
+
+
+def tkhd(width=1280, height=720):
+    return box(b"tkhd", bytes(76), struct.pack(">II", width << 16, height << 16))
+
+
+def mdhd(timescale=12800, duration=64000):
+    return box(b"mdhd", bytes(12), struct.pack(">II", timescale, duration), bytes(4))
+
+
+def avc1(width=1280, height=720):
+    return box(b"avc1", bytes(24), struct.pack(">HH", width, height), bytes(50))
+
+
+def trak(header=None, entry=None, fps=25, seconds=5):
+    stsd = box(b"stsd", bytes(4), struct.pack(">I", 1), entry if entry is not None else avc1())
+    stts = box(b"stts", bytes(4), struct.pack(">III", 1, fps * seconds, 12800 // fps))
+    return box(
+        b"trak",
+        header if header is not None else tkhd(),
+        box(b"mdia", mdhd(), box(b"hdlr", bytes(8), b"vide", bytes(12)),
+            box(b"minf", box(b"stbl", stsd, stts))),
+    )
+
+
+def mp4_file(moov_children=None, faststart=True, media=b"\0" * 1024):
+    ftyp = box(b"ftyp", b"isom", bytes(4), b"isomavc1")
+    moov = box(b"moov", *(moov_children if moov_children is not None else (mvhd(), trak())))
+    mdat = box(b"mdat", media)
+    return ftyp + moov + mdat if faststart else ftyp + mdat + moov
+
+
+@pytest.mark.parametrize("faststart", [True, False])
+def test_parse_reads_duration_size_fps_and_codec(faststart):
+    metadata = mp4.parse(mp4_file(faststart=faststart))
+    assert (metadata.duration, metadata.width, metadata.height, metadata.fps, metadata.codec) == (
+        5.0, 1280, 720, 25.0, "avc1")
+
+
+def test_parse_reads_v1_mvhd():
+    metadata = mp4.parse(mp4_file([mvhd(timescale=600, duration=3000, version=1), trak()]))
+    assert metadata.duration == 5.0
+
+
+def test_faststart_file_parses_before_media_is_downloaded():
+    data = mp4_file(media=b"\0" * 4096)
+    partial = data[:len(data) - 2048]
+    assert mp4.parse(partial).width == 1280
+
+
+def test_moov_at_end_of_partial_file_is_rejected():
+    data = mp4_file(faststart=False)
+    with pytest.raises(InvalidVideoError):
+        mp4.parse(data[:len(data) - 16])
+
+
+def test_size_falls_back_to_sample_description():
+    metadata = mp4.parse(mp4_file([mvhd(), trak(header=tkhd(0, 0), entry=avc1(640, 480))]))
+    assert (metadata.width, metadata.height) == (640, 480)
+
+
+@pytest.mark.parametrize("children", [
+    [box(b"mvhd", bytes(8)), trak()],
+    [box(b"mvhd", struct.pack(">I", 1 << 24), bytes(12)), trak()],
+    [mvhd(), trak(header=box(b"tkhd", bytes(16)))],
+    [mvhd(version=1), trak(header=tkhd(0, 0), entry=box(b"avc1", bytes(10)))],
+    [mvhd(), box(b"trak", tkhd(), box(b"mdia", box(b"mdhd", bytes(4)), box(b"hdlr", bytes(8), b"vide"),
+                                       box(b"minf", box(b"stbl", box(b"stts", bytes(4))))))],
+])
+def test_truncated_boxes_raise_invalid_video(children):
+    with pytest.raises(InvalidVideoError):
+        mp4.parse(mp4_file(children))
+
+
+def test_short_box_does_not_read_into_sibling():
+    moov = [box(b"mvhd", bytes(12)), box(b"free", struct.pack(">II", 1, 0xFFFFFFFF)), trak()]
+    with pytest.raises(InvalidVideoError):
+        mp4.parse(mp4_file(moov))
+
+
+def test_implausible_values_are_rejected():
+    with pytest.raises(InvalidVideoError):
+        mp4.parse(mp4_file([mvhd(timescale=1, duration=10 ** 9), trak()]))
+    with pytest.raises(InvalidVideoError):
+        mp4.parse(mp4_file([mvhd(), trak(header=tkhd(29803, 720))]))
+
+
+def test_probe_rejects_empty_file(tmp_path):
+    path = tmp_path / "empty.mp4"
+    path.write_bytes(b"")
+    with pytest.raises(InvalidVideoError):
+        mp4.probe(str(path))
+
+
+def test_verify_prefers_aspect_ratio():
+    metadata = mp4.parse(mp4_file())
+    assert mp4.verify(metadata, TextToVideoRequest("", duration=5, fps=25, aspect_ratio="16:9")) == []
+    assert mp4.verify(metadata, TextToVideoRequest("", duration=5, fps=25, aspect_ratio="1:1")) != []
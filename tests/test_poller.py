@@ -0,0 +1,103 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from video_generation.base import TaskStatus
+from video_generation.deadline import Deadline
+from video_generation.errors import DeadlineExceeded
+from video_generation.poller import TaskPoller
+
+PENDING, PROCESSING, COMPLETED, FAILED = (TaskStatus.PENDING, TaskStatus.PROCESSING,
+                                          TaskStatus.COMPLETED, TaskStatus.FAILED)
+
+
+def wait_until(predicate, timeout=2.0):
+    end = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < end, "等待超时"
+        time.sleep(0.005)
+
+
+def test_watch_yields_changes_and_stops_at_terminal(fake_generator):
+    generator = fake_generator(scripts={"t1": [PENDING, PROCESSING, PROCESSING, COMPLETED]})
+    states = [status.status for status in generator.watch("t1", deadline=Deadline(2))]
+    assert states == [PENDING, PROCESSING, COMPLETED]
+    assert generator.poller.watching() == 0
+
+
+def test_async_watch(fake_generator):
+    generator = fake_generator(scripts={"t1": [PROCESSING, FAILED]})
+
+    async def collect():
+        return [status.status async for status in generator.watch("t1", deadline=Deadline(2))]
+
+    assert asyncio.run(collect()) == [PROCESSING, FAILED]
+
+
+def test_watch_deadline(fake_generator):
+    generator = fake_generator(scripts={"t1": [PROCESSING]})
+    with pytest.raises(DeadlineExceeded):
+        for _ in generator.watch("t1", deadline=Deadline(0.1)):
+            pass
+    assert generator.poller.watching() == 0
+
+
+def test_terminal_state_is_delivered_once_to_every_listener(fake_generator):
+    generator = fake_generator(scripts={"t1": [PROCESSING, COMPLETED]})
+    completed, failed, seen = [], [], []
+    generator.on_complete("t1", completed.append)
+    generator.on_failed("t1", failed.append)
+    generator.poller.subscribe(generator, "t1", seen.append)
+    wait_until(lambda: completed)
+    time.sleep(0.05)
+    assert len(completed) == 1 and failed == []
+    assert [status.status for status in seen] == [PROCESSING, COMPLETED]
+    # 终态之后不再查询，所有观察者共享同一次查询结果
+    assert generator.queries.count("t1") == 2
+
+
+def test_late_subscriber_gets_last_status_immediately(fake_generator):
+    generator = fake_generator(scripts={"t1": [PROCESSING]})
+    first = []
+    generator.poller.subscribe(generator, "t1", first.append)
+    wait_until(lambda: first)
+    late = []
+    unsubscribe = generator.poller.subscribe(generator, "t1", late.append)
+    assert [status.status for status in late] == [PROCESSING]
+    unsubscribe()
+
+
+def test_failing_listener_does_not_block_others(fake_generator):
+    generator = fake_generator(scripts={"t1": [COMPLETED]})
+    received = []
+
+    def broken(status):
+        raise RuntimeError("boom")
+
+    generator.poller.subscribe(generator, "t1", broken)
+    generator.poller.subscribe(generator, "t1", received.append)
+    wait_until(lambda: received)
+    assert received[0].status == COMPLETED
+
+
+def test_published_status_completes_watchers_without_polling(fake_generator):
+    generator = fake_generator(scripts={"t1": [PROCESSING]})
+    generator.poller = TaskPoller(interval=60)
+    generator.poller.set_interval(generator.provider.value, 60)
+    done = threading.Event()
+    received = []
+
+    def listener(status):
+        received.append(status)
+        if status.status.is_terminal:
+            done.set()
+
+    generator.poller.subscribe(generator, "t1", listener)
+    wait_until(lambda: received)
+    generator.poller.publish(generator.status("t1", COMPLETED))
+    generator.poller.publish(generator.status("t1", COMPLETED))
+    assert done.wait(1)
+    assert [status.status for status in received] == [PROCESSING, COMPLETED]
+    assert generator.queries == ["t1"]
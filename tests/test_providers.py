@@ -0,0 +1,280 @@
+from datetime import datetime
+
+import pytest
+import requests
+
+from video_generation import codec
+from video_generation.base import ImageToVideoRequest, SubjectReferenceRequest, TaskStatus, TextToVideoRequest
+from video_generation.providers.luma import LumaVideoGenerator
+from video_generation.providers.runway import RunwayVideoGenerator
+from video_generation.providers.siliconflow import SiliconFlowVideoGenerator
+from video_generation.providers.stability import StabilityVideoGenerator
+from video_generation.providers.tongyi import TongyiVideoGenerator
+from video_generation.providers.vidu import ViduVideoGenerator
+from video_generation.providers.zhipu import ZhipuVideoGenerator
+
+
+def response(status_code=200, body=None, content=None):
+    resp = requests.Response()
+    resp.status_code = status_code
+    resp._content = content if content is not None else codec.encode(body if body is not None else {})
+    return resp
+
+
+class FakeTransport:
+    """按 (方法, 地址) 返回预设响应，记录所有请求，不访问网络"""
+
+    def __init__(self, routes):
+        self.routes = routes
+        self.calls = []
+
+    def request(self, method, url, headers=None, timeout=None, **kwargs):
+        self.calls.append((method, url, headers, kwargs))
+        route = self.routes[(method, url)]
+        return route(kwargs) if callable(route) else route
+
+
+def make(generator_class, routes, **kwargs):
+    generator = generator_class("key", **kwargs)
+    generator.transport = FakeTransport(routes)
+    generator.status_cache = None
+    return generator
+
+
+def sent_json(generator, index=-1):
+    return codec.decode(generator.transport.calls[index][3]["data"])
+
+
+def test_stability_reads_preprocessed_data_url_without_fetching():
+    generator = make(StabilityVideoGenerator, {
+        ("POST", "https://api.stability.ai/v2beta/image-to-video"): response(body={"id": "s1"}),
+    })
+    task = generator.image_to_video(ImageToVideoRequest("data:image/png;base64,iVBORw0KGgo="))
+    assert task.task_id == "s1"
+    [(_, _, _, kwargs)] = generator.transport.calls
+    assert kwargs["files"]["image"][1] == b"\x89PNG\r\n\x1a\n"
+
+
+def test_stability_image_host_errors_do_not_penalize_api_key():
+    image_url = "https://images.example.com/cat.png"
+    generator = make(StabilityVideoGenerator, {("GET", image_url): response(429, content=b"")})
+    with pytest.raises(requests.HTTPError):
+        generator.image_to_video(ImageToVideoRequest(image_url))
+    [key] = generator.key_pool.keys
+    assert (key.failures, key.disabled_until, key.running) == (0, 0.0, 0)
+    assert all(entry.url != image_url for entry in generator.flight_recorder.snapshot("stability"))
+
+
+def test_stability_status_codes():
+    base = "https://api.stability.ai/v2beta/image-to-video/result/"
+    generator = make(StabilityVideoGenerator, {
+        ("GET", base + "a"): response(202, {"status": "in-progress"}),
+        ("GET", base + "b"): response(200, content=b"\0\0\0\x18ftyp"),
+        ("GET", base + "c"): response(400, {"errors": ["bad image"]}),
+    })
+    assert generator.get_task_status("a").status == TaskStatus.PROCESSING
+    done = generator.get_task_status("b")
+    assert (done.status, done.video_url) == (TaskStatus.COMPLETED, base + "b")
+    failed = generator.get_task_status("c")
+    assert (failed.status, failed.error_message) == (TaskStatus.FAILED, "bad image")
+
+
+def test_stability_accepts_default_preprocessor_output(tmp_path):
+    pytest.importorskip("PIL")
+    from PIL import Image
+
+    from video_generation.preprocess import ImagePreprocessor
+
+    path = tmp_path / "input.png"
+    Image.new("RGB", (2048, 1152), "red").save(path)
+    generator = make(StabilityVideoGenerator, {
+        ("POST", "https://api.stability.ai/v2beta/image-to-video"): response(body={"id": "s1"}),
+    })
+    generator.preprocessor = ImagePreprocessor(max_workers=1)
+    try:
+        generator.image_to_video(ImageToVideoRequest(str(path)))
+    finally:
+        generator.preprocessor.close()
+    [(_, _, _, kwargs)] = generator.transport.calls
+    assert kwargs["files"]["image"][1].startswith(b"\xff\xd8")
+
+
+LUMA = "https://api.lumalabs.ai/dream-machine/v1"
+
+
+def test_luma_payloads_and_status():
+    generator = make(LumaVideoGenerator, {
+        ("POST", LUMA + "/generations"): response(body={"id": "g1", "state": "queued",
+                                                        "created_at": "2024-05-01T10:00:00"}),
+        ("GET", LUMA + "/generations/g1"): response(body={"id": "g1", "state": "completed",
+                                                          "assets": {"video": "https://cdn/g1.mp4"},
+                                                          "created_at": "2024-05-01T10:00:00"}),
+        ("GET", LUMA + "/generations/g2"): response(body={"id": "g2", "state": "failed",
+                                                          "failure_reason": "nsfw"}),
+    })
+    task = generator.text_to_video(TextToVideoRequest("a cat", duration=5))
+    assert (task.task_id, task.create_time, task.message) == ("g1", datetime(2024, 5, 1, 10), "queued")
+    assert sent_json(generator) == {"prompt": "a cat", "model": "ray-2", "resolution": "720p", "duration": "5s",
+                                    "aspect_ratio": "16:9", "loop": False}
+    headers = generator.transport.calls[-1][2]
+    assert headers == {"Authorization": "Bearer key", "Content-Type": "application/json",
+                       "Accept": "application/json"}
+
+    generator.subject_reference(SubjectReferenceRequest("https://img/ref.png", "dance", aspect_ratio="9:16"))
+    assert sent_json(generator) == {"prompt": "dance", "model": "ray-2", "aspect_ratio": "9:16", "loop": False,
+                                    "keyframes": {"frame0": {"type": "image", "url": "https://img/ref.png"}}}
+
+    done = generator.get_task_status("g1")
+    assert (done.status, done.progress, done.video_url, done.create_time) == (
+        TaskStatus.COMPLETED, 1.0, "https://cdn/g1.mp4", datetime(2024, 5, 1, 10))
+    failed = generator.get_task_status("g2")
+    assert (failed.status, failed.error_message) == (TaskStatus.FAILED, "nsfw")
+
+
+RUNWAY = "https://api.dev.runwayml.com/v1"
+
+
+def test_runway_payloads_and_status():
+    generator = make(RunwayVideoGenerator, {
+        ("POST", RUNWAY + "/image_to_video"): response(body={"id": "r1", "status": "PENDING"}),
+        ("GET", RUNWAY + "/tasks/r1"): response(body={"status": "SUCCEEDED", "output": ["https://cdn/r1.mp4"]}),
+        ("GET", RUNWAY + "/tasks/r2"): response(body={"status": "CANCELLED"}),
+    })
+    task = generator.image_to_video(ImageToVideoRequest("https://img/cat.png", duration=10))
+    assert (task.task_id, task.status, task.message) == ("r1", TaskStatus.PENDING, "PENDING")
+    assert sent_json(generator) == {"model": "gen4_turbo", "promptImage": "https://img/cat.png",
+                                    "ratio": "1280:720", "duration": 10}
+    assert generator.transport.calls[-1][2]["X-Runway-Version"] == "2024-11-06"
+
+    done = generator.get_task_status("r1")
+    assert (done.status, done.video_url) == (TaskStatus.COMPLETED, "https://cdn/r1.mp4")
+    assert generator.get_task_status("r2").status == TaskStatus.FAILED
+
+
+VIDU = "https://api.vidu.cn"
+
+
+def test_vidu_payloads_status_and_callback():
+    generator = make(ViduVideoGenerator, {
+        ("POST", VIDU + "/ent/v2/text2video"): response(body={"task_id": "v1", "state": "created"}),
+        ("POST", VIDU + "/vidu/ent/v2/img2video"): response(body={"task_id": "v2", "state": "created"}),
+        ("GET", VIDU + "/ent/v2/tasks/v1/creations"): response(body={
+            "state": "success", "creations": [{"url": "https://cdn/v1.mp4", "cover_url": "https://cdn/v1.jpg"}]}),
+    })
+    generator.text_to_video(TextToVideoRequest("a cat", seed=7, callback_url="https://cb/vidu"))
+    assert sent_json(generator) == {"model": "viduq1", "style": "general", "prompt": "a cat", "duration": "4",
+                                    "seed": "7", "aspect_ratio": "16:9", "resolution": "1080p",
+                                    "movement_amplitude": "auto", "callback_url": "https://cb/vidu"}
+    assert generator.transport.calls[-1][2]["Authorization"] == "Token key"
+
+    task = generator.image_to_video(ImageToVideoRequest("https://img/cat.png", prompt="run"))
+    assert task.task_id == "v2"
+    assert sent_json(generator) == {"model": "viduq1", "images": ["https://img/cat.png"], "prompt": "run",
+                                    "duration": "4", "seed": "0", "resolution": "720p",
+                                    "movement_amplitude": 1.0}
+
+    done = generator.get_task_status("v1")
+    assert (done.status, done.video_url, done.thumbnail_url) == (
+        TaskStatus.COMPLETED, "https://cdn/v1.mp4", "https://cdn/v1.jpg")
+    pushed = generator.parse_callback({"id": "v3", "state": "failed", "err_code": "AuditSubmitIllegal"})
+    assert (pushed.task_id, pushed.status, pushed.error_message) == ("v3", TaskStatus.FAILED, "AuditSubmitIllegal")
+
+
+SILICONFLOW = "https://api.ap.siliconflow.com/v1"
+
+
+def test_siliconflow_payloads_and_status():
+    def status(kwargs):
+        task_id = codec.decode(kwargs["data"])["requestId"]
+        return response(body={
+            "s1": {"status": "Succeed", "results": {"videos": [{"url": "https://cdn/s1.mp4"}]}},
+            "s2": {"status": "Processing", "reason": "queued"},
+            "s3": {"status": "Failed", "reason": "nsfw"},
+        }[task_id])
+
+    generator = make(SiliconFlowVideoGenerator, {
+        ("POST", SILICONFLOW + "/video/submit"): response(body={"requestId": "s1"}),
+        ("POST", SILICONFLOW + "/video/status"): status,
+    })
+    task = generator.text_to_video(TextToVideoRequest("a cat"))
+    assert (task.task_id, task.message) == ("s1", "Task submitted")
+    assert sent_json(generator) == {"model": "Wan-AI/Wan2.1-I2V-14B-720P", "prompt": "a cat",
+                                    "image_size": "1280x720"}
+    with pytest.raises(NotImplementedError):
+        generator.subject_reference(SubjectReferenceRequest("https://img/ref.png", "dance"))
+
+    done = generator.get_task_status("s1")
+    assert sent_json(generator) == {"requestId": "s1"}
+    assert (done.status, done.video_url) == (TaskStatus.COMPLETED, "https://cdn/s1.mp4")
+    assert generator.get_task_status("s2").error_message is None
+    assert generator.get_task_status("s3").error_message == "nsfw"
+
+
+ZHIPU = "https://open.bigmodel.cn/api/paas/v4"
+
+
+def test_zhipu_payloads_and_status():
+    generator = make(ZhipuVideoGenerator, {
+        ("POST", ZHIPU + "/video/generations"): response(body={"id": "z1", "task_status": "PROCESSING"}),
+        ("GET", ZHIPU + "/async-result/z1"): response(body={
+            "task_status": "SUCCESS",
+            "video_result": [{"url": "https://cdn/z1.mp4", "cover_image_url": "https://cdn/z1.jpg"}]}),
+        ("GET", ZHIPU + "/async-result/z2"): response(body={"task_status": "FAIL"}),
+    })
+    task = generator.subject_reference(SubjectReferenceRequest("https://img/ref.png", "dance", fps=60))
+    assert (task.task_id, task.status, task.message) == ("z1", TaskStatus.PROCESSING, "PROCESSING")
+    assert sent_json(generator) == {"model": "cogvideox", "prompt": "dance", "quality": "speed",
+                                    "with_audio": False, "size": "1920x1080", "fps": 60,
+                                    "image_url": "https://img/ref.png"}
+
+    done = generator.get_task_status("z1")
+    assert (done.status, done.video_url, done.thumbnail_url) == (
+        TaskStatus.COMPLETED, "https://cdn/z1.mp4", "https://cdn/z1.jpg")
+    failed = generator.get_task_status("z2")
+    assert (failed.status, failed.error_message) == (TaskStatus.FAILED, "任务失败")
+
+
+TONGYI = "https://dashscope.aliyuncs.com/api/v1"
+
+
+def test_tongyi_payloads_and_status():
+    generator = make(TongyiVideoGenerator, {
+        ("POST", TONGYI + "/services/aigc/video-generation/video-synthesis"): response(body={
+            "output": {"task_id": "w1", "task_status": "PENDING"}, "request_id": "req"}),
+        ("GET", TONGYI + "/tasks/w1"): response(body={"output": {
+            "task_id": "w1", "task_status": "SUCCEEDED", "video_url": "https://cdn/w1.mp4",
+            "submit_time": "2025-01-08 16:43:37.543", "end_time": "2025-01-08 16:45:00.000"}}),
+        ("GET", TONGYI + "/tasks/w2"): response(body={"output": {
+            "task_id": "w2", "task_status": "FAILED", "message": "Inappropriate content"}}),
+    })
+    task = generator.text_to_video(TextToVideoRequest("a cat"))
+    assert (task.task_id, task.status) == ("w1", TaskStatus.PENDING)
+    assert sent_json(generator) == {"model": "wanx2.1-t2v-turbo", "input": {"prompt": "a cat"},
+                                    "parameters": {"size": "1280*720"}}
+    assert generator.transport.calls[-1][2]["X-DashScope-Async"] == "enable"
+
+    done = generator.get_task_status("w1")
+    assert "X-DashScope-Async" not in generator.transport.calls[-1][2]
+    assert (done.status, done.video_url) == (TaskStatus.COMPLETED, "https://cdn/w1.mp4")
+    assert (done.create_time, done.update_time) == (datetime(2025, 1, 8, 16, 43, 37, 543000),
+                                                    datetime(2025, 1, 8, 16, 45))
+    failed = generator.get_task_status("w2")
+    assert (failed.status, failed.error_message) == (TaskStatus.FAILED, "Inappropriate content")
+
+
+def test_tongyi_list_items_keep_their_submit_time():
+    generator = make(TongyiVideoGenerator, {
+        ("GET", TONGYI + "/tasks?page_no=1&page_size=100"): response(body={"total_page": 1, "data": [
+            {"task_id": "w1", "task_status": "RUNNING", "submit_time": "2025-01-08 16:43:37.543"},
+            {"task_id": "w2", "task_status": "SUCCEEDED", "submit_time": "2025-01-08 16:40:00.000"},
+            {"task_id": "other", "task_status": "RUNNING"},
+        ]}),
+        ("GET", TONGYI + "/tasks/w2"): response(body={"output": {
+            "task_id": "w2", "task_status": "SUCCEEDED", "video_url": "https://cdn/w2.mp4"}}),
+    })
+    statuses = generator.get_task_statuses(["w1", "w2"])
+    assert (statuses["w1"].status, statuses["w1"].create_time) == (
+        TaskStatus.PROCESSING, datetime(2025, 1, 8, 16, 43, 37, 543000))
+    assert statuses["w2"].video_url == "https://cdn/w2.mp4"
+    assert [call[1] for call in generator.transport.calls] == [
+        TONGYI + "/tasks?page_no=1&page_size=100", TONGYI + "/tasks/w2"]
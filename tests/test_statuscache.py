@@ -0,0 +1,86 @@
+import threading
+import time
+from datetime import datetime
+
+import pytest
+
+from video_generation.base import TaskStatus, VideoMetadata, VideoProvider, VideoTaskStatus
+from video_generation.statuscache import MemoryStatusCache, SqliteStatusCache
+
+LUMA = VideoProvider.LUMA.value
+
+
+def status(task_id, state, **kwargs):
+    now = datetime(2025, 1, 8, 16, 43, 37, 543000)
+    return VideoTaskStatus(task_id, VideoProvider.LUMA, state, 0.5, now, now, **kwargs)
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def make_cache(request, tmp_path):
+    def make(ttl=0.1):
+        if request.param == "memory":
+            return MemoryStatusCache(ttl=ttl)
+        return SqliteStatusCache(str(tmp_path / "status.db"), ttl=ttl)
+    return make
+
+
+def test_round_trip(make_cache):
+    cache = make_cache()
+    original = status("t1", TaskStatus.COMPLETED, video_url="https://cdn/t1.mp4", estimated_time=3,
+                      metadata=VideoMetadata(duration=5.0, width=1280, height=720, fps=24.0, codec="avc1"))
+    cache.put(original)
+    assert cache.get(LUMA, "t1") == original
+    assert cache.get(LUMA, "missing") is None
+    assert cache.get(VideoProvider.VIDU.value, "t1") is None
+
+
+def test_running_status_expires_terminal_does_not(make_cache):
+    cache = make_cache(ttl=0.05)
+    cache.put(status("running", TaskStatus.PROCESSING))
+    cache.put(status("done", TaskStatus.FAILED, error_message="nsfw"))
+    assert cache.get(LUMA, "running") is not None
+    time.sleep(0.08)
+    assert cache.get(LUMA, "running") is None
+    assert cache.get(LUMA, "done").error_message == "nsfw"
+
+
+def test_invalidate(make_cache):
+    cache = make_cache()
+    cache.put(status("t1", TaskStatus.COMPLETED))
+    cache.invalidate(LUMA, "t1")
+    assert cache.get(LUMA, "t1") is None
+
+
+def test_sqlite_cache_is_shared_between_instances_and_threads(tmp_path):
+    path = str(tmp_path / "status.db")
+    writer, reader = SqliteStatusCache(path), SqliteStatusCache(path)
+
+    def put(i):
+        writer.put(status(f"t{i}", TaskStatus.COMPLETED))
+
+    threads = [threading.Thread(target=put, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert all(reader.get(LUMA, f"t{i}") is not None for i in range(8))
+    assert reader.prune(older_than=-1) == 8
+    assert writer.get(LUMA, "t0") is None
+
+
+def test_memory_cache_evicts_least_recently_used():
+    cache = MemoryStatusCache(max_entries=2)
+    for task_id in ("a", "b"):
+        cache.put(status(task_id, TaskStatus.COMPLETED))
+    cache.get(LUMA, "a")
+    cache.put(status("c", TaskStatus.COMPLETED))
+    assert [cache.get(LUMA, task_id) is not None for task_id in "abc"] == [True, False, True]
+
+
+def test_generator_serves_cached_terminal_status_without_polling(fake_generator):
+    generator = fake_generator(scripts={"t1": [TaskStatus.COMPLETED]})
+    generator.status_cache = MemoryStatusCache()
+    first = generator.get_task_status("t1")
+    assert generator.get_task_status("t1") == first
+    assert generator.get_task_statuses(["t1"]) == {"t1": first}
+    assert generator.queries == ["t1"]
@@ -0,0 +1,332 @@
+"""
+输入图片存储
+
+部分供应商只接受公网可访问的 image_url/reference_url。素材存储按内容的 SHA-256 寻址：
+- 相同内容只上传一次，之后直接返回同一个地址
+- 本地目录存储可自带只读 HTTP 服务对外提供文件
+- 也可以存放在任意兼容 S3 的对象存储中（需要安装 boto3）
+
+与图片预处理配合使用::
+
+    store = LocalAssetStore("/var/lib/video/assets", public_url="https://assets.example.com")
+    store.serve(port=8766)
+    generator.preprocessor = ImagePreprocessor(publish=store.publish)
+
+不需要预处理时，存储本身也可以作为 preprocessor，只上传本地路径与 data URL 形式的图片::
+
+    generator.preprocessor = store
+"""
+
+import dataclasses
+import hashlib
+import mimetypes
+import os
+import re
+import shutil
+import tempfile
+import threading
+from abc import ABC, abstractmethod
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import TYPE_CHECKING, Optional, Set
+
+from video_generation.preprocess import IMAGE_FIELDS, PreparedImage, read_image
+
+try:
+    import boto3
+except ImportError:  # pragma: no cover - 可选依赖
+    boto3 = None
+
+if TYPE_CHECKING:
+    from video_generation.base import BaseVideoGenerator, VideoRequest
+
+_EXTENSIONS = {
+    "image/jpeg": ".jpg",
+    "image/png": ".png",
+    "image/webp": ".webp",
+    "image/gif": ".gif",
+}
+
+_KEY_PATTERN = re.compile(r"^[0-9a-f]{64}(\.[a-z0-9]+)?$")
+
+# 监听所有网卡的地址，不能直接作为对外地址
+_WILDCARD_HOSTS = frozenset({"", "0.0.0.0", "::"})
+
+# 内容寻址的文件不会改变，允许下游长期缓存
+_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+class AssetStore(ABC):
+    """
+    按内容寻址的素材存储
+
+    已确认存在的对象记录在内存中，重复内容不会再访问存储后端。
+    """
+
+    def __init__(self):
+        self._stored: Set[str] = set()
+        self._lock = threading.Lock()
+
+    def put(self, data: bytes, mime_type: str = "application/octet-stream") -> str:
+        """
+        保存内容并返回供应商可访问的地址
+
+        Args:
+            data: 文件内容
+            mime_type: 内容类型，决定对象的扩展名
+
+        Returns:
+            str: 地址，相同内容总是得到同一个对象
+        """
+        key = hashlib.sha256(data).hexdigest() + _EXTENSIONS.get(mime_type, "")
+        with self._lock:
+            stored = key in self._stored
+        if not stored:
+            if not self._exists(key):
+                self._upload(key, data, mime_type)
+            with self._lock:
+                self._stored.add(key)
+        return self.url_for(key)
+
+    def put_file(self, path: str, mime_type: Optional[str] = None) -> str:
+        """保存本地文件，未指定类型时按扩展名推断"""
+        with open(path, "rb") as f:
+            data = f.read()
+        return self.put(data, mime_type or mimetypes.guess_type(path)[0] or "application/octet-stream")
+
+    def publish(self, image: PreparedImage) -> str:
+        """保存预处理结果，可作为 ImagePreprocessor 的 publish 参数"""
+        return self.put(image.data, image.mime_type)
+
+    def prepare(self, generator: "BaseVideoGenerator", request: "VideoRequest") -> "VideoRequest":
+        """
+        作为生成器的 preprocessor 使用：本地路径与 data URL 形式的图片上传后替换为存储地址
+
+        http(s) 地址原样保留，返回请求副本，原请求不会被修改。
+        """
+        field = IMAGE_FIELDS.get(type(request))
+        url = getattr(request, field) if field else None
+        if not url or url.startswith(("http://", "https://")):
+            return request
+        if url.startswith("data:"):
+            mime_type = url[len("data:"):].split(";", 1)[0].split(",", 1)[0]
+        else:
+            mime_type = mimetypes.guess_type(url)[0]
+        data = read_image(generator, url)
+        return dataclasses.replace(request, **{field: self.put(data, mime_type or "application/octet-stream")})
+
+    @abstractmethod
+    def url_for(self, key: str) -> str:
+        """对象的访问地址"""
+
+    @abstractmethod
+    def _exists(self, key: str) -> bool:
+        """后端中是否已有该对象"""
+
+    @abstractmethod
+    def _upload(self, key: str, data: bytes, mime_type: str):
+        """写入对象，同一个 key 的并发写入必须是安全的"""
+
+
+class _AssetHandler(BaseHTTPRequestHandler):
+    """只读提供存储目录中的文件"""
+
+    server: "_AssetHTTPServer"
+
+    def do_GET(self):
+        self._serve(body=True)
+
+    def do_HEAD(self):
+        self._serve(body=False)
+
+    def _serve(self, body: bool):
+        store = self.server.store
+        path = self.path.split("?", 1)[0]
+        key = path[len(store.path_prefix) + 1:] if path.startswith(store.path_prefix + "/") else ""
+        if not _KEY_PATTERN.match(key):
+            self._reply_empty(404)
+            return
+        if self.headers.get("If-None-Match") == f'"{key}"':
+            self._reply_empty(304)
+            return
+        try:
+            f = open(store.path_for(key), "rb")
+        except FileNotFoundError:
+            self._reply_empty(404)
+            return
+        with f:
+            self.send_response(200)
+            self.send_header("Content-Type", mimetypes.guess_type(key)[0] or "application/octet-stream")
+            self.send_header("Content-Length", str(os.fstat(f.fileno()).st_size))
+            self.send_header("Cache-Control", _CACHE_CONTROL)
+            self.send_header("ETag", f'"{key}"')
+            self.end_headers()
+            if body:
+                shutil.copyfileobj(f, self.wfile)
+
+    def _reply_empty(self, code: int):
+        self.send_response(code)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        # 供应商拉取图片的访问日志没有意义
+        pass
+
+
+class _AssetHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, store: "LocalAssetStore"):
+        super().__init__(address, _AssetHandler)
+        self.store = store
+
+
+class LocalAssetStore(AssetStore):
+    """
+    本地目录存储
+
+    文件按 <目录>/<哈希前两位>/<哈希>.<扩展名> 存放，先写临时文件再重命名，
+    多个进程共用同一目录时也不会读到不完整的文件。
+    """
+
+    def __init__(self, directory: str, public_url: Optional[str] = None, path_prefix: str = "/assets"):
+        """
+        Args:
+            directory: 存储目录
+            public_url: 供应商可访问的外部地址，默认使用 serve() 的监听地址
+            path_prefix: 地址中的路径前缀
+        """
+        super().__init__()
+        self.directory = directory
+        self.public_url = public_url
+        self.path_prefix = path_prefix.rstrip("/")
+        self.host = "127.0.0.1"
+        self.port: Optional[int] = None
+        self._httpd: Optional[_AssetHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+        os.makedirs(directory, exist_ok=True)
+
+    def path_for(self, key: str) -> str:
+        """对象在本地的文件路径"""
+        return os.path.join(self.directory, key[:2], key)
+
+    def url_for(self, key: str) -> str:
+        """
+        对象的访问地址
+
+        Raises:
+            RuntimeError: 未配置 public_url 且尚未调用 serve()，没有可用的地址
+        """
+        if self.public_url:
+            base = self.public_url
+        elif self.port is not None:
+            base = f"http://{self.host}:{self.port}"
+        else:
+            raise RuntimeError("本地素材存储没有可访问的地址：请配置 public_url 或先调用 serve()")
+        return f"{base.rstrip('/')}{self.path_prefix}/{key}"
+
+    def _exists(self, key: str) -> bool:
+        return os.path.exists(self.path_for(key))
+
+    def _upload(self, key: str, data: bytes, mime_type: str):
+        path = self.path_for(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def serve(self, host: str = "0.0.0.0", port: int = 8766) -> "LocalAssetStore":
+        """
+        在后台线程启动只读 HTTP 服务
+
+        Args:
+            host: 监听地址，监听所有地址（如 0.0.0.0）时必须配置 public_url
+            port: 监听端口，0 表示随机端口
+
+        Raises:
+            ValueError: 监听所有地址但未配置 public_url，无法得到供应商可访问的地址
+        """
+        if host in _WILDCARD_HOSTS and not self.public_url:
+            raise ValueError(f"监听 {host!r} 时需要配置 public_url")
+        if self._httpd is None:
+            self._httpd = _AssetHTTPServer((host, port), self)
+            self.host = host
+            self.port = self._httpd.server_address[1]
+            self._thread = threading.Thread(target=self._httpd.serve_forever,
+                                            name="video-asset-server", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        """停止 HTTP 服务"""
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+            self._thread = None
+
+    def __enter__(self) -> "LocalAssetStore":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+
+class S3AssetStore(AssetStore):
+    """
+    兼容 S3 的对象存储（AWS S3、MinIO、R2、OSS 等）
+
+    配置 public_url（存储桶的公开地址或 CDN）时返回固定地址，否则返回预签名地址。
+    """
+
+    def __init__(self, bucket: str, prefix: str = "", public_url: Optional[str] = None,
+                 endpoint_url: Optional[str] = None, presign_expires: int = 24 * 3600, client=None):
+        """
+        Args:
+            bucket: 存储桶
+            prefix: 对象键前缀，例如: "video-inputs/"
+            public_url: 公开访问地址，对象地址为 public_url + 对象键
+            endpoint_url: 非 AWS 服务的接入地址，例如: "http://minio:9000"
+            presign_expires: 预签名地址的有效期(秒)，应长于任务的排队与生成时间
+            client: 已配置好的 boto3 S3 客户端
+
+        Raises:
+            ImportError: 未传入 client 且未安装 boto3
+        """
+        super().__init__()
+        if client is None:
+            if boto3 is None:
+                raise ImportError("S3 素材存储需要安装 boto3")
+            client = boto3.client("s3", endpoint_url=endpoint_url)
+        self.client = client
+        self.bucket = bucket
+        self.prefix = prefix
+        self.public_url = public_url
+        self.presign_expires = presign_expires
+
+    def url_for(self, key: str) -> str:
+        if self.public_url:
+            return f"{self.public_url.rstrip('/')}/{self.prefix}{key}"
+        return self.client.generate_presigned_url(
+            "get_object", Params={"Bucket": self.bucket, "Key": self.prefix + key},
+            ExpiresIn=self.presign_expires,
+        )
+
+    def _exists(self, key: str) -> bool:
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self.prefix + key)
+        except self.client.exceptions.ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return False
+            raise
+        return True
+
+    def _upload(self, key: str, data: bytes, mime_type: str):
+        self.client.put_object(Bucket=self.bucket, Key=self.prefix + key, Body=data,
+                               ContentType=mime_type, CacheControl=_CACHE_CONTROL)
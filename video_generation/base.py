@@ -1,9 +1,33 @@
+import functools
+import logging
+import time
 from abc import ABC, abstractmethod
 from enum import Enum
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Callable, List, Iterable, Union, TYPE_CHECKING
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from datetime import datetime
 
+import requests
+
+from video_generation import codec
+from video_generation.deadline import Deadline, Timeouts, deadline_scope, effective_deadline
+from video_generation.endpoints import EndpointSet
+from video_generation.eta import EtaEstimator, eta_key
+from video_generation.flight import FlightRecorder, SlowCallWatchdog
+from video_generation.errors import DeadlineExceeded, InvalidVideoError
+from video_generation.keypool import ApiKeyPool, current_key
+from video_generation.statuscache import MemoryStatusCache, StatusCache
+from video_generation.transport import RequestsTransport, Transport
+
+if TYPE_CHECKING:
+    from video_generation.batch import CompletionStream, SubmitResult
+    from video_generation.poller import TaskPoller, TaskWatch
+    from video_generation.history import TaskHistory
+    from video_generation.preprocess import ImagePreprocessor
+
+logger = logging.getLogger(__name__)
+
 
 class VideoProvider(Enum):
     """视频生成服务提供商"""
@@ -24,6 +48,11 @@ class TaskStatus(Enum):
     COMPLETED = "completed"  # 已完成，任务成功完成
     FAILED = "failed"  # 失败，任务执行失败
 
+    @property
+    def is_terminal(self) -> bool:
+        """是否为终态（完成或失败）"""
+        return self in (TaskStatus.COMPLETED, TaskStatus.FAILED)
+
 
 @dataclass
 class TextToVideoRequest:
@@ -37,6 +66,7 @@ class TextToVideoRequest:
     seed: Optional[int] = None  # 随机种子，用于复现结果，例如: 42
     resolution: Optional[str] = None  # 视频分辨率，例如: "720p", "1080p", "4k"
     aspect_ratio: Optional[str] = None  # 视频宽高比，例如: "16:9", "9:16", "1:1"
+    callback_url: Optional[str] = None  # 任务完成回调地址，供应商支持时转发，例如: "https://example.com/callbacks/luma"
 
 
 @dataclass
@@ -52,6 +82,7 @@ class ImageToVideoRequest:
     seed: Optional[int] = None  # 随机种子，用于复现结果，例如: 42
     resolution: Optional[str] = None  # 视频分辨率，例如: "720p", "1080p", "4k"
     aspect_ratio: Optional[str] = None  # 视频宽高比，例如: "16:9", "9:16", "1:1"
+    callback_url: Optional[str] = None  # 任务完成回调地址，供应商支持时转发，例如: "https://example.com/callbacks/luma"
 
 
 @dataclass
@@ -67,6 +98,10 @@ class SubjectReferenceRequest:
     seed: Optional[int] = None  # 随机种子，用于复现结果，例如: 42
     resolution: Optional[str] = None  # 视频分辨率，例如: "720p", "1080p", "4k"
     aspect_ratio: Optional[str] = None  # 视频宽高比，例如: "16:9", "9:16", "1:1"
+    callback_url: Optional[str] = None  # 任务完成回调地址，供应商支持时转发，例如: "https://example.com/callbacks/luma"
+
+
+VideoRequest = Union[TextToVideoRequest, ImageToVideoRequest, SubjectReferenceRequest]
 
 
 @dataclass
@@ -79,6 +114,16 @@ class VideoTaskResponse:
     message: Optional[str] = None  # 任务消息，例如: "任务已提交"
 
 
+@dataclass
+class VideoMetadata:
+    """视频文件元数据，由 moov 中的头部信息得到"""
+    duration: float  # 时长(秒)，例如: 5.04
+    width: int  # 视频宽度（像素），例如: 1280
+    height: int  # 视频高度（像素），例如: 720
+    fps: Optional[float] = None  # 平均帧率，例如: 24.0
+    codec: Optional[str] = None  # 视频编码的 FourCC，例如: "avc1", "hvc1"
+
+
 @dataclass
 class VideoTaskStatus:
     """视频生成任务状态"""
@@ -92,20 +137,197 @@ class VideoTaskStatus:
     thumbnail_url: Optional[str] = None  # 缩略图URL，例如: "https://example.com/thumbnail.jpg"
     error_message: Optional[str] = None  # 错误信息，例如: "生成失败：内存不足"
     estimated_time: Optional[int] = None  # 预计剩余时间(秒)，例如: 60
+    metadata: Optional[VideoMetadata] = None  # 下载后解析得到的视频元数据
+
+
+def _check_deadline(deadline: Optional[Deadline], action: str):
+    if deadline is not None:
+        deadline.check(action)
+
+
+def task_submission(method):
+    """
+    供应商提交方法的装饰器
+
+    - 增加可选的 deadline 参数，调用期间所有HTTP请求共享该截止时间
+    - 设置了 preprocessor 时，先在租约之外处理请求中的输入图片
+    - 从密钥池中选择负载最低且有运行额度的密钥，额度已满时排队等待
+    - 记录任务与密钥的绑定，任务占用的额度在进入终态后释放
+    - 记录提交时间，用于学习任务耗时
+    """
+    @functools.wraps(method)
+    def wrapper(self, request, deadline: Optional[Deadline] = None):
+        with deadline_scope(deadline) as current:
+            _check_deadline(current, "提交任务")
+            if self.preprocessor is not None:
+                request = self.preprocessor.prepare(self, request)
+            with self.key_pool.lease(slot=True) as key:
+                response = method(self, request)
+            self.key_pool.bind(response.task_id, key, slot=True)
+            group = eta_key(self.provider.value, self.model, request)
+            if self.eta_estimator is not None:
+                self.eta_estimator.started(self.provider.value, response.task_id, group)
+            if self.task_history is not None:
+                _, model, resolution, duration = group
+                self.task_history.submitted(self.provider.value, response.task_id, model, resolution, duration)
+            return response
+    return wrapper
+
+
+def task_query(method):
+    """
+    供应商查询方法的装饰器
+
+    - 增加可选的 deadline 参数，调用期间所有HTTP请求共享该截止时间
+    - 使用提交该任务时的密钥，观察到终态（包括缓存命中）后释放绑定与运行额度
+    - 先查状态缓存，命中时不发起请求，查询结果写回缓存
+    - 供应商未返回进度时按学习到的耗时补充进度与预计剩余时间
+    """
+    @functools.wraps(method)
+    def wrapper(self, task_id, deadline: Optional[Deadline] = None):
+        cache = self.status_cache
+        if cache is not None:
+            cached = cache.get(self.provider.value, task_id)
+            if cached is not None:
+                return self._observe(cached, polled=False)
+
+        with deadline_scope(deadline) as current:
+            _check_deadline(current, "查询任务状态")
+            with self.key_pool.lease(task_id):
+                status = self._observe(method(self, task_id))
+            if cache is not None:
+                cache.put(status)
+            return status
+    return wrapper
+
+
+def task_cancel(method):
+    """
+    供应商取消方法的装饰器
+
+    - 增加可选的 deadline 参数
+    - 使用提交该任务时的密钥，供应商不支持取消时不发起请求
+    - 请求成功后释放本地资源（密钥绑定、状态缓存），并通知观察者任务已结束
+    """
+    @functools.wraps(method)
+    def wrapper(self, task_id, deadline: Optional[Deadline] = None) -> bool:
+        cancelled = False
+        if self.supports_cancel:
+            with deadline_scope(deadline) as current:
+                _check_deadline(current, "取消任务")
+                with self.key_pool.lease(task_id):
+                    cancelled = method(self, task_id)
+        self._abandon(task_id, cancelled)
+        return cancelled
+    return wrapper
+
+
+def _retry_after(response: requests.Response) -> Optional[float]:
+    value = response.headers.get("Retry-After")
+    try:
+        return float(value) if value else None
+    except ValueError:
+        return None
+
+
+def _body_bytes(kwargs: Dict[str, Any]) -> Optional[bytes]:
+    """飞行记录中的请求体，上传的文件不记录"""
+    data = kwargs.get("data")
+    if data is None or isinstance(data, bytes):
+        return data
+    if isinstance(data, str):
+        return data.encode("utf-8")
+    return codec.encode(data)
 
 
 class BaseVideoGenerator(ABC):
-    def __init__(self, api_key: str, api_secret: Optional[str] = None, model: Optional[str] = None):
-        self.api_key = api_key
+    # 供应商是否支持 callback_url 回调
+    supports_callback = False
+
+    # 单次HTTP调用的默认超时，供应商可覆盖，实例上也可单独设置
+    timeouts = Timeouts()
+
+    # 供应商接入点基础地址，按优先级排列
+    ENDPOINTS: tuple = ()
+
+    # 供应商是否支持取消进行中的任务，支持时需覆盖 cancel_task
+    supports_cancel = False
+
+    # 供应商是否提供批量列出任务的接口，支持时需实现 _list_task_statuses
+    supports_bulk_status = False
+    # 批量查询时列表接口的每页任务数与最多翻页数
+    LIST_PAGE_SIZE = 100
+    LIST_MAX_PAGES = 5
+
+    # 任务状态缓存，默认所有生成器共享进程内缓存，设为 None 关闭
+    status_cache: Optional[StatusCache] = MemoryStatusCache()
+
+    # 输入图片预处理器，设置后图片类请求提交前在本地裁剪、缩放并重新编码
+    preprocessor: Optional["ImagePreprocessor"] = None
+
+    # 任务耗时预估，默认所有生成器共享，设为 None 关闭
+    eta_estimator: Optional[EtaEstimator] = EtaEstimator()
+
+    # 已结束任务的耗时历史，设置后记录提交、处理、结束时间与查询次数
+    task_history: Optional["TaskHistory"] = None
+
+    # 最近HTTP交换的飞行记录，默认所有生成器共享，设为 None 关闭
+    flight_recorder: Optional[FlightRecorder] = FlightRecorder()
+
+    # 慢调用监视器，设置后记录超过阈值仍未返回的HTTP调用的线程栈
+    watchdog: Optional[SlowCallWatchdog] = None
+
+    def __init__(self, api_key: Union[str, List[str], ApiKeyPool], api_secret: Optional[str] = None,
+                 model: Optional[str] = None):
+        self.key_pool = ApiKeyPool.from_value(api_key)
+        self.endpoints = EndpointSet(self.ENDPOINTS) if self.ENDPOINTS else None
+        self.transport: Transport = RequestsTransport()
         self.api_secret = api_secret
         self.model = model
         self.provider = self._get_provider()
+        self.poller: Optional["TaskPoller"] = None  # 为空时使用进程共享的默认轮询器
+
+    @property
+    def api_key(self) -> str:
+        """当前调用使用的密钥，不在密钥池调度范围内时为第一个密钥"""
+        key = current_key()
+        if key is not None and key in self.key_pool:
+            return key.key
+        return self.key_pool.primary
+
+    @api_key.setter
+    def api_key(self, value: Union[str, List[str], ApiKeyPool]):
+        self.key_pool = ApiKeyPool.from_value(value)
+
+    @property
+    def base_url(self) -> Optional[str]:
+        """当前使用的接入点地址"""
+        return self.endpoints.current if self.endpoints else None
+
+    @base_url.setter
+    def base_url(self, value: str):
+        self.endpoints = EndpointSet([value])
 
     @abstractmethod
     def _get_provider(self) -> VideoProvider:
         """返回当前生成器的供应商类型"""
         pass
 
+    def parse_callback(self, payload: Dict[str, Any]) -> VideoTaskStatus:
+        """
+        解析供应商推送的回调内容
+
+        Args:
+            payload: 回调请求体
+
+        Returns:
+            VideoTaskStatus: 任务状态信息
+
+        Raises:
+            NotImplementedError: 供应商不支持回调
+        """
+        raise NotImplementedError(f"{self.provider.value} 不支持任务回调")
+
     @abstractmethod
     def text_to_video(self, request: TextToVideoRequest) -> VideoTaskResponse:
         """
@@ -157,3 +379,396 @@ class BaseVideoGenerator(ABC):
             VideoTaskStatus: 任务状态信息
         """
         pass
+
+    @task_cancel
+    def cancel_task(self, task_id: str) -> bool:
+        """
+        取消任务，尽快释放供应商侧的并发额度
+
+        不支持取消的供应商只在本地放弃任务：不再查询、通知观察者结束，
+        供应商侧的任务仍会继续执行到结束。
+
+        Args:
+            task_id: 任务ID
+
+        Returns:
+            bool: 供应商是否已确认取消
+        """
+        return False
+
+    def _abandon(self, task_id: str, cancelled: bool):
+        """取消或放弃任务后释放本地资源"""
+        self.key_pool.forget(task_id)
+        if self.eta_estimator is not None:
+            self.eta_estimator.forget(self.provider.value, task_id)
+        if self.task_history is not None:
+            self.task_history.forget(self.provider.value, task_id)
+        now = datetime.now()
+        status = VideoTaskStatus(
+            task_id=task_id,
+            provider=self.provider,
+            status=TaskStatus.FAILED,
+            progress=0.0,
+            create_time=now,
+            update_time=now,
+            error_message="任务已取消" if cancelled else "任务已放弃，供应商不支持取消"
+        )
+        if self.status_cache is not None:
+            if cancelled:
+                self.status_cache.put(status)
+            else:
+                self.status_cache.invalidate(self.provider.value, task_id)
+        self._get_poller().publish(status)
+
+    def _observe(self, status: VideoTaskStatus, polled: bool = True) -> VideoTaskStatus:
+        """
+        处理一次任务状态观察，查询、缓存命中与回调共用
+
+        终态时释放任务的密钥绑定与运行额度，再交给任务历史与耗时预估器，返回补充了进度的状态。
+        """
+        if status.status.is_terminal:
+            self.key_pool.forget(status.task_id)
+        if self.task_history is not None:
+            self.task_history.observe(status, polled)
+        if self.eta_estimator is None:
+            return status
+        return self.eta_estimator.observe(status)
+
+    def predicted_completion(self, task_id: str) -> Optional[datetime]:
+        """
+        任务的预计完成时间
+
+        Returns:
+            Optional[datetime]: 任务不是由本进程提交或同类任务样本不足时返回 None
+        """
+        if self.eta_estimator is None:
+            return None
+        return self.eta_estimator.predicted_completion(self.provider.value, task_id)
+
+    def _send(self, method: str, url: str, headers: Optional[Dict[str, str]] = None,
+              payload: Any = None, **kwargs) -> requests.Response:
+        """
+        发送HTTP请求
+
+        所有供应商的HTTP调用都经过这里：JSON请求体统一编码，
+        按 timeouts 与当前截止时间设置连接/读取超时，连接失败时标记接入点故障；
+        交换写入飞行记录，执行中的调用登记到慢调用监视器。
+
+        Args:
+            method: HTTP方法
+            url: 请求地址
+            headers: 请求头
+            payload: JSON请求体，为 None 时不编码
+            **kwargs: 透传给 requests 的其他参数（如 files、data）
+
+        Returns:
+            requests.Response: 原始响应，由调用方决定是否 raise_for_status
+
+        Raises:
+            DeadlineExceeded: 截止时间已到或请求因截止时间超时
+        """
+        deadline = effective_deadline(self.timeouts)
+        if deadline is not None:
+            deadline.check(f"{method} {url}")
+            timeout = deadline.http_timeout(self.timeouts)
+        else:
+            timeout = (self.timeouts.connect, self.timeouts.read)
+
+        if payload is not None:
+            kwargs["data"] = codec.encode(payload)
+
+        recorder = self.flight_recorder
+        watchdog = self.watchdog
+        token = watchdog.enter(self.provider.value, method, url) if watchdog is not None else None
+        started_at, started = time.time(), time.monotonic()
+        try:
+            response = self._transmit(method, url, headers, timeout, deadline, **kwargs)
+        except Exception as e:
+            if recorder is not None:
+                recorder.record(self.provider.value, method, url, started_at, time.monotonic() - started,
+                                request_body=_body_bytes(kwargs), error=e)
+            raise
+        finally:
+            if token is not None:
+                watchdog.exit(token)
+        if recorder is not None:
+            recorder.record(self.provider.value, method, url, started_at, time.monotonic() - started,
+                            status=response.status_code, request_body=_body_bytes(kwargs),
+                            response_body=None if kwargs.get("stream") else response.content)
+
+        key = current_key()
+        if key is not None:
+            self.key_pool.report(key, response.status_code, _retry_after(response))
+        return response
+
+    def _transmit(self, method: str, url: str, headers: Optional[Dict[str, str]], timeout,
+                  deadline: Optional[Deadline], **kwargs) -> requests.Response:
+        """经由 transport 发出请求，幂等请求遇到连接失败时切换到其他接入点重试一次"""
+        attempts = 2 if method in ("GET", "HEAD") and self.endpoints else 1
+        for attempt in range(attempts):
+            try:
+                return self.transport.request(method, url, headers=headers, timeout=timeout, **kwargs)
+            except requests.RequestException as e:
+                if isinstance(e, requests.Timeout) and deadline is not None and deadline.expired:
+                    raise DeadlineExceeded(f"{method} {url} 超过截止时间") from e
+                if not isinstance(e, requests.ConnectionError) or self.endpoints is None:
+                    raise
+                if not self.endpoints.mark_failed(url) or attempt + 1 == attempts:
+                    raise
+                url = self.endpoints.rebase(url)
+
+    def warm(self, connections: int = 2, timeout: float = 5.0) -> Dict[str, int]:
+        """
+        预热所有接入点的连接
+
+        在第一个真实请求之前完成DNS解析、TLS握手并填充连接池。
+
+        Args:
+            connections: 每个接入点预先建立的连接数
+            timeout: 单个连接的超时(秒)
+
+        Returns:
+            Dict[str, int]: 每个接入点成功建立的连接数
+        """
+        if self.endpoints is None:
+            return {}
+        return {endpoint.url: self.transport.warm(endpoint.url, connections, timeout)
+                for endpoint in self.endpoints.endpoints}
+
+    def submit(self, request: VideoRequest, deadline: Optional[Deadline] = None) -> VideoTaskResponse:
+        """
+        按请求类型提交任务
+
+        Args:
+            request: 三种请求类型之一
+            deadline: 截止时间
+
+        Returns:
+            VideoTaskResponse: 任务创建响应
+
+        Raises:
+            TypeError: 不支持的请求类型
+        """
+        with deadline_scope(deadline):
+            if isinstance(request, TextToVideoRequest):
+                return self.text_to_video(request)
+            if isinstance(request, ImageToVideoRequest):
+                return self.image_to_video(request)
+            if isinstance(request, SubjectReferenceRequest):
+                return self.subject_reference(request)
+        raise TypeError(f"不支持的请求类型: {type(request).__name__}")
+
+    def submit_many(self, requests: Iterable[VideoRequest], max_concurrency: int = 8,
+                    deadline: Optional[Deadline] = None) -> List["SubmitResult"]:
+        """
+        并发提交一批任务
+
+        Args:
+            requests: 请求列表，可混合三种请求类型
+            max_concurrency: 最大并发提交数
+            deadline: 整批的截止时间，到期后尚未发出的请求以 DeadlineExceeded 失败
+
+        Returns:
+            List: 与输入顺序一致的结果，成功为 VideoTaskResponse，
+            失败为 SubmissionError，单个失败不会中断整批
+        """
+        from video_generation.batch import submit_many
+        return submit_many(((self, request) for request in requests), max_concurrency, deadline)
+
+    def get_task_statuses(self, task_ids: Iterable[str], max_concurrency: int = 8,
+                          deadline: Optional[Deadline] = None) -> Dict[str, VideoTaskStatus]:
+        """
+        批量获取任务状态
+
+        已缓存的状态直接使用；供应商提供列表接口时按提交密钥分组，分页列出任务，
+        一次请求覆盖多个任务；列表中没有的任务以及其他供应商的任务逐个并发查询。
+
+        Args:
+            task_ids: 任务ID列表
+            max_concurrency: 逐个查询时的最大并发数
+            deadline: 截止时间
+
+        Returns:
+            Dict[str, VideoTaskStatus]: 任务ID到状态的映射，查询失败的任务不在其中
+        """
+        task_ids = list(dict.fromkeys(task_ids))
+        statuses: Dict[str, VideoTaskStatus] = {}
+        cache = self.status_cache
+        if cache is not None:
+            for task_id in task_ids:
+                cached = cache.get(self.provider.value, task_id)
+                if cached is not None:
+                    statuses[task_id] = self._observe(cached, polled=False)
+
+        with deadline_scope(deadline) as current:
+            _check_deadline(current, "批量查询任务状态")
+            if self.supports_bulk_status:
+                groups: Dict[Optional[str], List[str]] = {}
+                for task_id in task_ids:
+                    if task_id not in statuses:
+                        groups.setdefault(self.key_pool.key_for(task_id), []).append(task_id)
+                for ids in groups.values():
+                    try:
+                        with self.key_pool.lease(ids[0]):
+                            listed = self._list_task_statuses(ids)
+                    except requests.RequestException:
+                        logger.warning("批量查询任务状态失败: %s", self.provider.value, exc_info=True)
+                        continue
+                    for task_id, status in listed.items():
+                        status = statuses[task_id] = self._observe(status)
+                        if cache is not None:
+                            cache.put(status)
+
+            missing = [task_id for task_id in task_ids if task_id not in statuses]
+            if missing:
+                def query(task_id: str) -> Optional[VideoTaskStatus]:
+                    try:
+                        return self.get_task_status(task_id, deadline=current)
+                    except DeadlineExceeded:
+                        raise
+                    except Exception:
+                        logger.warning("查询任务状态失败: %s/%s", self.provider.value, task_id, exc_info=True)
+                        return None
+
+                with ThreadPoolExecutor(max_workers=min(max_concurrency, len(missing)),
+                                        thread_name_prefix="video-status") as executor:
+                    for task_id, status in zip(missing, executor.map(query, missing)):
+                        if status is not None:
+                            statuses[task_id] = status
+
+        return {task_id: statuses[task_id] for task_id in task_ids if task_id in statuses}
+
+    def _list_task_statuses(self, task_ids: List[str]) -> Dict[str, VideoTaskStatus]:
+        """
+        通过列表接口查询一组任务，在密钥租约内调用
+
+        Args:
+            task_ids: 由同一密钥提交的任务ID
+
+        Returns:
+            Dict[str, VideoTaskStatus]: 在列表中找到的任务，其余任务会逐个查询
+        """
+        raise NotImplementedError(f"{self.provider.value} 不支持批量查询任务")
+
+    def _download_headers(self) -> Dict[str, str]:
+        """下载结果视频时附加的请求头，结果地址需要鉴权的供应商需覆盖"""
+        return {}
+
+    def download(self, status: VideoTaskStatus, path: str, deadline: Optional[Deadline] = None,
+                 request: Optional[VideoRequest] = None) -> int:
+        """
+        下载已完成任务的视频
+
+        下载完成后解析文件头部，将元数据写入 status.metadata；
+        传入提交时的请求时，结果的宽高比、时长或帧率与请求不符会记录警告。
+
+        Args:
+            status: 已完成的任务状态
+            path: 保存路径
+            deadline: 截止时间
+            request: 提交时的请求
+
+        Returns:
+            int: 下载的字节数
+
+        Raises:
+            ValueError: 任务没有视频地址
+        """
+        from video_generation.download import download_video
+        from video_generation import mp4
+        if not status.video_url:
+            raise ValueError(f"任务 {status.task_id} 没有可下载的视频")
+        with deadline_scope(deadline):
+            written = download_video(status.video_url, path, headers=self._download_headers(),
+                                     timeouts=self.timeouts, transport=self.transport)
+        if self.task_history is not None:
+            self.task_history.downloaded(self.provider.value, status.task_id, written)
+        try:
+            status.metadata = mp4.probe(path)
+        except InvalidVideoError:
+            logger.warning("无法解析视频元数据: %s/%s", self.provider.value, status.task_id, exc_info=True)
+            return written
+        if self.status_cache is not None:
+            self.status_cache.put(status)
+        if request is not None:
+            for problem in mp4.verify(status.metadata, request):
+                logger.warning("结果与请求不符 %s/%s: %s", self.provider.value, status.task_id, problem)
+        return written
+
+    def as_completed(self, tasks: Iterable[Union[str, VideoTaskResponse]],
+                     download_dir: Optional[str] = None,
+                     timeout: Optional[float] = None,
+                     deadline: Optional[Deadline] = None,
+                     cancel_pending: bool = False) -> "CompletionStream":
+        """
+        按完成顺序产出任务结果
+
+        Args:
+            tasks: 任务ID或任务创建响应
+            download_dir: 设置后自动下载已完成的视频到该目录
+            timeout: 整体最长等待时间(秒)
+            deadline: 截止时间，同时约束等待与下载
+            cancel_pending: 到期时取消尚未结束的任务
+
+        Returns:
+            CompletionStream: 同时支持 for 和 async for 的结果流
+        """
+        from video_generation.batch import TaskHandle, as_completed
+        handles = [TaskHandle(self, task if isinstance(task, str) else task.task_id) for task in tasks]
+        return as_completed(handles, download_dir=download_dir, timeout=timeout, deadline=deadline,
+                            cancel_pending=cancel_pending)
+
+    def _get_poller(self) -> "TaskPoller":
+        from video_generation.poller import default_poller
+        return self.poller or default_poller()
+
+    def watch(self, task_id: str, deadline: Optional[Deadline] = None) -> "TaskWatch":
+        """
+        观察任务状态变化
+
+        返回的迭代器同时支持 for 和 async for，仅在状态或进度变化时产出，
+        任务进入终态后结束。所有观察者共享同一个轮询器。
+
+        Args:
+            task_id: 任务ID
+            deadline: 截止时间，到期后停止观察并抛出 DeadlineExceeded
+
+        Returns:
+            TaskWatch: 任务状态迭代器
+        """
+        from video_generation.poller import TaskWatch
+        return TaskWatch(self._get_poller(), self, task_id, deadline)
+
+    def on_complete(self, task_id: str, callback: Callable[[VideoTaskStatus], None]) -> Callable[[], None]:
+        """
+        注册任务完成回调
+
+        Args:
+            task_id: 任务ID
+            callback: 任务完成时调用，在轮询线程中执行
+
+        Returns:
+            Callable: 取消注册的函数
+        """
+        def listener(status: VideoTaskStatus):
+            if status.status == TaskStatus.COMPLETED:
+                callback(status)
+
+        return self._get_poller().subscribe(self, task_id, listener)
+
+    def on_failed(self, task_id: str, callback: Callable[[VideoTaskStatus], None]) -> Callable[[], None]:
+        """
+        注册任务失败回调
+
+        Args:
+            task_id: 任务ID
+            callback: 任务失败时调用，在轮询线程中执行
+
+        Returns:
+            Callable: 取消注册的函数
+        """
+        def listener(status: VideoTaskStatus):
+            if status.status == TaskStatus.FAILED:
+                callback(status)
+
+        return self._get_poller().subscribe(self, task_id, listener)
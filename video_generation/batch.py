@@ -0,0 +1,219 @@
+"""
+批量任务处理
+"""
+
+import asyncio
+import logging
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import AsyncIterator, Iterable, Iterator, List, Optional, Tuple, Union
+
+from video_generation.base import (
+    BaseVideoGenerator, TaskStatus, VideoRequest, VideoTaskResponse, VideoTaskStatus
+)
+from video_generation.deadline import Deadline
+from video_generation.errors import DeadlineExceeded, SubmissionError
+
+logger = logging.getLogger(__name__)
+
+SubmitResult = Union[VideoTaskResponse, SubmissionError]
+
+# 通知 CompletionStream 提前结束的哨兵
+_STOP = object()
+
+
+@dataclass(frozen=True)
+class TaskHandle:
+    """已提交任务的句柄"""
+    generator: BaseVideoGenerator  # 任务所属的生成器
+    task_id: str  # 任务ID
+
+
+@dataclass
+class CompletedTask:
+    """已结束的任务"""
+    handle: TaskHandle  # 任务句柄
+    status: VideoTaskStatus  # 终态任务状态
+    path: Optional[str] = None  # 已下载的视频路径
+    download_error: Optional[BaseException] = None  # 下载失败时的异常
+
+
+def submit_many(jobs: Iterable[Tuple[BaseVideoGenerator, VideoRequest]],
+                max_concurrency: int = 8,
+                deadline: Optional[Deadline] = None) -> List[SubmitResult]:
+    """
+    并发提交一批任务，可跨多个供应商
+
+    Args:
+        jobs: (生成器, 请求) 列表，请求可以是三种请求类型的任意组合
+        max_concurrency: 最大并发提交数
+        deadline: 整批的截止时间，到期后尚未发出的请求以 DeadlineExceeded 失败
+
+    Returns:
+        List: 与输入顺序一致的结果，成功为 VideoTaskResponse，
+        失败为 SubmissionError，单个失败不影响其他请求
+    """
+    jobs = list(jobs)
+    if not jobs:
+        return []
+
+    def run(index: int) -> SubmitResult:
+        generator, request = jobs[index]
+        try:
+            return generator.submit(request, deadline=deadline)
+        except Exception as e:
+            return SubmissionError(index, request, e)
+
+    with ThreadPoolExecutor(max_workers=min(max_concurrency, len(jobs)),
+                            thread_name_prefix="video-submit") as executor:
+        return list(executor.map(run, range(len(jobs))))
+
+
+class CompletionStream:
+    """
+    按完成顺序产出任务结果的流
+
+    同时支持 for 和 async for，结果产出后不再持有，内存占用与批次大小无关。
+    """
+
+    def __init__(self,
+                 handles: List[TaskHandle],
+                 download_dir: Optional[str] = None,
+                 download_concurrency: int = 4,
+                 timeout: Optional[float] = None,
+                 deadline: Optional[Deadline] = None,
+                 cancel_pending: bool = False):
+        self.handles = handles
+        self.download_dir = download_dir
+        self.download_concurrency = download_concurrency
+        self.timeout = timeout
+        self.deadline = deadline
+        self.cancel_pending = cancel_pending
+
+    def __iter__(self) -> Iterator[CompletedTask]:
+        return self._iterate(queue.Queue())
+
+    def _iterate(self, events: "queue.Queue[Union[CompletedTask, object]]") -> Iterator[CompletedTask]:
+        """按完成顺序产出结果，从 events 取到 _STOP 时提前结束"""
+        deadline = self.deadline
+        if self.timeout is not None:
+            deadline = Deadline(self.timeout).earliest(deadline)
+        executor = None
+        if self.download_dir is not None:
+            executor = ThreadPoolExecutor(max_workers=self.download_concurrency,
+                                          thread_name_prefix="video-download")
+
+        def download(item: CompletedTask):
+            generator = item.handle.generator
+            path = os.path.join(self.download_dir, f"{generator.provider.value}_{item.handle.task_id}.mp4")
+            try:
+                generator.download(item.status, path, deadline=deadline)
+                item.path = path
+            except Exception as e:
+                item.download_error = e
+            events.put(item)
+
+        finished = set()
+
+        def listener(handle: TaskHandle, status: VideoTaskStatus):
+            if not status.status.is_terminal:
+                return
+            finished.add(handle)
+            item = CompletedTask(handle, status)
+            if executor is not None and status.status == TaskStatus.COMPLETED:
+                executor.submit(download, item)
+            else:
+                events.put(item)
+
+        unsubscribes = [
+            handle.generator._get_poller().subscribe(
+                handle.generator, handle.task_id,
+                lambda status, handle=handle: listener(handle, status))
+            for handle in self.handles
+        ]
+        try:
+            for _ in range(len(self.handles)):
+                remaining = None if deadline is None else deadline.remaining()
+                try:
+                    item = events.get(timeout=remaining)
+                except queue.Empty:
+                    raise DeadlineExceeded("等待任务完成超过截止时间") from None
+                if item is _STOP:
+                    return
+                yield item
+        finally:
+            for unsubscribe in unsubscribes:
+                unsubscribe()
+            if self.cancel_pending:
+                self._cancel([handle for handle in self.handles if handle not in finished])
+            if executor is not None:
+                executor.shutdown(wait=False, cancel_futures=True)
+
+    @staticmethod
+    def _cancel(handles: List[TaskHandle]):
+        for handle in handles:
+            try:
+                handle.generator.cancel_task(handle.task_id)
+            except Exception:
+                logger.warning("取消任务失败: %s/%s", handle.generator.provider.value, handle.task_id,
+                               exc_info=True)
+
+    async def __aiter__(self) -> AsyncIterator[CompletedTask]:
+        events: "queue.Queue[Union[CompletedTask, object]]" = queue.Queue()
+        iterator = self._iterate(events)
+        done = object()
+        # 取消 await 不会中断线程中的 next，关闭生成器前必须等它返回，否则会抛出 generator already executing
+        lock = threading.Lock()
+
+        def step():
+            with lock:
+                return next(iterator, done)
+
+        def close():
+            with lock:
+                iterator.close()
+
+        try:
+            while True:
+                item = await asyncio.to_thread(step)
+                if item is done:
+                    return
+                yield item
+        finally:
+            # 让仍阻塞在 events 上的 next 立即返回，再在线程中关闭（取消未结束的任务可能发出HTTP请求）
+            events.put(_STOP)
+            await asyncio.to_thread(close)
+
+
+def as_completed(handles: Iterable[TaskHandle],
+                 download_dir: Optional[str] = None,
+                 download_concurrency: int = 4,
+                 timeout: Optional[float] = None,
+                 deadline: Optional[Deadline] = None,
+                 cancel_pending: bool = False) -> CompletionStream:
+    """
+    按完成顺序产出一批任务的结果，可跨多个供应商
+
+    最先结束的任务最先产出，下游处理无需等待整批中最慢的任务::
+
+        for item in as_completed(handles, download_dir="/data/videos"):
+            upload(item.path)
+
+        async for item in as_completed(handles):
+            ...
+
+    Args:
+        handles: 任务句柄
+        download_dir: 设置后自动下载已完成的视频，下载完成后才产出
+        download_concurrency: 最大并发下载数
+        timeout: 整体最长等待时间(秒)
+        deadline: 截止时间，同时约束等待与下载，到期抛出 DeadlineExceeded
+        cancel_pending: 提前结束（到期或停止迭代）时取消尚未结束的任务，释放供应商侧并发额度
+
+    Returns:
+        CompletionStream: 结果流
+    """
+    return CompletionStream(list(handles), download_dir, download_concurrency, timeout, deadline, cancel_pending)
@@ -0,0 +1,296 @@
+"""
+任务回调接收服务
+
+供应商支持 callback_url 时（如 Luma、Vidu），任务完成后会主动推送结果，
+收到回调即可直接结束等待，轮询仅作为低频兜底。
+"""
+
+import logging
+import threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from video_generation import codec
+from video_generation.base import BaseVideoGenerator, VideoTaskStatus
+from video_generation.deadline import Deadline, deadline_scope
+from video_generation.errors import DeadlineExceeded
+
+logger = logging.getLogger(__name__)
+
+StatusListener = Callable[[VideoTaskStatus], None]
+
+# 监听所有网卡的地址，不能直接作为回调地址
+_WILDCARD_HOSTS = frozenset({"", "0.0.0.0", "::"})
+
+
+class _CallbackHandler(BaseHTTPRequestHandler):
+    """处理供应商推送的回调请求"""
+
+    server: "_CallbackHTTPServer"
+
+    def do_POST(self):
+        parts = urlsplit(self.path)
+        prefix = self.server.owner.path_prefix
+        if not parts.path.startswith(prefix + "/"):
+            self._reply(404)
+            return
+
+        token = self.server.owner.token
+        if token and parse_qs(parts.query).get("token", [None])[0] != token:
+            self._reply(403)
+            return
+
+        provider = parts.path[len(prefix) + 1:].strip("/")
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            payload = codec.decode(self.rfile.read(length))
+            self.server.owner.handle(provider, payload)
+        except KeyError:
+            self._reply(404)
+            return
+        except (ValueError, TypeError, NotImplementedError):
+            self._reply(400)
+            return
+        self._reply(200)
+
+    def _reply(self, code: int):
+        body = codec.encode({"code": code})
+        self.send_response(code)
+        self.send_header("Content-Type", codec.JSON_CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # 回调量大时默认的访问日志没有意义
+        pass
+
+
+class _CallbackHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, owner: "CallbackServer"):
+        super().__init__(address, _CallbackHandler)
+        self.owner = owner
+
+
+class CallbackServer:
+    """
+    内置回调服务
+
+    用法::
+
+        with CallbackServer(port=8765, public_url="https://worker-1.example.com") as server:
+            server.register(generator)
+            request.callback_url = server.callback_url(generator)
+            task = generator.text_to_video(request)
+            status = server.wait(generator, task.task_id)
+    """
+
+    def __init__(self,
+                 host: str = "0.0.0.0",
+                 port: int = 8765,
+                 public_url: Optional[str] = None,
+                 token: Optional[str] = None,
+                 path_prefix: str = "/callbacks",
+                 max_retained: int = 10000,
+                 fallback_interval: Optional[float] = 60.0):
+        """
+        Args:
+            host: 监听地址，监听所有地址（如 0.0.0.0）时必须配置 public_url
+            port: 监听端口，0 表示随机端口
+            public_url: 供应商可访问的外部地址，默认使用监听地址
+            token: 校验令牌，设置后回调地址会带上 ?token=
+            path_prefix: 回调路径前缀
+            max_retained: 最多保留的未被等待的终态结果数
+            fallback_interval: 支持回调的生成器注册后，其任务在轮询器中的兜底轮询间隔(秒)，
+                None 时保持轮询器的默认间隔
+        """
+        self.host = host
+        self.port = port
+        self.public_url = public_url
+        self.token = token
+        self.path_prefix = path_prefix.rstrip("/")
+        self.max_retained = max_retained
+        self.fallback_interval = fallback_interval
+
+        self._generators: Dict[str, BaseVideoGenerator] = {}
+        self._listeners: List[StatusListener] = []
+        self._waiters: Dict[Tuple[str, str], threading.Event] = {}
+        self._results: "OrderedDict[Tuple[str, str], VideoTaskStatus]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._httpd: Optional[_CallbackHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "CallbackServer":
+        """
+        在后台线程启动回调服务
+
+        Raises:
+            ValueError: 监听所有地址但未配置 public_url，无法得到供应商可访问的回调地址
+        """
+        if self.host in _WILDCARD_HOSTS and not self.public_url:
+            raise ValueError(f"监听 {self.host!r} 时需要配置 public_url")
+        if self._httpd is None:
+            self._httpd = _CallbackHTTPServer((self.host, self.port), self)
+            self.port = self._httpd.server_address[1]
+            self._thread = threading.Thread(target=self._httpd.serve_forever,
+                                            name="video-callback-server", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        """停止回调服务，已注册生成器的任务恢复正常轮询"""
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+            self._thread = None
+        if self.fallback_interval is not None:
+            for generator in self._generators.values():
+                if generator.supports_callback:
+                    generator._get_poller().set_interval(generator.provider.value, None)
+
+    def __enter__(self) -> "CallbackServer":
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def register(self, generator: BaseVideoGenerator):
+        """
+        注册生成器，用于解析对应供应商的回调内容
+
+        收到的回调会推送给生成器的轮询器，watch()、完成回调与 as_completed() 立即得到结果；
+        供应商支持回调时，轮询器对其任务只按 fallback_interval 低频兜底轮询。
+        """
+        self._generators[generator.provider.value] = generator
+        if generator.supports_callback and self.fallback_interval is not None:
+            generator._get_poller().set_interval(generator.provider.value, self.fallback_interval)
+
+    def add_listener(self, listener: StatusListener):
+        """注册监听函数，每收到一次回调都会被调用"""
+        self._listeners.append(listener)
+
+    def callback_url(self, generator: BaseVideoGenerator) -> Optional[str]:
+        """
+        获取指定供应商的回调地址
+
+        Returns:
+            Optional[str]: 回调地址，供应商不支持回调时返回 None
+
+        Raises:
+            RuntimeError: 未配置 public_url，且监听所有地址或随机端口尚未确定，没有可用的地址
+        """
+        if not generator.supports_callback:
+            return None
+        if self.public_url:
+            base = self.public_url
+        elif self.host not in _WILDCARD_HOSTS and self.port:
+            base = f"http://{self.host}:{self.port}"
+        else:
+            raise RuntimeError("回调服务没有可访问的地址：请配置 public_url，或监听具体地址并先调用 start()")
+        url = f"{base.rstrip('/')}{self.path_prefix}/{generator.provider.value}"
+        if self.token:
+            url = f"{url}?token={self.token}"
+        return url
+
+    def handle(self, provider: str, payload: dict) -> VideoTaskStatus:
+        """
+        处理一次回调
+
+        Args:
+            provider: 供应商标识
+            payload: 回调请求体
+
+        Returns:
+            VideoTaskStatus: 解析后的任务状态
+
+        Raises:
+            KeyError: 供应商未注册
+        """
+        generator = self._generators[provider]
+        status = generator._observe(generator.parse_callback(payload), polled=False)
+        key = (provider, status.task_id)
+        if generator.status_cache is not None:
+            generator.status_cache.put(status)
+        generator._get_poller().publish(status)
+
+        if status.status.is_terminal:
+            with self._lock:
+                self._results[key] = status
+                self._results.move_to_end(key)
+                while len(self._results) > self.max_retained:
+                    self._results.popitem(last=False)
+                event = self._waiters.get(key)
+            if event is not None:
+                event.set()
+
+        for listener in self._listeners:
+            try:
+                listener(status)
+            except Exception:
+                # 状态已经生效，监听函数出错不应让供应商重发回调
+                logger.exception("回调监听函数执行失败: %s", status.task_id)
+        return status
+
+    def result(self, generator: BaseVideoGenerator, task_id: str) -> Optional[VideoTaskStatus]:
+        """获取已通过回调收到的终态结果"""
+        with self._lock:
+            return self._results.get((generator.provider.value, task_id))
+
+    def wait(self,
+             generator: BaseVideoGenerator,
+             task_id: str,
+             timeout: Optional[float] = None,
+             poll_interval: float = 60.0,
+             deadline: Optional[Deadline] = None) -> VideoTaskStatus:
+        """
+        等待任务结束
+
+        优先等待回调，每隔 poll_interval 秒轮询一次作为兜底，
+        不支持回调的供应商同样适用。
+
+        Args:
+            generator: 任务所属的生成器
+            task_id: 任务ID
+            timeout: 最长等待时间(秒)，None 表示不限
+            poll_interval: 兜底轮询间隔(秒)
+            deadline: 截止时间，同时约束兜底轮询的HTTP调用
+
+        Returns:
+            VideoTaskStatus: 终态任务状态
+
+        Raises:
+            DeadlineExceeded: 超时仍未结束
+        """
+        key = (generator.provider.value, task_id)
+        if timeout is not None:
+            deadline = Deadline(timeout).earliest(deadline)
+
+        with self._lock:
+            event = self._waiters.setdefault(key, threading.Event())
+        try:
+            while True:
+                status = self.result(generator, task_id)
+                if status is not None:
+                    return status
+
+                wait_for = poll_interval
+                if deadline is not None:
+                    if deadline.expired:
+                        raise DeadlineExceeded(f"等待任务 {task_id} 超过截止时间")
+                    wait_for = min(wait_for, deadline.remaining())
+
+                if event.wait(wait_for):
+                    continue
+
+                with deadline_scope(deadline):
+                    status = generator.get_task_status(task_id)
+                if status.status.is_terminal:
+                    return status
+        finally:
+            with self._lock:
+                self._waiters.pop(key, None)
@@ -0,0 +1,366 @@
+"""
+HTTP 录制与回放
+
+录制时包装生成器原有的 transport，把每一次请求与响应（含耗时与连接错误）追加到 gzip 压缩的
+JSON Lines 文件（cassette）；回放时完全不访问网络，按原始或缩放后的耗时返回录制的响应，
+用于在新版本上重放真实流量，比较吞吐与延迟::
+
+    recorder = CassetteRecorder("traffic.cassette")
+    for generator in generators:
+        generator.transport = recorder.wrap(generator.transport)
+    ...
+    recorder.close()
+
+    replay = ReplayTransport("traffic.cassette", speed=10)  # 10 倍速
+    for generator in generators:
+        generator.transport = replay
+
+鉴权相关的请求头不会写入文件，但提示词、结果地址等内容会原样保存，cassette 应按生产数据对待。
+"""
+
+import base64
+import bisect
+import gzip
+import hashlib
+import threading
+import time
+import zlib
+from dataclasses import dataclass, field
+from datetime import timedelta
+from http import HTTPStatus
+from typing import Any, Dict, List, Optional, Union
+from urllib.parse import urlsplit
+
+import requests
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from video_generation import codec
+from video_generation.errors import CassetteMiss
+from video_generation.transport import RequestsTransport, Timeout, Transport
+
+CASSETTE_VERSION = 1
+
+# 不写入 cassette 的请求头与响应头（小写）
+REDACTED_HEADERS = frozenset({
+    "authorization", "proxy-authorization", "x-api-key", "api-key", "cookie", "set-cookie",
+})
+
+
+@dataclass
+class Exchange:
+    """一次录制的HTTP交换"""
+    at: float  # 请求发出时距录制开始的时间(秒)
+    elapsed: float  # 收到响应头或出错所用的时间(秒)
+    method: str  # HTTP方法
+    url: str  # 请求地址
+    request_headers: Dict[str, str] = field(default_factory=dict)  # 请求头，不含鉴权信息
+    body_hash: Optional[str] = None  # 请求体的 SHA-256，用于区分同一地址的不同提交
+    request_body: Optional[str] = None  # 请求体文本，超过录制上限时为 None
+    status: Optional[int] = None  # 响应状态码
+    response_headers: Dict[str, str] = field(default_factory=dict)  # 响应头
+    content: Optional[bytes] = None  # 响应体，流式下载未录制内容时为 None
+    size: int = 0  # 响应体字节数
+    error: Optional[str] = None  # 请求失败时的 requests 异常类名，例如: "ReadTimeout"
+
+    def to_record(self) -> Dict[str, Any]:
+        record = {
+            "at": round(self.at, 4), "elapsed": round(self.elapsed, 4), "method": self.method, "url": self.url,
+            "request_headers": self.request_headers, "body_hash": self.body_hash,
+            "request_body": self.request_body, "status": self.status,
+            "response_headers": self.response_headers, "size": self.size, "error": self.error,
+        }
+        if self.content is not None:
+            try:
+                record["content"] = self.content.decode("utf-8")
+            except UnicodeDecodeError:
+                record["content_b64"] = base64.b64encode(self.content).decode("ascii")
+        return record
+
+    @classmethod
+    def from_record(cls, record: Dict[str, Any]) -> "Exchange":
+        if "content" in record:
+            content = record["content"].encode("utf-8")
+        elif "content_b64" in record:
+            content = base64.b64decode(record["content_b64"])
+        else:
+            content = None
+        return cls(
+            at=record["at"], elapsed=record["elapsed"], method=record["method"], url=record["url"],
+            request_headers=record.get("request_headers", {}), body_hash=record.get("body_hash"),
+            request_body=record.get("request_body"), status=record.get("status"),
+            response_headers=record.get("response_headers", {}), content=content,
+            size=record.get("size", 0), error=record.get("error"),
+        )
+
+
+def _request_body(kwargs: Dict[str, Any]) -> Optional[bytes]:
+    """requests 参数中的请求体：data 原样使用，表单与上传文件按字段名排序后拼接"""
+    parts = []
+    data = kwargs.get("data")
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    if isinstance(data, bytes):
+        parts.append(data)
+    elif data is not None:
+        parts.append(codec.encode(data))
+    for name, value in sorted((kwargs.get("files") or {}).items()):
+        content = value[1] if isinstance(value, tuple) else value
+        parts.append(name.encode("utf-8"))
+        if isinstance(content, str):
+            parts.append(content.encode("utf-8"))
+        elif isinstance(content, bytes):
+            parts.append(content)
+    return b"\0".join(parts) if parts else None
+
+
+def _redact(headers: Optional[Any]) -> Dict[str, str]:
+    return {k: v for k, v in (headers or {}).items() if k.lower() not in REDACTED_HEADERS}
+
+
+def load_cassette(path: str) -> List[Exchange]:
+    """
+    读取 cassette 中的全部交换
+
+    录制进程异常退出时文件末尾可能不完整，已完整写入的记录仍然可用。
+    """
+    exchanges = []
+    with gzip.open(path, "rb") as f:
+        try:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                record = codec.decode(line)
+                if "cassette" in record:
+                    if record["cassette"] != CASSETTE_VERSION:
+                        raise ValueError(f"不支持的 cassette 版本: {record['cassette']}")
+                    continue
+                exchanges.append(Exchange.from_record(record))
+        except (EOFError, zlib.error, gzip.BadGzipFile):
+            pass
+    return exchanges
+
+
+class CassetteRecorder:
+    """
+    录制到一个 cassette 文件
+
+    多个生成器（可以是不同供应商）可以共享同一个录制器，交换按完成顺序追加，时间以录制器创建时刻为起点。
+    """
+
+    def __init__(self, path: str, max_request_body: int = 64 * 1024, record_streams: bool = False):
+        """
+        Args:
+            path: cassette 路径，已存在时覆盖
+            max_request_body: 保存请求体文本的上限(字节)，超出时只保存哈希（例如内联的 data URL 图片）
+            record_streams: 是否录制流式下载的内容，默认只记录长度，回放时以等长的零字节代替
+        """
+        self.path = path
+        self.max_request_body = max_request_body
+        self.record_streams = record_streams
+        self._file = gzip.open(path, "wb")
+        self._file.write(codec.encode({"cassette": CASSETTE_VERSION, "started": time.time()}) + b"\n")
+        self._started = time.monotonic()
+        self._lock = threading.Lock()
+
+    def wrap(self, transport: Optional[Transport] = None) -> "RecordingTransport":
+        """包装一个 transport，为空时使用新的 RequestsTransport"""
+        return RecordingTransport(transport or RequestsTransport(), self)
+
+    def write(self, exchange: Exchange):
+        line = codec.encode(exchange.to_record()) + b"\n"
+        with self._lock:
+            if self._file is not None:
+                self._file.write(line)
+
+    def now(self) -> float:
+        """距录制开始的时间(秒)"""
+        return time.monotonic() - self._started
+
+    def flush(self):
+        """将缓冲的记录写入文件"""
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+
+    def close(self):
+        """结束录制，之后的交换不再写入"""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def __enter__(self) -> "CassetteRecorder":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class RecordingTransport:
+    """转发到原 transport 并把交换写入录制器"""
+
+    def __init__(self, inner: Transport, recorder: CassetteRecorder):
+        self.inner = inner
+        self.recorder = recorder
+
+    def request(self, method: str, url: str, headers: Optional[Dict[str, str]] = None,
+                timeout: Timeout = None, **kwargs: Any) -> requests.Response:
+        """发送请求并录制"""
+        body = _request_body(kwargs)
+        exchange = Exchange(
+            at=self.recorder.now(), elapsed=0.0, method=method, url=url, request_headers=_redact(headers),
+            body_hash=hashlib.sha256(body).hexdigest() if body is not None else None,
+        )
+        if body is not None and len(body) <= self.recorder.max_request_body:
+            exchange.request_body = body.decode("utf-8", errors="replace")
+
+        started = time.monotonic()
+        try:
+            response = self.inner.request(method, url, headers=headers, timeout=timeout, **kwargs)
+        except requests.RequestException as e:
+            exchange.elapsed = time.monotonic() - started
+            exchange.error = type(e).__name__
+            self.recorder.write(exchange)
+            raise
+        exchange.elapsed = time.monotonic() - started
+        exchange.status = response.status_code
+        exchange.response_headers = _redact(response.headers)
+        if not kwargs.get("stream") or self.recorder.record_streams:
+            exchange.content = response.content
+            exchange.size = len(exchange.content)
+        else:
+            exchange.size = int(response.headers.get("Content-Length") or 0)
+        self.recorder.write(exchange)
+        return response
+
+    def warm(self, url: str, connections: int = 2, timeout: float = 5.0) -> int:
+        """预热请求不录制"""
+        return self.inner.warm(url, connections, timeout)
+
+    def close(self):
+        self.inner.close()
+
+
+_ERRORS = {
+    "ConnectTimeout": requests.ConnectTimeout,
+    "ReadTimeout": requests.ReadTimeout,
+    "Timeout": requests.Timeout,
+    "SSLError": requests.exceptions.SSLError,
+    "ChunkedEncodingError": requests.exceptions.ChunkedEncodingError,
+}
+
+
+class ReplayTransport:
+    """
+    从 cassette 回放，不访问网络
+
+    请求按 (方法, 路径与查询参数, 请求体哈希) 匹配，忽略主机名，接入点切换不影响匹配；
+    请求体不同（例如新版本改变了请求字段）时退回到只按方法与路径匹配。
+    - 提交等非 GET 请求按录制顺序依次返回，用完后重复最后一个
+    - 按时回放时，GET 请求返回回放时钟对应时刻最近一次录制的响应，查询频率改变后任务仍在原来的时刻完成；
+      speed 为 None 时 GET 也按顺序返回
+    回放时钟从第一个请求（或 start()）开始，对应录制中第一个交换的时刻。
+    """
+
+    def __init__(self, cassette: Union[str, List[Exchange]], speed: Optional[float] = 1.0):
+        """
+        Args:
+            cassette: cassette 路径或已读取的交换
+            speed: 回放倍速，1 为原始耗时，None 表示不等待
+        """
+        exchanges = load_cassette(cassette) if isinstance(cassette, str) else list(cassette)
+        exchanges.sort(key=lambda exchange: exchange.at)
+        self.speed = speed
+        self.exchanges = exchanges
+        self._origin = exchanges[0].at if exchanges else 0.0
+        self._exact: Dict[tuple, List[Exchange]] = {}
+        self._loose: Dict[tuple, List[Exchange]] = {}
+        for exchange in exchanges:
+            self._exact.setdefault(self._key(exchange.method, exchange.url, exchange.body_hash), []).append(exchange)
+            self._loose.setdefault(self._key(exchange.method, exchange.url), []).append(exchange)
+        self._times = {key: [exchange.at for exchange in group] for key, group in self._exact.items()}
+        self._times.update({key: [exchange.at for exchange in group] for key, group in self._loose.items()})
+        self._cursors: Dict[tuple, int] = {}
+        self._started: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(method: str, url: str, *body_hash: Optional[str]) -> tuple:
+        parts = urlsplit(url)
+        target = f"{parts.path}?{parts.query}" if body_hash else parts.path
+        return (method, target) + body_hash
+
+    def start(self):
+        """开始回放时钟"""
+        with self._lock:
+            self._started = time.monotonic()
+
+    def _clock(self) -> float:
+        """回放时钟对应的录制时刻"""
+        if self._started is None:
+            self._started = time.monotonic()
+        return self._origin + (time.monotonic() - self._started) * self.speed
+
+    def _match(self, method: str, url: str, body_hash: Optional[str]) -> Exchange:
+        key = self._key(method, url, body_hash)
+        group = self._exact.get(key)
+        if group is None:
+            key = self._key(method, url)
+            group = self._loose.get(key)
+        if group is None:
+            raise CassetteMiss(f"cassette 中没有匹配的请求: {method} {url}")
+        with self._lock:
+            if method == "GET" and self.speed:
+                index = bisect.bisect_right(self._times[key], self._clock()) - 1
+                return group[max(index, 0)]
+            cursor = self._cursors.get(key, 0)
+            self._cursors[key] = cursor + 1
+            return group[min(cursor, len(group) - 1)]
+
+    @staticmethod
+    def _response(exchange: Exchange, url: str) -> requests.Response:
+        response = requests.Response()
+        response.status_code = exchange.status
+        response.headers = CaseInsensitiveDict(exchange.response_headers)
+        response._content = exchange.content if exchange.content is not None else bytes(exchange.size)
+        response._content_consumed = True
+        response.url = url
+        try:
+            response.reason = HTTPStatus(exchange.status).phrase
+        except ValueError:
+            response.reason = ""
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.elapsed = timedelta(seconds=exchange.elapsed)
+        return response
+
+    def request(self, method: str, url: str, headers: Optional[Dict[str, str]] = None,
+                timeout: Timeout = None, **kwargs: Any) -> requests.Response:
+        """
+        返回录制的响应
+
+        按倍速等待录制时的耗时，超过读取超时时与真实请求一样抛出 ReadTimeout；
+        录制时失败的请求抛出同类的 requests 异常。
+
+        Raises:
+            CassetteMiss: 没有匹配的录制
+        """
+        body = _request_body(kwargs)
+        exchange = self._match(method, url, hashlib.sha256(body).hexdigest() if body is not None else None)
+        delay = exchange.elapsed / self.speed if self.speed else 0.0
+        read_timeout = timeout[1] if isinstance(timeout, tuple) else timeout
+        if read_timeout is not None and delay > read_timeout:
+            time.sleep(read_timeout)
+            raise requests.ReadTimeout(f"回放 {method} {url} 超过读取超时")
+        if delay > 0:
+            time.sleep(delay)
+        if exchange.error is not None:
+            raise _ERRORS.get(exchange.error, requests.ConnectionError)(f"回放 {method} {url}: {exchange.error}")
+        return self._response(exchange, url)
+
+    def warm(self, url: str, connections: int = 2, timeout: float = 5.0) -> int:
+        """回放时没有连接需要预热"""
+        return connections
+
+    def close(self):
+        pass
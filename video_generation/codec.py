@@ -0,0 +1,106 @@
+"""
+JSON 编解码层
+
+所有供应商的请求体编码和响应体解码都经过这里：
+- 安装了 orjson 或 msgspec 时优先使用，否则回退到标准库 json
+- 编码时顺带剔除值为 None 的字段，不再单独做一遍过滤
+- 解码直接基于响应的原始字节，跳过 requests 的文本解码
+"""
+
+import json
+from typing import Any, Callable, Dict, Tuple, Union
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - 可选依赖
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:  # pragma: no cover - 可选依赖
+    msgspec = None
+
+JSON_CONTENT_TYPE = "application/json"
+
+Encoder = Callable[[Any], bytes]
+Decoder = Callable[[Union[bytes, str]], Any]
+
+
+def _stdlib_encode(obj: Any) -> bytes:
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+_BACKENDS: Dict[str, Tuple[Encoder, Decoder]] = {
+    "json": (_stdlib_encode, json.loads),
+}
+
+if msgspec is not None:
+    _msgspec_encoder = msgspec.json.Encoder()
+    _msgspec_decoder = msgspec.json.Decoder()
+    _BACKENDS["msgspec"] = (_msgspec_encoder.encode, _msgspec_decoder.decode)
+
+if orjson is not None:
+    _BACKENDS["orjson"] = (orjson.dumps, orjson.loads)
+
+# 按性能从高到低的优先顺序
+_PREFERRED = ("orjson", "msgspec", "json")
+
+backend = next(name for name in _PREFERRED if name in _BACKENDS)
+_encode, _decode = _BACKENDS[backend]
+
+
+def available_backends() -> list:
+    """返回当前环境可用的编解码后端"""
+    return [name for name in _PREFERRED if name in _BACKENDS]
+
+
+def use_backend(name: str) -> None:
+    """
+    切换编解码后端
+
+    Args:
+        name: 后端名称，可选 orjson / msgspec / json
+
+    Raises:
+        ValueError: 后端未安装或不存在
+    """
+    global backend, _encode, _decode
+    if name not in _BACKENDS:
+        raise ValueError(f"不可用的JSON后端: {name}，可用: {available_backends()}")
+    backend = name
+    _encode, _decode = _BACKENDS[name]
+
+
+def _drop_none(obj: Any) -> Any:
+    """递归剔除字典中值为None的字段"""
+    if isinstance(obj, dict):
+        return {k: _drop_none(v) for k, v in obj.items() if v is not None}
+    if isinstance(obj, list):
+        return [_drop_none(v) for v in obj]
+    return obj
+
+
+def encode(payload: Any) -> bytes:
+    """
+    将请求体编码为JSON字节，同时剔除值为None的字段
+
+    Args:
+        payload: 请求体
+
+    Returns:
+        bytes: UTF-8编码的JSON
+    """
+    return _encode(_drop_none(payload))
+
+
+def decode(data: Union[bytes, str]) -> Any:
+    """
+    解码JSON响应
+
+    Args:
+        data: 响应的原始字节（response.content）
+
+    Returns:
+        解码后的对象
+    """
+    return _decode(data)
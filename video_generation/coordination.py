@@ -0,0 +1,300 @@
+"""
+多节点任务协调
+
+多个工作节点共享同一组进行中的任务，每个任务通过租约归属于一个节点，
+只有持有租约的节点负责轮询；节点停止续约（进程退出、宕机）后，
+租约过期，任务由其他节点接管。后端可替换，内置基于 SQLite 的实现，
+适用于同一主机的多个进程以及测试。
+"""
+
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from video_generation.base import BaseVideoGenerator, VideoTaskStatus
+from video_generation.poller import TaskPoller
+
+logger = logging.getLogger(__name__)
+
+TaskKey = Tuple[str, str]  # (供应商, 任务ID)
+StatusListener = Callable[[VideoTaskStatus], None]
+
+
+class CoordinationBackend:
+    """协调后端接口，租约时间统一使用墙上时间(time.time())"""
+
+    def add(self, provider: str, task_id: str, owner: str, ttl: float):
+        """登记新任务，并由提交节点持有租约"""
+        raise NotImplementedError
+
+    def claim(self, owner: str, providers: Sequence[str], limit: int, ttl: float) -> List[TaskKey]:
+        """认领无人持有或租约已过期的任务"""
+        raise NotImplementedError
+
+    def renew(self, owner: str, ttl: float) -> Set[TaskKey]:
+        """续约节点持有的全部任务，返回续约后仍持有的任务"""
+        raise NotImplementedError
+
+    def complete(self, provider: str, task_id: str, owner: str):
+        """任务进入终态后移除"""
+        raise NotImplementedError
+
+    def release(self, owner: str):
+        """放弃节点持有的全部租约，其他节点可立即接管"""
+        raise NotImplementedError
+
+
+class SqliteCoordinationBackend(CoordinationBackend):
+    """基于 SQLite 的协调后端"""
+
+    def __init__(self, path: str, busy_timeout: float = 10.0):
+        """
+        Args:
+            path: 数据库文件路径，所有节点指向同一个文件
+            busy_timeout: 等待其他节点释放写锁的时间(秒)
+        """
+        self.path = path
+        self.busy_timeout = busy_timeout
+        self._local = threading.local()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = self._connection()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS tasks ("
+            " provider TEXT NOT NULL,"
+            " task_id TEXT NOT NULL,"
+            " owner TEXT,"
+            " lease_until REAL NOT NULL,"
+            " added_at REAL NOT NULL,"
+            " PRIMARY KEY (provider, task_id))"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS tasks_lease ON tasks (lease_until)")
+
+    def _connection(self) -> sqlite3.Connection:
+        # sqlite3 连接不能跨线程使用，每个线程各自持有一个
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.busy_timeout, isolation_level=None)
+            self._local.conn = conn
+        return conn
+
+    def add(self, provider: str, task_id: str, owner: str, ttl: float):
+        now = time.time()
+        self._connection().execute(
+            "INSERT OR REPLACE INTO tasks (provider, task_id, owner, lease_until, added_at) VALUES (?, ?, ?, ?, ?)",
+            (provider, task_id, owner, now + ttl, now),
+        )
+
+    def claim(self, owner: str, providers: Sequence[str], limit: int, ttl: float) -> List[TaskKey]:
+        if limit <= 0 or not providers:
+            return []
+        conn = self._connection()
+        now = time.time()
+        placeholders = ",".join("?" * len(providers))
+        # BEGIN IMMEDIATE 取得写锁，保证同一任务只会被一个节点认领
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            rows = conn.execute(
+                f"SELECT provider, task_id FROM tasks WHERE provider IN ({placeholders})"
+                " AND (owner IS NULL OR lease_until < ?) ORDER BY added_at LIMIT ?",
+                (*providers, now, limit),
+            ).fetchall()
+            conn.executemany(
+                "UPDATE tasks SET owner = ?, lease_until = ? WHERE provider = ? AND task_id = ?",
+                [(owner, now + ttl, provider, task_id) for provider, task_id in rows],
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return [(provider, task_id) for provider, task_id in rows]
+
+    def renew(self, owner: str, ttl: float) -> Set[TaskKey]:
+        conn = self._connection()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # 已过期但尚未被接管的租约仍可续约
+            conn.execute("UPDATE tasks SET lease_until = ? WHERE owner = ?", (now + ttl, owner))
+            rows = conn.execute("SELECT provider, task_id FROM tasks WHERE owner = ?", (owner,)).fetchall()
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return {(provider, task_id) for provider, task_id in rows}
+
+    def complete(self, provider: str, task_id: str, owner: str):
+        self._connection().execute(
+            "DELETE FROM tasks WHERE provider = ? AND task_id = ? AND owner = ?", (provider, task_id, owner)
+        )
+
+    def release(self, owner: str):
+        self._connection().execute("UPDATE tasks SET owner = NULL, lease_until = 0 WHERE owner = ?", (owner,))
+
+    def count(self) -> int:
+        """进行中的任务总数"""
+        return self._connection().execute("SELECT COUNT(*) FROM tasks").fetchone()[0]
+
+
+class Coordinator:
+    """
+    节点协调器
+
+    用法::
+
+        backend = SqliteCoordinationBackend("/var/lib/video/coordination.db")
+        with Coordinator(backend, [tongyi_generator, vidu_generator]) as coordinator:
+            coordinator.add_listener(handle_finished)
+            task = tongyi_generator.text_to_video(request)
+            coordinator.track(tongyi_generator, task.task_id)
+    """
+
+    def __init__(self,
+                 backend: CoordinationBackend,
+                 generators: Iterable[BaseVideoGenerator],
+                 node_id: Optional[str] = None,
+                 lease_ttl: float = 30.0,
+                 max_tasks: int = 1000,
+                 poller: Optional[TaskPoller] = None):
+        """
+        Args:
+            backend: 协调后端
+            generators: 本节点可以轮询的生成器，每个供应商一个
+            node_id: 节点标识，默认由主机名、进程号与随机数组成
+            lease_ttl: 租约有效期(秒)，每 1/3 有效期续约一次
+            max_tasks: 本节点最多同时负责的任务数
+            poller: 使用的轮询器，默认使用进程共享的默认轮询器
+        """
+        self.backend = backend
+        self.generators: Dict[str, BaseVideoGenerator] = {g.provider.value: g for g in generators}
+        self.node_id = node_id or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self.lease_ttl = lease_ttl
+        self.max_tasks = max_tasks
+        self._poller = poller
+        self._listeners: List[StatusListener] = []
+        self._watching: Dict[TaskKey, Callable[[], None]] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _get_poller(self, generator: BaseVideoGenerator) -> TaskPoller:
+        return self._poller or generator._get_poller()
+
+    def add_listener(self, listener: StatusListener):
+        """注册监听函数，本节点负责的任务进入终态时调用"""
+        self._listeners.append(listener)
+
+    def owned(self) -> Set[TaskKey]:
+        """本节点当前负责轮询的任务"""
+        with self._lock:
+            return set(self._watching)
+
+    def track(self, generator: BaseVideoGenerator, task_id: str):
+        """
+        登记新提交的任务，由本节点持有租约并开始轮询
+
+        Args:
+            generator: 任务所属的生成器
+            task_id: 任务ID
+        """
+        self.backend.add(generator.provider.value, task_id, self.node_id, self.lease_ttl)
+        self._watch((generator.provider.value, task_id))
+
+    def _watch(self, key: TaskKey):
+        generator = self.generators.get(key[0])
+        if generator is None:
+            return
+        with self._lock:
+            if key in self._watching:
+                return
+            self._watching[key] = lambda: None
+        unsubscribe = self._get_poller(generator).subscribe(
+            generator, key[1], lambda status: self._on_status(key, status))
+        with self._lock:
+            if key in self._watching:
+                self._watching[key] = unsubscribe
+            else:
+                unsubscribe()
+
+    def _unwatch(self, key: TaskKey):
+        with self._lock:
+            unsubscribe = self._watching.pop(key, None)
+        if unsubscribe is not None:
+            unsubscribe()
+
+    def _on_status(self, key: TaskKey, status: VideoTaskStatus):
+        if not status.status.is_terminal:
+            return
+        with self._lock:
+            self._watching.pop(key, None)
+        try:
+            self.backend.complete(key[0], key[1], self.node_id)
+        except Exception:
+            logger.warning("移除已结束的任务失败: %s/%s", key[0], key[1], exc_info=True)
+        for listener in self._listeners:
+            try:
+                listener(status)
+            except Exception:
+                logger.exception("任务结束回调执行失败: %s", status.task_id)
+
+    def sync(self):
+        """续约本节点的任务，放弃已失去租约的任务，并认领无人负责的任务"""
+        owned = self.backend.renew(self.node_id, self.lease_ttl)
+        for key in self.owned() - owned:
+            # 续约不及时被其他节点接管，本节点不再轮询
+            self._unwatch(key)
+        for key in owned:
+            self._watch(key)
+
+        claimed = self.backend.claim(self.node_id, list(self.generators), self.max_tasks - len(owned),
+                                     self.lease_ttl)
+        for key in claimed:
+            self._watch(key)
+
+    def start(self) -> "Coordinator":
+        """在后台线程定期同步"""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+
+            def run():
+                while True:
+                    try:
+                        self.sync()
+                    except Exception:
+                        logger.warning("任务协调同步失败: %s", self.node_id, exc_info=True)
+                    if self._stop.wait(self.lease_ttl / 3):
+                        return
+
+            self._thread = threading.Thread(target=run, name="video-coordinator", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, release: bool = True):
+        """
+        停止同步
+
+        Args:
+            release: 是否立即放弃租约，让其他节点无需等待租约过期即可接管
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        for key in self.owned():
+            self._unwatch(key)
+        if release:
+            self.backend.release(self.node_id)
+
+    def __enter__(self) -> "Coordinator":
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
@@ -0,0 +1,108 @@
+"""
+超时与截止时间
+
+Timeouts 描述单次HTTP调用的分阶段超时，按供应商配置；
+Deadline 描述一次完整操作（提交、轮询、下载）的总时限，剩余时间随各阶段递减，
+耗尽后后续调用直接抛出 DeadlineExceeded。
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Iterator, Optional, Tuple
+
+from video_generation.errors import DeadlineExceeded
+
+
+@dataclass(frozen=True)
+class Timeouts:
+    """单次HTTP调用的超时配置(秒)"""
+    connect: float = 10.0  # 建立连接（含TLS握手）超时
+    read: float = 60.0  # 两次读取之间的最长间隔
+    total: Optional[float] = None  # 单次调用总时长上限，None 表示不限
+
+
+_current: ContextVar[Optional["Deadline"]] = ContextVar("video_generation_deadline", default=None)
+
+
+class Deadline:
+    """
+    操作截止时间
+
+    可直接传给 text_to_video 等方法、watch、as_completed 和下载，
+    也可以通过 deadline_scope 使范围内的所有HTTP调用共享同一时限::
+
+        deadline = Deadline(120)
+        task = generator.text_to_video(request, deadline=deadline)
+        for status in generator.watch(task.task_id, deadline=deadline):
+            ...
+
+        with deadline_scope(deadline):
+            generator.get_task_status(task_id)
+    """
+
+    def __init__(self, seconds: float):
+        """
+        Args:
+            seconds: 从现在起的可用时间(秒)
+        """
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        """剩余时间(秒)，已过期时为0"""
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return time.monotonic() >= self.expires_at
+
+    def check(self, action: str = "操作"):
+        """
+        检查是否已过期
+
+        Raises:
+            DeadlineExceeded: 已超过截止时间
+        """
+        if self.expired:
+            raise DeadlineExceeded(f"{action}超过截止时间")
+
+    def http_timeout(self, timeouts: Timeouts) -> Tuple[float, float]:
+        """按剩余时间收紧单次调用的 (connect, read) 超时"""
+        remaining = self.remaining()
+        return min(timeouts.connect, remaining), min(timeouts.read, remaining)
+
+    def earliest(self, other: Optional["Deadline"]) -> "Deadline":
+        """返回两者中更早到期的一个"""
+        if other is None or self.expires_at <= other.expires_at:
+            return self
+        return other
+
+    def __repr__(self) -> str:
+        return f"Deadline(remaining={self.remaining():.3f}s)"
+
+
+def current_deadline() -> Optional[Deadline]:
+    """当前上下文生效的截止时间"""
+    return _current.get()
+
+
+@contextmanager
+def deadline_scope(deadline: Optional[Deadline]) -> Iterator[Optional[Deadline]]:
+    """在范围内生效指定的截止时间，为 None 时不做任何改变"""
+    if deadline is None:
+        yield current_deadline()
+        return
+    token = _current.set(deadline.earliest(_current.get()))
+    try:
+        yield _current.get()
+    finally:
+        _current.reset(token)
+
+
+def effective_deadline(timeouts: Timeouts) -> Optional[Deadline]:
+    """结合当前截止时间与单次调用总时长，得到本次调用的截止时间"""
+    deadline = current_deadline()
+    if timeouts.total is not None:
+        deadline = Deadline(timeouts.total).earliest(deadline)
+    return deadline
@@ -0,0 +1,64 @@
+"""
+视频下载
+"""
+
+import os
+from typing import Dict, Optional
+
+import requests
+
+from video_generation.deadline import Timeouts, effective_deadline
+from video_generation.transport import Transport
+
+CHUNK_SIZE = 1 << 20
+
+
+def download_video(url: str, path: str, headers: Optional[Dict[str, str]] = None,
+                   chunk_size: int = CHUNK_SIZE, timeouts: Timeouts = Timeouts(),
+                   transport: Optional[Transport] = None) -> int:
+    """
+    流式下载视频到本地文件
+
+    先写入临时文件，下载完成后再重命名，避免留下不完整的文件。
+    当前截止时间与 timeouts.total 在每个数据块之间检查，到期即中止下载。
+
+    Args:
+        url: 视频地址
+        path: 保存路径
+        headers: 额外请求头（如需要鉴权的结果地址）
+        chunk_size: 每次写入的块大小
+        timeouts: 超时配置
+        transport: 复用的HTTP传输，默认使用独立连接
+
+    Returns:
+        int: 下载的字节数
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    deadline = effective_deadline(timeouts)
+    if deadline is not None:
+        deadline.check("下载视频")
+        timeout = deadline.http_timeout(timeouts)
+    else:
+        timeout = (timeouts.connect, timeouts.read)
+
+    tmp_path = f"{path}.part"
+    written = 0
+    try:
+        send = transport.request if transport is not None else requests.request
+        with send("GET", url, headers=headers, stream=True, timeout=timeout) as response:
+            response.raise_for_status()
+            with open(tmp_path, "wb") as f:
+                for chunk in response.iter_content(chunk_size=chunk_size):
+                    f.write(chunk)
+                    written += len(chunk)
+                    if deadline is not None:
+                        deadline.check("下载视频")
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return written
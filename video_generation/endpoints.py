@@ -0,0 +1,169 @@
+"""
+供应商接入点选择
+
+每个供应商可以配置多个接入点（不同区域/域名），通过低成本的探测
+（仅建立TCP连接并完成TLS握手，不发送HTTP请求）测量往返时间，
+选择最快的健康接入点，连接失败时自动切换。
+"""
+
+import socket
+import ssl
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import List, Optional, Sequence
+from urllib.parse import urlsplit
+
+
+@dataclass
+class Endpoint:
+    """单个接入点"""
+    url: str  # 基础地址，例如: "https://dashscope.aliyuncs.com/api/v1"
+    rtt: Optional[float] = None  # 最近一次探测的握手耗时(秒)，未探测时为 None
+    healthy: bool = True  # 是否健康
+    failed_at: float = 0.0  # 最近一次失败时间(monotonic)
+
+
+class EndpointSet:
+    """
+    接入点集合
+
+    用法::
+
+        generator.endpoints = EndpointSet([
+            "https://api.siliconflow.cn/v1",
+            "https://api.ap.siliconflow.com/v1",
+        ])
+
+    配置了多个接入点时，第一次选择接入点时自动在后台开始定期探测。
+    """
+
+    def __init__(self, urls: Sequence[str], retry_after: float = 30.0, probe_timeout: float = 3.0,
+                 probe_interval: Optional[float] = 300.0):
+        """
+        Args:
+            urls: 接入点基础地址，按优先级排列，未探测前使用第一个
+            retry_after: 失败的接入点多久后重新参与选择(秒)
+            probe_timeout: 单次探测超时(秒)
+            probe_interval: 自动探测的间隔(秒)，None 时只在调用 start_probing() 后探测
+        """
+        if not urls:
+            raise ValueError("至少需要一个接入点")
+        self.endpoints: List[Endpoint] = [Endpoint(url.rstrip("/")) for url in urls]
+        self.retry_after = retry_after
+        self.probe_timeout = probe_timeout
+        self.probe_interval = probe_interval
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._auto_started = False
+
+    @property
+    def current(self) -> str:
+        """当前应使用的接入点地址"""
+        if not self._auto_started:
+            self._start_auto_probing()
+        now = time.monotonic()
+        with self._lock:
+            candidates = [e for e in self.endpoints
+                          if e.healthy or now - e.failed_at >= self.retry_after]
+            if not candidates:
+                # 全部失败时使用最早失败的一个，它最有可能已经恢复
+                return min(self.endpoints, key=lambda e: e.failed_at).url
+            # 已探测的按耗时排序，未探测的保持配置顺序排在后面
+            best = min(candidates, key=lambda e: (e.rtt is None, e.rtt or 0.0, self.endpoints.index(e)))
+            return best.url
+
+    def _start_auto_probing(self):
+        with self._lock:
+            if self._auto_started:
+                return
+            self._auto_started = True
+        if self.probe_interval is not None:
+            self.start_probing(self.probe_interval)
+
+    def endpoint_for(self, url: str) -> Optional[Endpoint]:
+        """查找请求地址所属的接入点"""
+        for endpoint in self.endpoints:
+            if url.startswith(endpoint.url):
+                return endpoint
+        return None
+
+    def mark_failed(self, url: str) -> bool:
+        """
+        标记请求地址所属的接入点失败
+
+        Returns:
+            bool: 是否存在可切换的其他接入点
+        """
+        endpoint = self.endpoint_for(url)
+        if endpoint is None:
+            return False
+        with self._lock:
+            endpoint.healthy = False
+            endpoint.failed_at = time.monotonic()
+        return self.current != endpoint.url
+
+    def rebase(self, url: str) -> str:
+        """将请求地址改写到当前接入点"""
+        endpoint = self.endpoint_for(url)
+        if endpoint is None:
+            return url
+        return self.current + url[len(endpoint.url):]
+
+    def _measure(self, endpoint: Endpoint) -> Optional[float]:
+        parts = urlsplit(endpoint.url)
+        port = parts.port or (443 if parts.scheme == "https" else 80)
+        start = time.perf_counter()
+        try:
+            with socket.create_connection((parts.hostname, port), timeout=self.probe_timeout) as sock:
+                if parts.scheme == "https":
+                    context = ssl.create_default_context()
+                    with context.wrap_socket(sock, server_hostname=parts.hostname):
+                        pass
+        except (OSError, ssl.SSLError):
+            return None
+        return time.perf_counter() - start
+
+    def probe(self) -> List[Endpoint]:
+        """
+        并发探测所有接入点
+
+        Returns:
+            List[Endpoint]: 探测后的接入点状态
+        """
+        with ThreadPoolExecutor(max_workers=len(self.endpoints)) as executor:
+            results = list(executor.map(self._measure, self.endpoints))
+
+        now = time.monotonic()
+        with self._lock:
+            for endpoint, rtt in zip(self.endpoints, results):
+                if rtt is None:
+                    endpoint.healthy = False
+                    endpoint.failed_at = now
+                else:
+                    endpoint.rtt = rtt
+                    endpoint.healthy = True
+        return list(self.endpoints)
+
+    def start_probing(self, interval: float = 300.0):
+        """启动后台定期探测，只有一个接入点时无需探测"""
+        self._auto_started = True
+        if len(self.endpoints) < 2 or (self._thread is not None and self._thread.is_alive()):
+            return
+        self._stop.clear()
+
+        def run():
+            while True:
+                self.probe()
+                if self._stop.wait(interval):
+                    return
+
+        self._thread = threading.Thread(target=run, name="video-endpoint-probe", daemon=True)
+        self._thread.start()
+
+    def stop_probing(self):
+        """停止后台探测，之后不会再自动开始"""
+        self._auto_started = True
+        self._stop.set()
@@ -0,0 +1,38 @@
+"""
+视频生成相关异常
+"""
+
+from typing import Any
+
+
+class VideoGenerationError(Exception):
+    """视频生成异常基类"""
+
+
+class SubmissionError(VideoGenerationError):
+    """批量提交中单个请求失败"""
+
+    def __init__(self, index: int, request: Any, cause: BaseException):
+        """
+        Args:
+            index: 请求在批次中的位置
+            request: 提交失败的请求
+            cause: 原始异常
+        """
+        super().__init__(f"第{index}个请求提交失败: {cause!r}")
+        self.index = index
+        self.request = request
+        self.cause = cause
+        self.__cause__ = cause
+
+
+class DeadlineExceeded(VideoGenerationError, TimeoutError):
+    """超过截止时间，剩余时间不足以继续执行"""
+
+
+class InvalidVideoError(VideoGenerationError, ValueError):
+    """结果文件不是可解析的 MP4"""
+
+
+class CassetteMiss(VideoGenerationError, LookupError):
+    """回放时 cassette 中没有与请求匹配的记录"""
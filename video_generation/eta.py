@@ -0,0 +1,152 @@
+"""
+任务耗时预估
+
+多数供应商不返回进度与预计剩余时间（进度只有 0 和 1）。预估器记录本进程提交的任务从提交到完成的实际耗时，
+按 (供应商, 模型, 分辨率, 时长) 分组，用近期耗时的中位数推算：
+- 进行中任务的 progress 与 estimated_time
+- 预计完成时间，轮询器据此跳过离完成还早的查询
+
+样本不足时依次退回到 (供应商, 模型) 与供应商级别的统计，仍然不足时不做预估。
+"""
+
+import threading
+import time
+from collections import deque
+from dataclasses import replace
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Deque, Dict, Optional, Tuple
+
+if TYPE_CHECKING:
+    from video_generation.base import VideoRequest, VideoTaskStatus
+
+EtaKey = Tuple[str, Optional[str], Optional[str], Optional[int]]
+
+
+def eta_key(provider: str, model: Optional[str], request: "VideoRequest") -> EtaKey:
+    """任务的统计分组，未指定分辨率时以宽高代替"""
+    resolution = request.resolution or f"{request.width}x{request.height}"
+    return provider, model, resolution, request.duration
+
+
+class EtaEstimator:
+    """按供应商、模型、分辨率与时长学习任务耗时"""
+
+    def __init__(self, window: int = 100, min_samples: int = 3, max_progress: float = 0.99,
+                 max_tracked: int = 100000):
+        """
+        Args:
+            window: 每个分组保留的最近样本数
+            min_samples: 分组参与预估所需的最少样本数
+            max_progress: 预估进度的上限，超过预计时间的任务停在该值直到真正完成
+            max_tracked: 最多跟踪的进行中任务数，超出时丢弃最早提交的任务
+        """
+        self.window = window
+        self.min_samples = min_samples
+        self.max_progress = max_progress
+        self.max_tracked = max_tracked
+        self._samples: Dict[tuple, Deque[float]] = {}
+        self._started: Dict[Tuple[str, str], Tuple[EtaKey, float]] = {}
+        self._lock = threading.Lock()
+
+    def started(self, provider: str, task_id: str, key: EtaKey):
+        """记录任务的提交时间"""
+        with self._lock:
+            self._started[(provider, task_id)] = (key, time.monotonic())
+            if len(self._started) > self.max_tracked:
+                del self._started[next(iter(self._started))]
+
+    def forget(self, provider: str, task_id: str):
+        """任务被取消或放弃，不再跟踪"""
+        with self._lock:
+            self._started.pop((provider, task_id), None)
+
+    def record(self, key: EtaKey, seconds: float):
+        """记录一次完成耗时，同时计入各级汇总分组"""
+        with self._lock:
+            for group in (key, key[:2], key[:1]):
+                samples = self._samples.get(group)
+                if samples is None:
+                    samples = self._samples[group] = deque(maxlen=self.window)
+                samples.append(seconds)
+
+    def expected_duration(self, key: tuple, exact_model: bool = False) -> Optional[float]:
+        """
+        分组的预计耗时(秒)，样本不足时返回 None
+
+        Args:
+            key: 完整分组，或其前缀 (供应商, 模型)、(供应商,)
+            exact_model: 不退回到供应商级别的统计，用于比较同一供应商的不同模型
+        """
+        with self._lock:
+            return self._expected(key, 2 if exact_model else 1)
+
+    def _expected(self, key: tuple, coarsest: int = 1) -> Optional[float]:
+        """依次尝试完整分组、(供应商, 模型) 与供应商级别，coarsest 为允许退回到的最短前缀"""
+        for size in (len(key), 2, 1):
+            if size < coarsest or size > len(key):
+                continue
+            group = key[:size]
+            samples = self._samples.get(group)
+            if samples is not None and len(samples) >= self.min_samples:
+                ordered = sorted(samples)
+                middle = len(ordered) // 2
+                if len(ordered) % 2:
+                    return ordered[middle]
+                return (ordered[middle - 1] + ordered[middle]) / 2
+        return None
+
+    def remaining(self, provider: str, task_id: str) -> Optional[float]:
+        """任务的预计剩余时间(秒)，未跟踪或样本不足时返回 None"""
+        with self._lock:
+            started = self._started.get((provider, task_id))
+            if started is None:
+                return None
+            expected = self._expected(started[0])
+        if expected is None:
+            return None
+        return max(0.0, expected - (time.monotonic() - started[1]))
+
+    def predicted_completion(self, provider: str, task_id: str) -> Optional[datetime]:
+        """任务的预计完成时间"""
+        remaining = self.remaining(provider, task_id)
+        if remaining is None:
+            return None
+        return datetime.now() + timedelta(seconds=remaining)
+
+    def observe(self, status: "VideoTaskStatus") -> "VideoTaskStatus":
+        """
+        处理一次查询结果
+
+        完成的任务记录耗时并结束跟踪；进行中的任务在供应商未提供时补充进度与预计剩余时间，
+        返回补充后的副本，供应商已提供的值不会被覆盖。
+
+        Args:
+            status: 供应商返回的任务状态
+
+        Returns:
+            VideoTaskStatus: 任务状态
+        """
+        from video_generation.base import TaskStatus
+
+        task = (status.provider.value, status.task_id)
+        if status.status.is_terminal:
+            with self._lock:
+                started = self._started.pop(task, None)
+            if started is not None and status.status == TaskStatus.COMPLETED:
+                self.record(started[0], time.monotonic() - started[1])
+            return status
+
+        if status.estimated_time is not None and status.progress > 0:
+            return status
+        with self._lock:
+            started = self._started.get(task)
+            expected = self._expected(started[0]) if started is not None else None
+        if expected is None or expected <= 0:
+            return status
+        elapsed = time.monotonic() - started[1]
+        changes = {}
+        if status.estimated_time is None:
+            changes["estimated_time"] = int(max(0.0, expected - elapsed))
+        if not status.progress:
+            changes["progress"] = round(min(self.max_progress, elapsed / expected), 2)
+        return replace(status, **changes)
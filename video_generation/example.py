@@ -2,14 +2,16 @@
 视频生成系统使用示例
 """
 
-import time
 import os
+import time
 from dotenv import load_dotenv
 from video_generation.factory import VideoGeneratorFactory
 from video_generation.base import (
     VideoProvider, TaskStatus,
     TextToVideoRequest, ImageToVideoRequest, SubjectReferenceRequest
 )
+from video_generation.coordination import Coordinator, SqliteCoordinationBackend
+from video_generation.errors import SubmissionError
 from video_generation.size_adapter import TongyiModel
 
 
@@ -18,8 +20,7 @@ def process_task(generator, task_id):
     print(f"任务ID: {task_id}")
     print("查询任务状态...")
 
-    while True:
-        status = generator.get_task_status(task_id)
+    for status in generator.watch(task_id):
         print(f"任务进度: {status.progress * 100:.1f}%")
         print(f"状态: {status.status.value}")
 
@@ -32,8 +33,7 @@ def process_task(generator, task_id):
             print(f"❌ 视频生成失败: {status.error_message}")
             return status
         else:
-            print("⏳ 任务处理中，等待5秒后重试...")
-            time.sleep(5)
+            print("⏳ 任务处理中，等待状态更新...")
 
 
 def text_to_video_example(generator):
@@ -91,19 +91,23 @@ def subject_reference_example(generator):
 def batch_processing_example(generator):
     """批量处理示例"""
     print("\n=== 批量处理示例 ===")
-    task_ids = []
-
-    # 创建多个任务
-    for i in range(3):
-        request = TextToVideoRequest(
+    # 并发创建多个任务
+    batch_requests = [
+        TextToVideoRequest(
             prompt=f"第{i + 1}个视频：美丽的风景",
             width=512,
             height=512,
             duration=3
         )
-        response = generator.text_to_video(request)
-        task_ids.append(response.task_id)
-        print(f"创建任务 {i + 1}: {response.task_id}")
+        for i in range(3)
+    ]
+    task_ids = []
+    for i, result in enumerate(generator.submit_many(batch_requests, max_concurrency=4)):
+        if isinstance(result, SubmissionError):
+            print(f"创建任务 {i + 1} 失败: {result.cause}")
+            continue
+        task_ids.append(result.task_id)
+        print(f"创建任务 {i + 1}: {result.task_id}")
 
     # 批量查询状态
     print("\n查询所有任务状态:")
@@ -112,6 +116,23 @@ def batch_processing_example(generator):
         print(f"任务 {task_id}: {status.status.value} ({status.progress * 100:.1f}%)")
 
 
+def multi_node_example(generators, db_path="/tmp/video_coordination.db"):
+    """多节点示例：同一脚本启动多个进程，每个任务只由一个进程轮询，进程退出后由其他进程接管"""
+    print("\n=== 多节点示例 ===")
+    backend = SqliteCoordinationBackend(db_path)
+    with Coordinator(backend, generators) as coordinator:
+        coordinator.add_listener(
+            lambda status: print(f"[{coordinator.node_id}] 任务 {status.task_id}: {status.status.value}"))
+
+        generator = generators[0]
+        task = generator.text_to_video(TextToVideoRequest(prompt="夕阳下的海浪", duration=4))
+        coordinator.track(generator, task.task_id)
+        print(f"[{coordinator.node_id}] 创建任务: {task.task_id}")
+
+        while backend.count():
+            time.sleep(5)
+
+
 def main():
     """示例用法"""
     # 加载环境变量
@@ -150,6 +171,7 @@ def main():
     image_to_video_example(default_generator)
     subject_reference_example(default_generator)
     batch_processing_example(default_generator)
+    # 多进程部署时改用: multi_node_example([tongyi_generator, vidu_generator])
 
 
 def check_provider_support():
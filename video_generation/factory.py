@@ -1,5 +1,10 @@
-from typing import Dict, Type
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Type, Union
 from video_generation.base import BaseVideoGenerator, VideoProvider
+from video_generation.deadline import Timeouts
+from video_generation.endpoints import EndpointSet
+from video_generation.keypool import ApiKeyPool
+from video_generation.transport import HTTP2Transport
 from video_generation.providers import (
     TongyiVideoGenerator,
     ViduVideoGenerator,
@@ -29,29 +34,47 @@ class VideoGeneratorFactory:
     @classmethod
     def create_generator(cls,
                          provider: VideoProvider,
-                         api_key: str,
+                         api_key: Union[str, List[str], ApiKeyPool],
                          api_secret: str = None,
-                         model: str = None) -> BaseVideoGenerator:
+                         model: str = None,
+                         timeouts: Optional[Timeouts] = None,
+                         endpoints: Optional[List[str]] = None,
+                         http2: bool = False,
+                         max_running: Optional[int] = None) -> BaseVideoGenerator:
         """
         创建视频生成器实例
         
         Args:
             provider: 供应商类型
-            api_key: API密钥
+            api_key: API密钥，可传入多个密钥或 ApiKeyPool 组成密钥池
             api_secret: API密钥(可选)
             model: 模型名称(可选)
+            timeouts: HTTP超时配置(可选)，默认使用供应商的配置
+            endpoints: 接入点基础地址列表(可选)，默认使用供应商的官方地址；多个地址时自动在后台探测
+            http2: 是否使用 HTTP/2 多路复用传输，需要安装 httpx[http2]
+            max_running: 每个密钥同时运行的生成任务数上限(可选)，超出的提交在本地排队
             
         Returns:
             BaseVideoGenerator: 视频生成器实例
             
         Raises:
             ValueError: 不支持的供应商类型
+            ImportError: 指定 http2 但未安装 httpx
         """
         generator_class = cls._generators.get(provider)
         if not generator_class:
             raise ValueError(f"不支持的供应商类型: {provider}")
 
-        return generator_class(api_key, api_secret, model)
+        generator = generator_class(api_key, api_secret, model)
+        if timeouts is not None:
+            generator.timeouts = timeouts
+        if endpoints:
+            generator.endpoints = EndpointSet(endpoints)
+        if http2:
+            generator.transport = HTTP2Transport()
+        if max_running is not None:
+            generator.key_pool.max_running = max_running
+        return generator
 
     @classmethod
     def get_supported_providers(cls) -> list[VideoProvider]:
@@ -70,3 +93,29 @@ class VideoGeneratorFactory:
             generator_class: 生成器类
         """
         cls._generators[provider] = generator_class
+
+    @classmethod
+    def warm_up(cls,
+                generators: Iterable[BaseVideoGenerator],
+                connections: int = 2,
+                max_concurrency: int = 8,
+                timeout: float = 5.0) -> Dict[VideoProvider, Dict[str, int]]:
+        """
+        启动时并发预热一组生成器的连接
+
+        Args:
+            generators: 需要预热的生成器
+            connections: 每个接入点预先建立的连接数
+            max_concurrency: 同时预热的生成器数
+            timeout: 单个连接的超时(秒)
+
+        Returns:
+            Dict: 每个供应商各接入点成功建立的连接数
+        """
+        generators = list(generators)
+        if not generators:
+            return {}
+        with ThreadPoolExecutor(max_workers=min(max_concurrency, len(generators)),
+                                thread_name_prefix="video-warm") as executor:
+            results = executor.map(lambda g: g.warm(connections, timeout), generators)
+            return {generator.provider: result for generator, result in zip(generators, results)}
@@ -0,0 +1,263 @@
+"""
+HTTP 飞行记录与慢调用监视
+
+供应商突然变慢或报错时，事后往往只剩一行异常日志。飞行记录器为每个供应商保留最近 N 次HTTP交换
+（耗时、状态码、截断后的请求与响应体），可以随时导出，也可以在出错时自动导出到目录；
+慢调用监视器在后台线程中检查进行中的调用，超过阈值仍未返回时记录调用线程的栈::
+
+    BaseVideoGenerator.flight_recorder = FlightRecorder(capacity=512, dump_dir="/var/log/video-flight")
+    BaseVideoGenerator.watchdog = SlowCallWatchdog(threshold=30)
+
+    BaseVideoGenerator.flight_recorder.dump("luma.jsonl", provider="luma")
+"""
+
+import itertools
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from dataclasses import asdict, dataclass
+from typing import Callable, Deque, Dict, List, Optional, Set, Tuple
+
+from video_generation import codec
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class FlightEntry:
+    """一次HTTP交换"""
+    seq: int  # 同一供应商内的序号
+    started: float  # 发出时间（Unix 时间戳）
+    provider: str  # 供应商
+    method: str  # HTTP方法
+    url: str  # 请求地址
+    elapsed: float  # 耗时(秒)，包含切换接入点后的重试
+    status: Optional[int] = None  # 响应状态码，请求失败时为 None
+    request_body: Optional[str] = None  # 截断后的请求体
+    response_body: Optional[str] = None  # 截断后的响应体
+    error: Optional[str] = None  # 请求失败时的异常
+    thread: str = ""  # 发出请求的线程
+
+
+class _Ring:
+    """
+    固定容量的环形缓冲
+
+    写入只取一次计数器并覆盖对应槽位，不加锁；读取时复制槽位后按序号排序，
+    并发写入时快照可能缺少正在写入的最新一条。
+    """
+
+    def __init__(self, capacity: int):
+        self.slots: List[Optional[FlightEntry]] = [None] * capacity
+        self.counter = itertools.count()
+
+    def append(self, entry: FlightEntry):
+        entry.seq = next(self.counter)
+        self.slots[entry.seq % len(self.slots)] = entry
+
+    def entries(self) -> List[FlightEntry]:
+        return sorted((entry for entry in list(self.slots) if entry is not None), key=lambda entry: entry.seq)
+
+
+class FlightRecorder:
+    """按供应商保留最近的HTTP交换"""
+
+    def __init__(self, capacity: int = 256, max_body: int = 2048, dump_dir: Optional[str] = None,
+                 dump_interval: float = 60.0):
+        """
+        Args:
+            capacity: 每个供应商保留的交换数
+            max_body: 请求体与响应体保留的最大字节数
+            dump_dir: 设置后请求失败或返回 5xx 时把该供应商的记录导出到此目录
+            dump_interval: 同一供应商两次自动导出的最小间隔(秒)，避免故障期间反复写文件
+        """
+        self.capacity = capacity
+        self.max_body = max_body
+        self.dump_dir = dump_dir
+        self.dump_interval = dump_interval
+        self._rings: Dict[str, _Ring] = {}
+        self._last_dump: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def _truncate(self, data: Optional[bytes]) -> Optional[str]:
+        if data is None:
+            return None
+        text = data[:self.max_body].decode("utf-8", errors="replace")
+        if len(data) > self.max_body:
+            text += f"...(共 {len(data)} 字节)"
+        return text
+
+    def record(self, provider: str, method: str, url: str, started: float, elapsed: float,
+               status: Optional[int] = None, request_body: Optional[bytes] = None,
+               response_body: Optional[bytes] = None, error: Optional[BaseException] = None) -> FlightEntry:
+        """
+        记录一次交换
+
+        Args:
+            provider: 供应商
+            method: HTTP方法
+            url: 请求地址
+            started: 发出时间（Unix 时间戳）
+            elapsed: 耗时(秒)
+            status: 响应状态码
+            request_body: 请求体
+            response_body: 响应体
+            error: 请求失败时的异常
+        """
+        entry = FlightEntry(
+            seq=0, started=started, provider=provider, method=method, url=url, elapsed=round(elapsed, 4),
+            status=status, request_body=self._truncate(request_body), response_body=self._truncate(response_body),
+            error=repr(error) if error is not None else None, thread=threading.current_thread().name,
+        )
+        ring = self._rings.get(provider)
+        if ring is None:
+            ring = self._rings.setdefault(provider, _Ring(self.capacity))
+        ring.append(entry)
+        if self.dump_dir is not None and (error is not None or (status is not None and status >= 500)):
+            self._dump_on_error(provider)
+        return entry
+
+    def snapshot(self, provider: Optional[str] = None) -> List[FlightEntry]:
+        """
+        当前保留的交换
+
+        Args:
+            provider: 供应商，为空时返回所有供应商的记录，按发出时间排序
+        """
+        if provider is not None:
+            ring = self._rings.get(provider)
+            return ring.entries() if ring is not None else []
+        entries = [entry for ring in list(self._rings.values()) for entry in ring.entries()]
+        return sorted(entries, key=lambda entry: entry.started)
+
+    def dump(self, path: str, provider: Optional[str] = None) -> int:
+        """
+        以 JSON Lines 格式导出
+
+        Returns:
+            int: 导出的交换数
+        """
+        entries = self.snapshot(provider)
+        with open(path, "wb") as f:
+            for entry in entries:
+                f.write(codec.encode(asdict(entry)) + b"\n")
+        return len(entries)
+
+    def _dump_on_error(self, provider: str):
+        now = time.monotonic()
+        with self._lock:
+            last = self._last_dump.get(provider)
+            if last is not None and now - last < self.dump_interval:
+                return
+            self._last_dump[provider] = now
+        path = os.path.join(self.dump_dir, f"flight-{provider}-{time.strftime('%Y%m%d-%H%M%S')}.jsonl")
+        try:
+            os.makedirs(self.dump_dir, exist_ok=True)
+            count = self.dump(path, provider)
+        except OSError:
+            logger.warning("导出飞行记录失败: %s", path, exc_info=True)
+            return
+        logger.warning("%s 请求出错，已导出最近 %d 次HTTP交换: %s", provider, count, path)
+
+
+@dataclass
+class SlowCall:
+    """超过阈值仍未返回的调用"""
+    provider: str  # 供应商
+    method: str  # HTTP方法
+    url: str  # 请求地址
+    elapsed: float  # 发现时已执行的时间(秒)
+    thread: str  # 调用线程
+    stack: str  # 调用线程当时的栈
+
+
+class SlowCallWatchdog:
+    """
+    慢调用监视器
+
+    生成器在每次HTTP调用前后登记与注销，后台线程每隔 interval 秒检查一次，
+    每个调用最多报告一次：记录警告日志、保存到 reports，并调用 on_slow。
+    """
+
+    def __init__(self, threshold: float = 30.0, interval: float = 1.0,
+                 on_slow: Optional[Callable[[SlowCall], None]] = None, max_reports: int = 100):
+        """
+        Args:
+            threshold: 报告阈值(秒)
+            interval: 检查间隔(秒)
+            on_slow: 发现慢调用时的回调，例如导出飞行记录
+            max_reports: reports 保留的报告数
+        """
+        self.threshold = threshold
+        self.interval = interval
+        self.on_slow = on_slow
+        self.reports: Deque[SlowCall] = deque(maxlen=max_reports)
+        self._calls: Dict[int, Tuple[str, str, str, int, str, float]] = {}
+        self._reported: Set[int] = set()
+        self._counter = itertools.count()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def enter(self, provider: str, method: str, url: str) -> int:
+        """登记一个进行中的调用，返回用于注销的标识"""
+        token = next(self._counter)
+        thread = threading.current_thread()
+        self._calls[token] = (provider, method, url, thread.ident, thread.name, time.monotonic())
+        if self._thread is None:
+            self._ensure_running()
+        return token
+
+    def exit(self, token: int):
+        """调用结束"""
+        self._calls.pop(token, None)
+
+    def _ensure_running(self):
+        with self._lock:
+            if self._thread is None:
+                self._stopped.clear()
+                self._thread = threading.Thread(target=self._run, name="video-slow-call-watchdog", daemon=True)
+                self._thread.start()
+
+    def stop(self):
+        """停止后台线程，之后的 enter 会重新启动"""
+        with self._lock:
+            thread, self._thread = self._thread, None
+            self._stopped.set()
+        if thread is not None:
+            thread.join()
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            self.check()
+
+    def check(self) -> List[SlowCall]:
+        """检查一次进行中的调用，返回新发现的慢调用"""
+        now = time.monotonic()
+        calls = list(self._calls.items())
+        self._reported.intersection_update(token for token, _ in calls)
+        found = []
+        frames = None
+        for token, (provider, method, url, ident, thread, started) in calls:
+            if now - started < self.threshold or token in self._reported:
+                continue
+            if frames is None:
+                frames = sys._current_frames()
+            frame = frames.get(ident)
+            stack = "".join(traceback.format_stack(frame)) if frame is not None else ""
+            report = SlowCall(provider, method, url, round(now - started, 3), thread, stack)
+            self._reported.add(token)
+            self.reports.append(report)
+            found.append(report)
+            logger.warning("%s %s %s 已执行 %.1f 秒仍未返回，线程 %s:\n%s",
+                           provider, method, url, report.elapsed, thread, stack)
+            if self.on_slow is not None:
+                try:
+                    self.on_slow(report)
+                except Exception:
+                    logger.warning("慢调用回调失败", exc_info=True)
+        return found
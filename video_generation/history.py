@@ -0,0 +1,435 @@
+"""
+任务历史
+
+每个结束的任务保留一行耗时记录（提交、首次处理中、结束时间、查询次数、下载字节数），按列存储：
+- 内存中每列是一个 array，一行只占几十个字节，不保留 VideoTaskStatus 对象
+- 内存中的行数达到 chunk_rows 时整块追加写入磁盘文件，文件按块记录时间范围，
+  按时间窗口查询时跳过不相关的块
+- 供应商、模型、分辨率以字典编码存储
+
+用于路由、耗时预估与容量规划的统计::
+
+    BaseVideoGenerator.task_history = TaskHistory("/var/lib/video/history.bin")
+    history.percentile(90, provider="luma", since=time.time() - 86400)
+    history.group_by_provider(percentiles=(50, 90, 99))
+"""
+
+import json
+import math
+import os
+import struct
+import sys
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from datetime import datetime
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+if TYPE_CHECKING:
+    from video_generation.base import VideoTaskStatus
+
+# (列名, array 类型码)
+COLUMNS: Tuple[Tuple[str, str], ...] = (
+    ("provider", "B"),  # 供应商编码
+    ("model", "H"),  # 模型编码
+    ("resolution", "H"),  # 分辨率编码
+    ("duration", "H"),  # 请求的视频时长(秒)
+    ("completed", "B"),  # 1 为完成，0 为失败
+    ("submit", "d"),  # 提交时间(Unix 秒)
+    ("processing", "d"),  # 首次查询到处理中的时间，未观察到时为 NaN
+    ("finish", "d"),  # 查询到终态的时间
+    ("polls", "I"),  # 状态查询次数
+    ("bytes", "Q"),  # 下载的字节数
+)
+
+# 字典编码的列
+_ENCODED = ("provider", "model", "resolution")
+
+# 可查询的耗时指标
+METRICS = {
+    "total": ("submit", "finish"),  # 提交到结束
+    "queue": ("submit", "processing"),  # 提交到开始处理
+    "run": ("processing", "finish"),  # 开始处理到结束
+}
+
+_MAGIC = b"VGTH"
+_VERSION = 1
+# magic, version, 字节序, 行数, 最早/最晚结束时间, 字典长度
+_CHUNK_HEADER = struct.Struct("<4sBcIddI")
+
+TimeValue = Union[float, datetime, None]
+
+
+def _timestamp(value: TimeValue) -> Optional[float]:
+    if isinstance(value, datetime):
+        return value.timestamp()
+    return value
+
+
+def _percentile(ordered: Sequence[float], q: float) -> float:
+    """线性插值的百分位数，ordered 必须已排序且非空"""
+    position = (len(ordered) - 1) * q / 100
+    lower = math.floor(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+class _Chunk:
+    """一块按列存储的记录"""
+    __slots__ = ("columns", "tables", "min_finish", "max_finish")
+
+    def __init__(self, columns: Dict[str, array], tables: Dict[str, List[str]],
+                 min_finish: float = math.inf, max_finish: float = -math.inf):
+        self.columns = columns
+        self.tables = tables
+        self.min_finish = min_finish
+        self.max_finish = max_finish
+
+    def __len__(self) -> int:
+        return len(self.columns["submit"])
+
+
+def _empty_columns() -> Dict[str, array]:
+    return {name: array(code) for name, code in COLUMNS}
+
+
+class _InFlight:
+    __slots__ = ("model", "resolution", "duration", "submit", "processing", "polls")
+
+    def __init__(self, model: str, resolution: str, duration: int, submit: float):
+        self.model = model
+        self.resolution = resolution
+        self.duration = duration
+        self.submit = submit
+        self.processing = math.nan
+        self.polls = 0
+
+
+class TaskHistory:
+    """按列存储的任务耗时历史"""
+
+    def __init__(self, path: Optional[str] = None, chunk_rows: int = 65536,
+                 max_in_flight: int = 100000, max_memory_rows: Optional[int] = None):
+        """
+        Args:
+            path: 落盘文件路径，为空时只保存在内存中
+            chunk_rows: 内存中积累多少行后写入磁盘
+            max_in_flight: 最多跟踪的进行中任务数
+            max_memory_rows: 不落盘时内存中最多保留的行数，超出时丢弃最早的一半，默认不限制
+        """
+        self.path = path
+        self.chunk_rows = chunk_rows
+        self.max_in_flight = max_in_flight
+        self.max_memory_rows = max_memory_rows
+        self._tables: Dict[str, List[str]] = {name: [] for name in _ENCODED}
+        self._codes: Dict[str, Dict[str, int]] = {name: {} for name in _ENCODED}
+        self._memory = _Chunk(_empty_columns(), self._tables)
+        self._in_flight: "OrderedDict[Tuple[str, str], _InFlight]" = OrderedDict()
+        self._rows: Dict[Tuple[str, str], int] = {}  # 内存块中已结束任务的行号，用于补记下载字节数
+        self._spilled: List[Tuple[int, int, float, float]] = []  # (文件偏移, 行数, 最早结束, 最晚结束)
+        self._lock = threading.Lock()
+        if path is not None and os.path.exists(path):
+            self._load_index()
+
+    # ---- 记录 ----
+
+    def submitted(self, provider: str, task_id: str, model: Optional[str], resolution: Optional[str],
+                  duration: Optional[int], at: Optional[float] = None):
+        """记录任务提交"""
+        entry = _InFlight(model or "", resolution or "", duration or 0, at if at is not None else time.time())
+        with self._lock:
+            self._in_flight[(provider, task_id)] = entry
+            if len(self._in_flight) > self.max_in_flight:
+                self._in_flight.popitem(last=False)
+
+    def observe(self, status: "VideoTaskStatus", polled: bool = False):
+        """
+        记录一次状态观察，任务进入终态时写入一行
+
+        不是由本进程提交的任务以 status.create_time 作为提交时间，首次观察即已结束的任务不记录。
+
+        Args:
+            status: 任务状态
+            polled: 是否来自一次状态查询（回调与缓存命中不计入查询次数）
+        """
+        from video_generation.base import TaskStatus
+
+        key = (status.provider.value, status.task_id)
+        now = time.time()
+        with self._lock:
+            entry = self._in_flight.get(key)
+            if entry is None:
+                if status.status.is_terminal:
+                    return  # 已经记录过，或首次观察即已结束，没有可用的耗时
+                entry = self._in_flight[key] = _InFlight("", "", 0, status.create_time.timestamp())
+            if polled:
+                entry.polls += 1
+            if status.status == TaskStatus.PROCESSING and math.isnan(entry.processing):
+                entry.processing = now
+            if status.status.is_terminal:
+                del self._in_flight[key]
+                self._append(key, entry, status.status == TaskStatus.COMPLETED, now)
+
+    def forget(self, provider: str, task_id: str):
+        """任务被取消或放弃，不计入历史"""
+        with self._lock:
+            self._in_flight.pop((provider, task_id), None)
+
+    def downloaded(self, provider: str, task_id: str, size: int):
+        """补记结果视频的下载字节数，记录已写入磁盘时忽略"""
+        with self._lock:
+            row = self._rows.get((provider, task_id))
+            if row is not None:
+                self._memory.columns["bytes"][row] += size
+
+    def _code(self, column: str, value: str) -> int:
+        codes = self._codes[column]
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(self._tables[column])
+            self._tables[column].append(value)
+        return code
+
+    def _append(self, key: Tuple[str, str], entry: _InFlight, completed: bool, finish: float):
+        columns = self._memory.columns
+        self._rows[key] = len(columns["submit"])
+        columns["provider"].append(self._code("provider", key[0]))
+        columns["model"].append(self._code("model", entry.model))
+        columns["resolution"].append(self._code("resolution", entry.resolution))
+        columns["duration"].append(min(entry.duration, 0xFFFF))
+        columns["completed"].append(int(completed))
+        columns["submit"].append(entry.submit)
+        columns["processing"].append(entry.processing)
+        columns["finish"].append(finish)
+        columns["polls"].append(entry.polls)
+        columns["bytes"].append(0)
+        self._memory.min_finish = min(self._memory.min_finish, finish)
+        self._memory.max_finish = max(self._memory.max_finish, finish)
+
+        rows = len(columns["submit"])
+        if self.path is not None and rows >= self.chunk_rows:
+            self._spill()
+        elif self.path is None and self.max_memory_rows and rows > self.max_memory_rows:
+            self._truncate(rows // 2)
+
+    def _truncate(self, rows: int):
+        """丢弃内存中最早的若干行"""
+        for column in self._memory.columns.values():
+            del column[:rows]
+        self._memory.min_finish = min(self._memory.columns["finish"], default=math.inf)
+        self._rows = {key: row - rows for key, row in self._rows.items() if row >= rows}
+
+    # ---- 落盘 ----
+
+    def flush(self):
+        """将内存中的记录写入磁盘"""
+        with self._lock:
+            if self.path is not None and len(self._memory):
+                self._spill()
+
+    def _spill(self):
+        memory = self._memory
+        tables = json.dumps(self._tables, ensure_ascii=False).encode("utf-8")
+        header = _CHUNK_HEADER.pack(_MAGIC, _VERSION, b"<" if sys.byteorder == "little" else b">",
+                                    len(memory), memory.min_finish, memory.max_finish, len(tables))
+        with open(self.path, "ab") as f:
+            offset = f.tell()
+            f.write(header)
+            f.write(tables)
+            for name, _ in COLUMNS:
+                memory.columns[name].tofile(f)
+        self._spilled.append((offset, len(memory), memory.min_finish, memory.max_finish))
+        self._memory = _Chunk(_empty_columns(), self._tables)
+        self._rows = {}
+
+    def _load_index(self):
+        """读取已有文件的块索引，并恢复字典编码以继续追加"""
+        row_size = sum(array(code).itemsize for _, code in COLUMNS)
+        with open(self.path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            offset = 0
+            tables = None
+            while offset + _CHUNK_HEADER.size <= size:
+                f.seek(offset)
+                magic, version, _, rows, min_finish, max_finish, tables_len = _CHUNK_HEADER.unpack(
+                    f.read(_CHUNK_HEADER.size))
+                end = offset + _CHUNK_HEADER.size + tables_len + rows * row_size
+                if magic != _MAGIC or version != _VERSION or end > size:
+                    break  # 写入中断留下的不完整块
+                tables = f.read(tables_len)
+                self._spilled.append((offset, rows, min_finish, max_finish))
+                offset = end
+        if offset < size:
+            with open(self.path, "r+b") as f:
+                f.truncate(offset)
+        if tables is not None:
+            self._tables.update(json.loads(tables))
+            for name in _ENCODED:
+                self._codes[name] = {value: code for code, value in enumerate(self._tables[name])}
+
+    def _read_chunk(self, offset: int) -> _Chunk:
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            _, _, byteorder, rows, min_finish, max_finish, tables_len = _CHUNK_HEADER.unpack(
+                f.read(_CHUNK_HEADER.size))
+            tables = json.loads(f.read(tables_len))
+            columns = {}
+            for name, code in COLUMNS:
+                column = array(code)
+                column.fromfile(f, rows)
+                if byteorder != (b"<" if sys.byteorder == "little" else b">"):
+                    column.byteswap()
+                columns[name] = column
+        return _Chunk(columns, tables, min_finish, max_finish)
+
+    def _chunks(self, since: Optional[float], until: Optional[float]) -> Iterator[_Chunk]:
+        """按时间窗口筛选的数据块，磁盘块按需读取"""
+        with self._lock:
+            spilled = list(self._spilled)
+            memory = self._memory
+            memory_snapshot = _Chunk({name: array(column.typecode, column) for name, column in memory.columns.items()},
+                                     {name: list(values) for name, values in memory.tables.items()},
+                                     memory.min_finish, memory.max_finish)
+        for offset, rows, min_finish, max_finish in spilled:
+            if rows and (since is None or max_finish >= since) and (until is None or min_finish < until):
+                yield self._read_chunk(offset)
+        if len(memory_snapshot):
+            yield memory_snapshot
+
+    # ---- 查询 ----
+
+    def values(self, metric: str = "total", provider: Optional[str] = None, model: Optional[str] = None,
+               since: TimeValue = None, until: TimeValue = None, completed_only: bool = True) -> array:
+        """
+        筛选任务的耗时(秒)
+
+        Args:
+            metric: total（提交到结束）、queue（提交到开始处理）或 run（开始处理到结束）
+            provider: 只统计该供应商
+            model: 只统计该模型
+            since: 结束时间不早于该时间（Unix 秒或 datetime）
+            until: 结束时间早于该时间
+            completed_only: 只统计成功完成的任务
+
+        Returns:
+            array: 耗时数组，未观察到处理中时间的任务不计入 queue/run
+        """
+        start_column, end_column = METRICS[metric]
+        since, until = _timestamp(since), _timestamp(until)
+        result = array("d")
+        for chunk in self._chunks(since, until):
+            provider_code = self._lookup(chunk, "provider", provider)
+            model_code = self._lookup(chunk, "model", model)
+            if provider_code == -1 or model_code == -1:
+                continue
+            c = chunk.columns
+            starts, ends, finishes = c[start_column], c[end_column], c["finish"]
+            providers, models, completed = c["provider"], c["model"], c["completed"]
+            for i in range(len(finishes)):
+                if completed_only and not completed[i]:
+                    continue
+                if provider_code is not None and providers[i] != provider_code:
+                    continue
+                if model_code is not None and models[i] != model_code:
+                    continue
+                finish = finishes[i]
+                if (since is not None and finish < since) or (until is not None and finish >= until):
+                    continue
+                value = ends[i] - starts[i]
+                if value == value:  # 跳过 NaN
+                    result.append(value)
+        return result
+
+    @staticmethod
+    def _lookup(chunk: _Chunk, column: str, value: Optional[str]) -> Optional[int]:
+        """值在该块字典中的编码，不筛选时为 None，块中不存在时为 -1"""
+        if value is None:
+            return None
+        try:
+            return chunk.tables[column].index(value)
+        except ValueError:
+            return -1
+
+    def percentile(self, q: Union[float, Sequence[float]], metric: str = "total",
+                   **filters) -> Union[Optional[float], List[Optional[float]]]:
+        """
+        耗时的百分位数
+
+        Args:
+            q: 百分位（0-100），传入序列时返回对应的列表
+            metric: 耗时指标，见 values()
+            **filters: provider、model、since、until、completed_only
+
+        Returns:
+            百分位数(秒)，没有数据时为 None
+        """
+        ordered = sorted(self.values(metric, **filters))
+        quantiles = [q] if isinstance(q, (int, float)) else list(q)
+        results = [_percentile(ordered, value) if ordered else None for value in quantiles]
+        return results[0] if isinstance(q, (int, float)) else results
+
+    def group_by_provider(self, metric: str = "total", percentiles: Sequence[float] = (50, 90, 99),
+                          since: TimeValue = None, until: TimeValue = None) -> Dict[str, Dict[str, float]]:
+        """
+        按供应商汇总
+
+        Returns:
+            Dict: 供应商 -> {"count", "failed", "failure_rate", "avg_polls", "bytes", "p50", ...}
+        """
+        since, until = _timestamp(since), _timestamp(until)
+        start_column, end_column = METRICS[metric]
+        groups: Dict[str, Dict[str, object]] = {}
+        for chunk in self._chunks(since, until):
+            c = chunk.columns
+            names = chunk.tables["provider"]
+            for i in range(len(c["finish"])):
+                finish = c["finish"][i]
+                if (since is not None and finish < since) or (until is not None and finish >= until):
+                    continue
+                group = groups.get(names[c["provider"][i]])
+                if group is None:
+                    group = groups[names[c["provider"][i]]] = {"count": 0, "failed": 0, "polls": 0,
+                                                               "bytes": 0, "values": []}
+                group["count"] += 1
+                group["polls"] += c["polls"][i]
+                group["bytes"] += c["bytes"][i]
+                if not c["completed"][i]:
+                    group["failed"] += 1
+                    continue
+                value = c[end_column][i] - c[start_column][i]
+                if value == value:
+                    group["values"].append(value)
+
+        summary = {}
+        for provider, group in groups.items():
+            ordered = sorted(group.pop("values"))
+            count = group["count"]
+            row = {
+                "count": count,
+                "failed": group["failed"],
+                "failure_rate": group["failed"] / count,
+                "avg_polls": group["polls"] / count,
+                "bytes": group["bytes"],
+            }
+            for q in percentiles:
+                row[f"p{q:g}"] = _percentile(ordered, q) if ordered else None
+            summary[provider] = row
+        return summary
+
+    def count(self, since: TimeValue = None, until: TimeValue = None) -> int:
+        """时间窗口内结束的任务数"""
+        since, until = _timestamp(since), _timestamp(until)
+        total = 0
+        for chunk in self._chunks(since, until):
+            if (since is None or chunk.min_finish >= since) and (until is None or chunk.max_finish < until):
+                total += len(chunk)
+                continue
+            for finish in chunk.columns["finish"]:
+                if (since is None or finish >= since) and (until is None or finish < until):
+                    total += 1
+        return total
+
+    def close(self):
+        """写入剩余记录"""
+        self.flush()
@@ -0,0 +1,258 @@
+"""
+生成任务提交队列
+
+交互式请求与批量回填共用同一批供应商账号时，按优先级与租户权重决定提交顺序：
+- 高优先级的请求总是先于低优先级的请求提交
+- 同一优先级内按租户权重加权公平分配（虚拟时间），单个租户的大批量请求不会饿死其他租户
+- 只在生成器有空闲额度时才取出请求，额度用满的供应商不会阻塞其他供应商的请求
+"""
+
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import Deque, Dict, Optional, Tuple
+
+from video_generation.base import BaseVideoGenerator, VideoRequest, VideoTaskResponse
+from video_generation.deadline import Deadline
+from video_generation.errors import DeadlineExceeded
+
+
+class Priority(IntEnum):
+    """请求优先级，数值越小越优先"""
+    INTERACTIVE = 0  # 用户正在等待结果的请求
+    NORMAL = 1  # 普通请求
+    BATCH = 2  # 批量回填等可延后的请求
+
+
+@dataclass
+class _Job:
+    generator: BaseVideoGenerator
+    request: VideoRequest
+    tenant: str
+    deadline: Optional[Deadline]
+    future: "Future[VideoTaskResponse]" = field(default_factory=Future)
+
+
+class JobQueue:
+    """
+    带优先级与租户公平性的提交队列
+
+    用法::
+
+        queue = JobQueue(workers=8, weights={"web": 3, "backfill": 1})
+        future = queue.submit(generator, request, tenant="web", priority=Priority.INTERACTIVE)
+        task = future.result()
+    """
+
+    def __init__(self,
+                 workers: int = 8,
+                 weights: Optional[Dict[str, float]] = None,
+                 capacity_check_interval: float = 0.5):
+        """
+        Args:
+            workers: 同时进行的提交数
+            weights: 租户权重，未配置的租户权重为 1
+            capacity_check_interval: 所有生成器额度已满时重新检查的间隔(秒)
+        """
+        self.workers = workers
+        self.weights: Dict[str, float] = dict(weights or {})
+        self.capacity_check_interval = capacity_check_interval
+
+        self._queues: Dict[Priority, Dict[str, Deque[_Job]]] = {p: {} for p in Priority}
+        # 租户的虚拟时间，每提交一个请求增加 1/权重，取值最小的租户优先
+        self._vtime: Dict[Tuple[Priority, str], float] = {}
+        self._clock: Dict[Priority, float] = {p: 0.0 for p in Priority}
+        self._running = 0
+        self._cond = threading.Condition()
+        self._stopped = False
+        self._thread: Optional[threading.Thread] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def set_weight(self, tenant: str, weight: float):
+        """设置租户权重"""
+        if weight <= 0:
+            raise ValueError("租户权重必须大于0")
+        with self._cond:
+            self.weights[tenant] = weight
+
+    def submit(self,
+               generator: BaseVideoGenerator,
+               request: VideoRequest,
+               tenant: str = "default",
+               priority: Priority = Priority.NORMAL,
+               deadline: Optional[Deadline] = None) -> "Future[VideoTaskResponse]":
+        """
+        将请求加入队列
+
+        Args:
+            generator: 提交使用的生成器
+            request: 三种请求类型之一
+            tenant: 租户标识
+            priority: 优先级
+            deadline: 截止时间，到期仍未提交的请求以 DeadlineExceeded 失败
+
+        Returns:
+            Future: 提交结果，可通过 cancel() 撤回尚未提交的请求
+        """
+        job = _Job(generator, request, tenant, deadline)
+        with self._cond:
+            if self._stopped:
+                raise RuntimeError("队列已停止")
+            tenants = self._queues[priority]
+            if tenant not in tenants or not tenants[tenant]:
+                # 空闲后重新活跃的租户从当前时钟开始，不能用积累的空闲时间插队
+                key = (priority, tenant)
+                self._vtime[key] = max(self._vtime.get(key, 0.0), self._clock[priority])
+                tenants.setdefault(tenant, deque())
+            tenants[tenant].append(job)
+            self._cond.notify_all()
+        self._ensure_running()
+        return job.future
+
+    def pending(self, tenant: Optional[str] = None) -> int:
+        """排队中的请求数"""
+        with self._cond:
+            return sum(len(jobs) for tenants in self._queues.values()
+                       for name, jobs in tenants.items() if tenant is None or name == tenant)
+
+    def stop(self, cancel_pending: bool = True):
+        """
+        停止队列
+
+        Args:
+            cancel_pending: 是否取消排队中的请求
+        """
+        with self._cond:
+            self._stopped = True
+            if cancel_pending:
+                for tenants in self._queues.values():
+                    for jobs in tenants.values():
+                        for job in jobs:
+                            job.future.cancel()
+                        jobs.clear()
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+
+    def __enter__(self) -> "JobQueue":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop(cancel_pending=exc_type is not None)
+
+    def _ensure_running(self):
+        with self._cond:
+            if self._thread is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="video-job")
+                self._thread = threading.Thread(target=self._run, name="video-job-queue", daemon=True)
+                self._thread.start()
+
+    def _next_job(self) -> Tuple[Optional[_Job], bool]:
+        """
+        选出下一个可以提交的请求
+
+        Returns:
+            Tuple: (请求, 是否还有因额度已满而等待的请求)
+        """
+        blocked = False
+        # 同一轮中额度已满的生成器对所有优先级都保持已满，低优先级的请求不会抢到高优先级等待中的额度
+        capacity: Dict[int, bool] = {}
+        for priority in Priority:
+            tenants = self._queues[priority]
+            order = sorted((name for name, jobs in tenants.items() if jobs),
+                           key=lambda name: self._vtime[(priority, name)])
+            for name in order:
+                jobs = tenants[name]
+                for job in list(jobs):
+                    if job.future.cancelled():
+                        jobs.remove(job)
+                        continue
+                    if job.deadline is not None and job.deadline.expired:
+                        jobs.remove(job)
+                        self._reject_expired(job)
+                        continue
+                    generator_id = id(job.generator)
+                    if generator_id not in capacity:
+                        capacity[generator_id] = job.generator.key_pool.has_capacity()
+                    if not capacity[generator_id]:
+                        blocked = True
+                        continue
+                    jobs.remove(job)
+                    key = (priority, name)
+                    start = self._vtime[key]
+                    self._vtime[key] = start + 1.0 / self.weights.get(name, 1.0)
+                    self._clock[priority] = max(self._clock[priority], start)
+                    return job, blocked
+        return None, blocked
+
+    @staticmethod
+    def _reject_expired(job: _Job):
+        if job.future.set_running_or_notify_cancel():
+            job.future.set_exception(DeadlineExceeded("排队等待提交超过截止时间"))
+
+    def _expire_jobs(self) -> Optional[float]:
+        """
+        在持有锁时调用：移除已撤回或已过截止时间的请求
+
+        Returns:
+            Optional[float]: 距离排队请求中最早截止时间的秒数，没有带截止时间的请求时为 None
+        """
+        earliest = None
+        for tenants in self._queues.values():
+            for jobs in tenants.values():
+                for job in list(jobs):
+                    if job.future.cancelled():
+                        jobs.remove(job)
+                        continue
+                    if job.deadline is None:
+                        continue
+                    remaining = job.deadline.remaining()
+                    if remaining <= 0:
+                        jobs.remove(job)
+                        self._reject_expired(job)
+                    elif earliest is None or remaining < earliest:
+                        earliest = remaining
+        return earliest
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while True:
+                    # 工作线程全部占用时也要按时拒绝过期的请求
+                    expires_in = self._expire_jobs()
+                    job = None
+                    blocked = False
+                    if self._running < self.workers:
+                        job, blocked = self._next_job()
+                    if job is not None:
+                        break
+                    # 在清理撤回与过期的请求之后判断，只剩这些请求时停止不会一直等待
+                    if self._stopped and not any(jobs for tenants in self._queues.values()
+                                                 for jobs in tenants.values()):
+                        return
+                    waits = [wait for wait in (self.capacity_check_interval if blocked else None, expires_in)
+                             if wait is not None]
+                    self._cond.wait(min(waits) if waits else None)
+                self._running += 1
+
+            if not job.future.set_running_or_notify_cancel():
+                self._finish()
+                continue
+            self._executor.submit(self._execute, job)
+
+    def _execute(self, job: _Job):
+        try:
+            job.future.set_result(job.generator.submit(job.request, deadline=job.deadline))
+        except BaseException as e:
+            job.future.set_exception(e)
+        finally:
+            self._finish()
+
+    def _finish(self):
+        with self._cond:
+            self._running -= 1
+            self._cond.notify_all()
@@ -0,0 +1,338 @@
+"""
+API密钥池
+
+同一供应商配置多个密钥时，每次调用选择负载最低的可用密钥：
+- 每个密钥有独立的并发上限和请求速率
+- 鉴权失败或配额耗尽的密钥暂时移出，冷却后恢复
+- 任务状态查询使用提交该任务的同一个密钥
+- 每个密钥同时运行的生成任务数有上限，超出的提交在本地排队，有任务结束后立即发出
+"""
+
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Deque, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+from video_generation.deadline import current_deadline
+from video_generation.errors import DeadlineExceeded
+
+# 鉴权失败：密钥本身有问题，冷却时间较长
+AUTH_ERROR_CODES = (401, 403)
+# 配额/限流：等待一段时间即可恢复
+QUOTA_ERROR_CODES = (402, 429)
+
+
+@dataclass
+class ApiKey:
+    """单个API密钥及其预算"""
+    key: str  # 密钥
+    max_concurrency: Optional[int] = None  # 最大并发调用数，None 表示不限
+    rate: Optional[float] = None  # 每秒最多请求数，None 表示不限
+    max_running: Optional[int] = None  # 同时运行的生成任务数上限，None 时使用密钥池的设置
+    in_flight: int = field(default=0, init=False)  # 正在进行的调用数
+    running: int = field(default=0, init=False)  # 已提交且尚未结束的生成任务数
+    failures: int = field(default=0, init=False)  # 连续失败次数
+    disabled_until: float = field(default=0.0, init=False)  # 冷却截止时间(monotonic)
+    _tokens: float = field(default=0.0, init=False, repr=False)
+    _refilled_at: float = field(default=0.0, init=False, repr=False)
+
+    def __post_init__(self):
+        self._tokens = self._capacity()
+        self._refilled_at = time.monotonic()
+
+    def _capacity(self) -> float:
+        # 令牌桶容量，至少允许一次调用
+        return max(1.0, self.rate or 0.0)
+
+    def _refill(self, now: float):
+        if self.rate is not None:
+            self._tokens = min(self._capacity(), self._tokens + (now - self._refilled_at) * self.rate)
+            self._refilled_at = now
+
+    def available(self, now: float, ignore_cooldown: bool = False) -> bool:
+        """当前是否可以发起调用"""
+        if not ignore_cooldown and now < self.disabled_until:
+            return False
+        if self.max_concurrency is not None and self.in_flight >= self.max_concurrency:
+            return False
+        self._refill(now)
+        return self.rate is None or self._tokens >= 1.0
+
+    def ready_in(self, now: float, ignore_cooldown: bool = False) -> float:
+        """距离可用还需等待的时间(秒)，仅受并发限制时返回 0，需等待释放"""
+        wait = 0.0 if ignore_cooldown else max(0.0, self.disabled_until - now)
+        if self.rate is not None and self._tokens < 1.0:
+            wait = max(wait, (1.0 - self._tokens) / self.rate)
+        return wait
+
+    def has_slot(self, default_limit: Optional[int]) -> bool:
+        """是否还能再提交一个生成任务"""
+        limit = self.max_running if self.max_running is not None else default_limit
+        return limit is None or self.running < limit
+
+    def load(self) -> float:
+        """负载，有并发上限时按占用比例计算"""
+        if self.max_concurrency:
+            return self.in_flight / self.max_concurrency
+        return float(self.in_flight)
+
+
+_current_key: ContextVar[Optional[ApiKey]] = ContextVar("video_generation_api_key", default=None)
+
+
+def current_key() -> Optional[ApiKey]:
+    """当前调用正在使用的密钥"""
+    return _current_key.get()
+
+
+class ApiKeyPool:
+    """
+    API密钥池
+
+    用法::
+
+        pool = ApiKeyPool([ApiKey("key-a", max_concurrency=5, rate=2), ApiKey("key-b")])
+        generator = VideoGeneratorFactory.create_generator(VideoProvider.LUMA, pool)
+    """
+
+    def __init__(self,
+                 keys: Sequence[Union[str, ApiKey]],
+                 auth_cooldown: float = 300.0,
+                 quota_cooldown: float = 60.0,
+                 max_bindings: int = 100000,
+                 max_running: Optional[int] = None,
+                 slot_timeout: float = 6 * 3600.0):
+        """
+        Args:
+            keys: 密钥列表
+            auth_cooldown: 鉴权失败后的冷却时间(秒)
+            quota_cooldown: 配额耗尽且未返回 Retry-After 时的冷却时间(秒)
+            max_bindings: 最多记录的任务-密钥绑定数
+            max_running: 每个密钥同时运行的生成任务数上限，None 表示不限
+            slot_timeout: 任务占用并发额度的最长时间(秒)，超时未观察到结束的任务自动释放额度
+        """
+        if not keys:
+            raise ValueError("密钥池至少需要一个密钥")
+        self.keys: List[ApiKey] = [k if isinstance(k, ApiKey) else ApiKey(k) for k in keys]
+        self.auth_cooldown = auth_cooldown
+        self.quota_cooldown = quota_cooldown
+        self.max_bindings = max_bindings
+        self.max_running = max_running
+        self.slot_timeout = slot_timeout
+        self._by_key: Dict[str, ApiKey] = {k.key: k for k in self.keys}
+        self._bindings: "OrderedDict[str, str]" = OrderedDict()
+        # 任务ID（或尚未 bind 的租约票据）-> (密钥, 占用时间)
+        self._slots: "OrderedDict[Union[str, object], Tuple[ApiKey, float]]" = OrderedDict()
+        self._slot_queue: Deque[object] = deque()
+        self._cursor = 0
+        self._cond = threading.Condition()
+
+    @classmethod
+    def from_value(cls, value: Union[str, Sequence[str], "ApiKeyPool"]) -> "ApiKeyPool":
+        """由单个密钥、密钥列表或已有密钥池构造"""
+        if isinstance(value, ApiKeyPool):
+            return value
+        if value is None or isinstance(value, str):
+            return cls([value])
+        return cls(list(value))
+
+    def __contains__(self, key: ApiKey) -> bool:
+        return self._by_key.get(key.key) is key
+
+    @property
+    def primary(self) -> str:
+        """第一个密钥，用于不经过密钥池调度的调用"""
+        return self.keys[0].key
+
+    def _pick(self, now: float, slot: bool = False) -> Optional[ApiKey]:
+        candidates = [k for k in self.keys
+                      if k.available(now) and (not slot or k.has_slot(self.max_running))]
+        if not candidates:
+            return None
+        # 负载相同时轮转，避免总是落在第一个密钥上
+        self._cursor = (self._cursor + 1) % len(self.keys)
+        offset = self._cursor
+        return min(candidates,
+                   key=lambda k: (k.load(), k.failures, (self.keys.index(k) - offset) % len(self.keys)))
+
+    @staticmethod
+    def _wait_time(candidates: List[ApiKey], now: float, ignore_cooldown: bool = False) -> Optional[float]:
+        """最早恢复可用的等待时间，为 None 时只能等待其他调用释放"""
+        positive = [w for w in (k.ready_in(now, ignore_cooldown) for k in candidates) if w > 0]
+        return min(positive) if positive else None
+
+    def _expire_slots(self, now: float):
+        """回收长时间未观察到结束的任务占用的额度"""
+        while self._slots:
+            task_id, (key, acquired_at) = next(iter(self._slots.items()))
+            if now - acquired_at < self.slot_timeout:
+                return
+            del self._slots[task_id]
+            key.running -= 1
+
+    @contextmanager
+    def lease(self, task_id: Optional[str] = None, slot: bool = False) -> Iterator[ApiKey]:
+        """
+        占用一个密钥直到离开上下文
+
+        已绑定密钥的任务固定使用该密钥，否则选择负载最低的可用密钥；
+        没有可用密钥时等待，受当前截止时间约束。
+
+        Args:
+            task_id: 任务ID，用于查询时沿用提交时的密钥
+            slot: 是否为提交任务占用一个运行额度，额度已满时按先来后到排队，
+                提交失败时归还额度，成功后由 bind 记到任务名下、forget 释放，
+                始终没有 bind 的额度在 slot_timeout 后回收
+
+        Yields:
+            ApiKey: 本次使用的密钥
+
+        Raises:
+            DeadlineExceeded: 截止时间前没有可用密钥
+        """
+        deadline = current_deadline()
+        ticket = object()
+        with self._cond:
+            bound = self._bindings.get(task_id) if task_id is not None else None
+            pinned = self._by_key.get(bound) if bound is not None else None
+            if slot:
+                self._slot_queue.append(ticket)
+            try:
+                while True:
+                    now = time.monotonic()
+                    if pinned is not None:
+                        # 查询必须使用原密钥，冷却中也照常使用，只受并发与速率限制
+                        chosen = pinned if pinned.available(now, ignore_cooldown=True) else None
+                        wait = self._wait_time([pinned], now, ignore_cooldown=True)
+                    elif slot and self._slot_queue[0] is not ticket:
+                        # 排在前面的提交优先获得额度
+                        chosen = None
+                        wait = None
+                    else:
+                        chosen = self._pick(now, slot)
+                        wait = self._wait_time(self.keys, now)
+                        if slot and chosen is None and self._slots:
+                            self._expire_slots(now)
+                            chosen = self._pick(now, slot)
+                            if self._slots:
+                                _, acquired_at = next(iter(self._slots.values()))
+                                expires_in = acquired_at + self.slot_timeout - now
+                                wait = expires_in if wait is None else min(wait, expires_in)
+                    if chosen is not None:
+                        break
+
+                    if deadline is not None:
+                        remaining = deadline.remaining()
+                        if remaining <= 0:
+                            raise DeadlineExceeded("等待运行额度超过截止时间" if slot else "等待可用API密钥超过截止时间")
+                        wait = remaining if wait is None else min(wait, remaining)
+                    self._cond.wait(wait)
+            finally:
+                if slot:
+                    self._slot_queue.remove(ticket)
+                    self._cond.notify_all()
+
+            chosen.in_flight += 1
+            if chosen.rate is not None:
+                chosen._tokens -= 1.0
+            if slot:
+                # 先以临时条目记录额度，bind 时改记到任务名下；未被 bind 的条目超时后由 _expire_slots 回收
+                chosen.running += 1
+                self._slots[ticket] = (chosen, time.monotonic())
+
+        token = _current_key.set(chosen)
+        succeeded = False
+        try:
+            yield chosen
+            succeeded = True
+        finally:
+            _current_key.reset(token)
+            with self._cond:
+                chosen.in_flight -= 1
+                if slot and not succeeded and self._slots.pop(ticket, None) is not None:
+                    chosen.running -= 1
+                self._cond.notify_all()
+
+    def has_capacity(self) -> bool:
+        """是否有密钥可以立即提交新任务（未冷却、未达并发与运行额度上限，且没有排队的提交）"""
+        with self._cond:
+            if self._slot_queue:
+                return False
+            now = time.monotonic()
+            return any(k.available(now) and k.has_slot(self.max_running) for k in self.keys)
+
+    def backlog(self) -> Tuple[int, Optional[int], int]:
+        """
+        运行额度的占用情况
+
+        Returns:
+            Tuple: (运行中的任务数, 运行额度总数（不限时为 None）, 等待运行额度的提交数)
+        """
+        with self._cond:
+            running = sum(k.running for k in self.keys)
+            limits = [k.max_running if k.max_running is not None else self.max_running for k in self.keys]
+            capacity = None if any(limit is None for limit in limits) else sum(limits)
+            return running, capacity, len(self._slot_queue)
+
+    def report(self, key: ApiKey, status_code: int, retry_after: Optional[float] = None):
+        """
+        根据响应状态更新密钥健康度
+
+        Args:
+            key: 本次使用的密钥
+            status_code: HTTP状态码
+            retry_after: 响应中的 Retry-After(秒)
+        """
+        with self._cond:
+            if status_code in AUTH_ERROR_CODES:
+                key.failures += 1
+                key.disabled_until = time.monotonic() + self.auth_cooldown
+            elif status_code in QUOTA_ERROR_CODES:
+                key.failures += 1
+                key.disabled_until = time.monotonic() + (retry_after or self.quota_cooldown)
+            elif status_code < 400:
+                key.failures = 0
+            self._cond.notify_all()
+
+    def bind(self, task_id: str, key: ApiKey, slot: bool = False):
+        """
+        记录任务由哪个密钥提交
+
+        Args:
+            task_id: 任务ID
+            key: 提交所用的密钥
+            slot: 任务占用了运行额度，直到 forget 时释放
+        """
+        with self._cond:
+            if slot:
+                provisional = next((ticket for ticket, (owner, _) in self._slots.items()
+                                    if owner is key and not isinstance(ticket, str)), None)
+                if provisional is not None:
+                    del self._slots[provisional]
+                else:
+                    # 临时条目已超时回收，额度需要重新占用
+                    key.running += 1
+                self._slots[task_id] = (key, time.monotonic())
+            if len(self.keys) == 1:
+                return
+            self._bindings[task_id] = key.key
+            self._bindings.move_to_end(task_id)
+            while len(self._bindings) > self.max_bindings:
+                self._bindings.popitem(last=False)
+
+    def forget(self, task_id: str):
+        """任务结束后释放绑定与运行额度"""
+        with self._cond:
+            self._bindings.pop(task_id, None)
+            entry = self._slots.pop(task_id, None)
+            if entry is not None:
+                entry[0].running -= 1
+                self._cond.notify_all()
+
+    def key_for(self, task_id: str) -> Optional[str]:
+        """获取提交任务所用的密钥"""
+        with self._cond:
+            return self._bindings.get(task_id)
@@ -0,0 +1,257 @@
+"""
+MP4 (ISO-BMFF) 元数据解析
+
+只读取 moov 中的头部 box，不解码视频、不依赖 ffprobe 等外部工具：
+- 文件通过 mmap 映射，按 box 头部跳转，mdat 等媒体数据不会被读入内存
+- moov 位于文件开头（faststart）时，只下载了一部分的文件同样可以解析
+- 时长取自 mvhd，分辨率取自视频轨道的 tkhd，帧率由 stts 的采样数与总时长计算
+"""
+
+import mmap
+import struct
+from typing import Iterator, List, Optional, Tuple
+
+from video_generation.base import VideoMetadata, VideoRequest
+from video_generation.errors import InvalidVideoError
+
+_HEADER = struct.Struct(">I4s")
+_U32 = struct.Struct(">I")
+_U64 = struct.Struct(">Q")
+_U32X2 = struct.Struct(">II")
+_U16X2 = struct.Struct(">HH")
+
+Box = Tuple[bytes, int, int]  # (类型, 内容起始偏移, 内容结束偏移)
+
+
+def _boxes(buf, start: int, end: int) -> Iterator[Box]:
+    """遍历 [start, end) 内的 box，遇到不完整的 box 即停止"""
+    offset = start
+    while offset + 8 <= end:
+        size, kind = _HEADER.unpack_from(buf, offset)
+        header = 8
+        if size == 1:
+            if offset + 16 > end:
+                return
+            size = _U64.unpack_from(buf, offset + 8)[0]
+            header = 16
+        elif size == 0:
+            size = end - offset
+        if size < header or offset + size > end:
+            return
+        yield kind, offset + header, offset + size
+        offset += size
+
+
+def _find(buf, start: int, end: int, kind: bytes) -> Optional[Box]:
+    for box in _boxes(buf, start, end):
+        if box[0] == kind:
+            return box
+    return None
+
+
+def _path(buf, box: Box, *kinds: bytes) -> Optional[Box]:
+    for kind in kinds:
+        box = _find(buf, box[1], box[2], kind)
+        if box is None:
+            return None
+    return box
+
+
+_MAX_DIMENSION = 16384  # 超过此宽高视为损坏
+_MAX_DURATION = 24 * 3600  # 超过此时长(秒)视为损坏
+_MAX_FPS = 1000  # 超过此帧率视为损坏
+
+
+def _unpack(fmt: struct.Struct, buf, offset: int, box: Box) -> tuple:
+    """在 box 内容范围内读取，越界说明 box 被截断"""
+    if offset < box[1] or offset + fmt.size > box[2]:
+        raise InvalidVideoError(f"{box[0].decode('latin-1')} box 长度不足")
+    return fmt.unpack_from(buf, offset)
+
+
+def _timing(buf, box: Box) -> Tuple[int, int]:
+    """解析 mvhd/mdhd，返回 (timescale, duration)"""
+    start = box[1]
+    version = _unpack(_U32, buf, start, box)[0] >> 24
+    if version == 1:
+        # version/flags(4) + creation_time(8) + modification_time(8) + timescale(4) + duration(8)
+        timescale = _unpack(_U32, buf, start + 20, box)[0]
+        duration = _unpack(_U64, buf, start + 24, box)[0]
+    else:
+        # version/flags(4) + creation_time(4) + modification_time(4) + timescale(4) + duration(4)
+        timescale, duration = _unpack(_U32X2, buf, start + 12, box)
+    return timescale, duration
+
+
+def _tkhd_size(buf, box: Box) -> Tuple[int, int]:
+    """tkhd 末尾的显示宽高，16.16 定点数"""
+    _, start, end = box
+    version = _unpack(_U32, buf, start, box)[0] >> 24
+    if end - start < (96 if version == 1 else 84):
+        raise InvalidVideoError("tkhd box 长度不足")
+    width, height = _unpack(_U32X2, buf, end - 8, box)
+    return width >> 16, height >> 16
+
+
+def _video_track(buf, moov: Box) -> Optional[Tuple[Box, Box]]:
+    """返回第一个视频轨道的 (trak, mdia)"""
+    for trak in _boxes(buf, moov[1], moov[2]):
+        if trak[0] != b"trak":
+            continue
+        mdia = _find(buf, trak[1], trak[2], b"mdia")
+        hdlr = mdia and _find(buf, mdia[1], mdia[2], b"hdlr")
+        if hdlr is not None and hdlr[1] + 12 <= hdlr[2] and bytes(buf[hdlr[1] + 8:hdlr[1] + 12]) == b"vide":
+            return trak, mdia
+    return None
+
+
+def _sample_count(buf, stts: Box) -> Tuple[int, int]:
+    """累计 stts，返回 (采样数, 总时长)"""
+    _, start, end = stts
+    entries = _unpack(_U32, buf, start + 4, stts)[0]
+    samples = total = 0
+    offset = start + 8
+    for _ in range(entries):
+        if offset + 8 > end:
+            break
+        count, delta = _U32X2.unpack_from(buf, offset)
+        samples += count
+        total += count * delta
+        offset += 8
+    return samples, total
+
+
+def parse(buf) -> VideoMetadata:
+    """
+    从内存中的 MP4 数据解析元数据
+
+    Args:
+        buf: 支持缓冲区协议的对象（bytes、memoryview、mmap）
+
+    Returns:
+        VideoMetadata: 视频元数据
+
+    Raises:
+        InvalidVideoError: 找不到完整的 moov、其中没有视频轨道，或 box 被截断、数值不合理
+    """
+    try:
+        return _parse(buf)
+    except struct.error as e:
+        raise InvalidVideoError(f"MP4 结构损坏: {e}") from None
+
+
+def _parse(buf) -> VideoMetadata:
+    moov = _find(buf, 0, len(buf), b"moov")
+    if moov is None:
+        raise InvalidVideoError("未找到完整的 moov，文件不是 MP4 或 moov 位于尚未下载的部分")
+    mvhd = _find(buf, moov[1], moov[2], b"mvhd")
+    track = _video_track(buf, moov)
+    if mvhd is None or track is None:
+        raise InvalidVideoError("moov 中缺少 mvhd 或视频轨道")
+    trak, mdia = track
+
+    timescale, duration = _timing(buf, mvhd)
+    seconds = duration / timescale if timescale else 0.0
+
+    width = height = 0
+    tkhd = _find(buf, trak[1], trak[2], b"tkhd")
+    if tkhd is not None:
+        width, height = _tkhd_size(buf, tkhd)
+
+    codec = None
+    stsd = _path(buf, mdia, b"minf", b"stbl", b"stsd")
+    if stsd is not None:
+        # stsd: version/flags(4) + entry_count(4)，之后是第一个采样描述
+        entry = next(_boxes(buf, stsd[1] + 8, stsd[2]), None)
+        if entry is not None:
+            codec = entry[0].decode("latin-1")
+            if not width or not height:
+                # 视觉采样描述: reserved(6) + data_reference_index(2) + pre_defined/reserved(16) + width(2) + height(2)
+                width, height = _unpack(_U16X2, buf, entry[1] + 24, entry)
+
+    fps = None
+    mdhd = _find(buf, mdia[1], mdia[2], b"mdhd")
+    stts = _path(buf, mdia, b"minf", b"stbl", b"stts")
+    if mdhd is not None and stts is not None:
+        track_scale, track_duration = _timing(buf, mdhd)
+        samples, total = _sample_count(buf, stts)
+        if samples and total and track_scale:
+            fps = round(samples * track_scale / total, 3)
+            if not seconds:
+                seconds = total / track_scale  # 分片 MP4 的 mvhd 时长可能为 0
+    if not 0 <= seconds <= _MAX_DURATION:
+        raise InvalidVideoError(f"时长 {seconds:.3f}s 不合理")
+    if width > _MAX_DIMENSION or height > _MAX_DIMENSION:
+        raise InvalidVideoError(f"宽高 {width}x{height} 不合理")
+    if fps is not None and fps > _MAX_FPS:
+        raise InvalidVideoError(f"帧率 {fps} 不合理")
+    return VideoMetadata(duration=round(seconds, 3), width=width, height=height, fps=fps, codec=codec)
+
+
+def probe(path: str) -> VideoMetadata:
+    """
+    读取本地 MP4 文件的元数据
+
+    文件以只读方式映射，只访问 box 头部与 moov 内容，与文件大小无关。
+
+    Args:
+        path: 视频文件路径，可以是仍在下载中的文件
+
+    Returns:
+        VideoMetadata: 视频元数据
+
+    Raises:
+        InvalidVideoError: 文件为空、不是 MP4 或 moov 尚未下载完整
+    """
+    with open(path, "rb") as f:
+        try:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            raise InvalidVideoError(f"{path} 是空文件") from None
+    with mapped:
+        return parse(mapped)
+
+
+def _requested_ratio(request: VideoRequest) -> Tuple[Optional[float], str]:
+    """请求的宽高比：设置了 aspect_ratio 时以它为准，否则取宽高"""
+    if request.aspect_ratio:
+        try:
+            ratio_w, ratio_h = (float(part) for part in request.aspect_ratio.split(":", 1))
+        except ValueError:
+            return None, request.aspect_ratio
+        if ratio_w > 0 and ratio_h > 0:
+            return ratio_w / ratio_h, request.aspect_ratio
+        return None, request.aspect_ratio
+    if request.width and request.height:
+        return request.width / request.height, f"{request.width}x{request.height}"
+    return None, ""
+
+
+def verify(metadata: VideoMetadata, request: VideoRequest,
+           duration_tolerance: float = 0.5, fps_tolerance: float = 1.0) -> List[str]:
+    """
+    检查生成结果是否符合请求中的宽高、时长与帧率
+
+    供应商常按自身支持的规格调整尺寸，宽高只要求与请求的宽高比一致（误差 2%），
+    设置了 aspect_ratio 时以它为准，否则按请求的宽高计算。
+
+    Args:
+        metadata: 结果视频的元数据
+        request: 提交时的请求
+        duration_tolerance: 允许的时长误差(秒)
+        fps_tolerance: 允许的帧率误差
+
+    Returns:
+        List[str]: 不一致项的说明，为空表示符合请求
+    """
+    problems = []
+    expected, requested = _requested_ratio(request)
+    if expected and metadata.width and metadata.height:
+        actual = metadata.width / metadata.height
+        if abs(actual - expected) / expected > 0.02:
+            problems.append(f"宽高 {metadata.width}x{metadata.height} 与请求的 {requested} 比例不一致")
+    if request.duration and abs(metadata.duration - request.duration) > duration_tolerance:
+        problems.append(f"时长 {metadata.duration}s 与请求的 {request.duration}s 不一致")
+    if request.fps and metadata.fps is not None and abs(metadata.fps - request.fps) > fps_tolerance:
+        problems.append(f"帧率 {metadata.fps} 与请求的 {request.fps} 不一致")
+    return problems
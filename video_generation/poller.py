@@ -0,0 +1,325 @@
+"""
+共享任务轮询器
+
+一个后台线程负责所有被观察任务的状态查询，任意数量的观察者
+（watch 迭代器、完成/失败回调）共享同一次查询结果。
+"""
+
+import asyncio
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Tuple
+
+from video_generation.deadline import Deadline
+from video_generation.errors import DeadlineExceeded
+
+if TYPE_CHECKING:
+    from video_generation.base import BaseVideoGenerator, VideoTaskStatus
+
+logger = logging.getLogger(__name__)
+
+StatusListener = Callable[["VideoTaskStatus"], None]
+
+
+@dataclass
+class _WatchedTask:
+    generator: "BaseVideoGenerator"
+    task_id: str
+    listeners: List[StatusListener] = field(default_factory=list)
+    last_status: Optional["VideoTaskStatus"] = None
+    next_poll: float = 0.0
+
+
+def _changed(old: Optional["VideoTaskStatus"], new: "VideoTaskStatus") -> bool:
+    """状态或进度发生变化"""
+    return old is None or old.status != new.status or old.progress != new.progress
+
+
+class TaskPoller:
+    """共享任务轮询器"""
+
+    def __init__(self, interval: float = 5.0, max_workers: int = 8, max_interval: float = 120.0):
+        """
+        Args:
+            interval: 每个任务的轮询间隔(秒)
+            max_workers: 并发查询状态的线程数
+            max_interval: 任务带有预计剩余时间时，跳过查询的最长间隔(秒)
+        """
+        self.interval = interval
+        self.max_workers = max_workers
+        self.max_interval = max_interval
+        self._tasks: Dict[Tuple[str, str], _WatchedTask] = {}
+        self._intervals: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def subscribe(self,
+                  generator: "BaseVideoGenerator",
+                  task_id: str,
+                  listener: StatusListener) -> Callable[[], None]:
+        """
+        订阅任务状态变化
+
+        每当任务状态或进度变化时调用 listener，任务进入终态后自动退订。
+
+        Args:
+            generator: 任务所属的生成器
+            task_id: 任务ID
+            listener: 状态变化回调，在轮询线程中调用
+
+        Returns:
+            Callable: 取消订阅的函数
+        """
+        key = (generator.provider.value, task_id)
+        with self._lock:
+            task = self._tasks.get(key)
+            if task is None:
+                task = self._tasks[key] = _WatchedTask(generator, task_id)
+            task.listeners.append(listener)
+            last_status = task.last_status
+
+        # 已有状态的任务立即通知新的观察者，不必等下一轮
+        if last_status is not None:
+            self._notify(listener, last_status)
+
+        self._ensure_running()
+        self._wakeup.set()
+
+        def unsubscribe():
+            with self._lock:
+                current = self._tasks.get(key)
+                if current is not None and listener in current.listeners:
+                    current.listeners.remove(listener)
+                    if not current.listeners:
+                        del self._tasks[key]
+
+        return unsubscribe
+
+    def publish(self, status: "VideoTaskStatus"):
+        """
+        推送外部获得的任务状态（如回调服务收到的结果）
+
+        Args:
+            status: 任务状态
+        """
+        key = (status.provider.value, status.task_id)
+        with self._lock:
+            task = self._tasks.get(key)
+            if task is None:
+                return
+        self._dispatch(key, task, status)
+
+    def set_interval(self, provider: str, interval: Optional[float]):
+        """
+        单独设置某个供应商任务的轮询间隔
+
+        结果由回调推送的供应商只需低频兜底轮询。
+
+        Args:
+            provider: 供应商标识
+            interval: 轮询间隔(秒)，None 时恢复默认间隔
+        """
+        with self._lock:
+            if interval is None:
+                self._intervals.pop(provider, None)
+            else:
+                self._intervals[provider] = interval
+
+    def watching(self) -> int:
+        """当前正在观察的任务数"""
+        with self._lock:
+            return len(self._tasks)
+
+    def _ensure_running(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                    thread_name_prefix="video-poller")
+                self._thread = threading.Thread(target=self._run, name="video-task-poller", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            now = time.monotonic()
+            with self._lock:
+                due = [(key, task) for key, task in self._tasks.items() if task.next_poll <= now]
+                pending = [task.next_poll for task in self._tasks.values() if task.next_poll > now]
+                for key, task in due:
+                    task.next_poll = now + self._intervals.get(key[0], self.interval)
+
+            if due:
+                list(self._executor.map(self._poll_batch, self._batches(due)))
+                continue
+
+            timeout = max(0.0, min(pending) - time.monotonic()) if pending else None
+            self._wakeup.wait(timeout)
+            self._wakeup.clear()
+
+    @staticmethod
+    def _batches(due: List[Tuple[Tuple[str, str], _WatchedTask]]) -> List[List[Tuple[Tuple[str, str], _WatchedTask]]]:
+        """支持批量查询的生成器的任务合并为一批，其余任务各自一批"""
+        batches = []
+        grouped: Dict[int, List[Tuple[Tuple[str, str], _WatchedTask]]] = {}
+        for item in due:
+            generator = item[1].generator
+            if generator.supports_bulk_status:
+                batch = grouped.get(id(generator))
+                if batch is None:
+                    batch = grouped[id(generator)] = []
+                    batches.append(batch)
+                batch.append(item)
+            else:
+                batches.append([item])
+        return batches
+
+    def _poll_batch(self, batch: List[Tuple[Tuple[str, str], _WatchedTask]]):
+        if len(batch) == 1:
+            self._poll(*batch[0])
+            return
+
+        generator = batch[0][1].generator
+        try:
+            statuses = generator.get_task_statuses([task.task_id for _, task in batch])
+        except Exception:
+            logger.warning("批量查询任务状态失败: %s", generator.provider.value, exc_info=True)
+            return
+        for key, task in batch:
+            status = statuses.get(task.task_id)
+            if status is not None:
+                self._dispatch(key, task, status)
+
+    def _poll(self, key: Tuple[str, str], task: _WatchedTask):
+        try:
+            status = task.generator.get_task_status(task.task_id)
+        except Exception:
+            logger.warning("查询任务状态失败: %s/%s", key[0], key[1], exc_info=True)
+            return
+        self._dispatch(key, task, status)
+
+    def _dispatch(self, key: Tuple[str, str], task: _WatchedTask, status: "VideoTaskStatus"):
+        with self._lock:
+            if status.estimated_time:
+                # 离预计完成还早时推迟下一次查询，在预计完成前一个间隔恢复正常轮询
+                wait = min(self.max_interval, status.estimated_time - self.interval)
+                if wait > self.interval:
+                    task.next_poll = max(task.next_poll, time.monotonic() + wait)
+            if not _changed(task.last_status, status):
+                return
+            task.last_status = status
+            listeners = list(task.listeners)
+            if status.status.is_terminal:
+                self._tasks.pop(key, None)
+
+        for listener in listeners:
+            self._notify(listener, status)
+
+    @staticmethod
+    def _notify(listener: StatusListener, status: "VideoTaskStatus"):
+        try:
+            listener(status)
+        except Exception:
+            logger.exception("任务状态回调执行失败: %s", status.task_id)
+
+
+_default_poller: Optional[TaskPoller] = None
+_default_lock = threading.Lock()
+
+
+def default_poller() -> TaskPoller:
+    """进程内共享的默认轮询器"""
+    global _default_poller
+    with _default_lock:
+        if _default_poller is None:
+            _default_poller = TaskPoller()
+        return _default_poller
+
+
+class TaskWatch:
+    """
+    任务状态迭代器
+
+    同时支持同步和异步迭代，仅在状态或进度变化时产出，
+    任务进入终态后结束::
+
+        for status in generator.watch(task_id):
+            print(status.progress)
+
+        async for status in generator.watch(task_id):
+            print(status.progress)
+    """
+
+    def __init__(self, poller: TaskPoller, generator: "BaseVideoGenerator", task_id: str,
+                 deadline: Optional[Deadline] = None):
+        self.task_id = task_id
+        self.deadline = deadline
+        self._queue: "queue.Queue[VideoTaskStatus]" = queue.Queue()
+        self._async_queue: Optional[asyncio.Queue] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = threading.Lock()
+        self._done = False
+        self._unsubscribe = poller.subscribe(generator, task_id, self._put)
+
+    def _put(self, status: "VideoTaskStatus"):
+        with self._lock:
+            if self._async_queue is not None:
+                self._loop.call_soon_threadsafe(self._async_queue.put_nowait, status)
+            else:
+                self._queue.put(status)
+
+    def _remaining(self) -> Optional[float]:
+        return None if self.deadline is None else self.deadline.remaining()
+
+    def _expire(self):
+        self.close()
+        raise DeadlineExceeded(f"观察任务 {self.task_id} 超过截止时间")
+
+    def _take(self, status: "VideoTaskStatus") -> "VideoTaskStatus":
+        if status.status.is_terminal:
+            self.close()
+        return status
+
+    def close(self):
+        """停止观察"""
+        self._done = True
+        self._unsubscribe()
+
+    def __enter__(self) -> "TaskWatch":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __iter__(self) -> "TaskWatch":
+        return self
+
+    def __next__(self) -> "VideoTaskStatus":
+        if self._done:
+            raise StopIteration
+        try:
+            return self._take(self._queue.get(timeout=self._remaining()))
+        except queue.Empty:
+            self._expire()
+
+    def __aiter__(self) -> "TaskWatch":
+        with self._lock:
+            if self._async_queue is None:
+                self._loop = asyncio.get_running_loop()
+                self._async_queue = asyncio.Queue()
+                while not self._queue.empty():
+                    self._async_queue.put_nowait(self._queue.get_nowait())
+        return self
+
+    async def __anext__(self) -> "VideoTaskStatus":
+        if self._done:
+            raise StopAsyncIteration
+        try:
+            status = await asyncio.wait_for(self._async_queue.get(), self._remaining())
+        except asyncio.TimeoutError:
+            self._expire()
+        return self._take(status)
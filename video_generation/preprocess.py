@@ -0,0 +1,257 @@
+"""
+输入图片预处理
+
+图片生成视频与参考主体生成视频提交前，在本地完成图片的裁剪、缩放与重新编码：
+- 按 VideoSizeAdapter 为目标供应商和模型选出的尺寸居中裁剪到相同宽高比，
+  并缩小到不超过该尺寸，避免上传超大原图，也避免供应商二次裁剪或拒绝
+- 解码与编码等 CPU 密集的工作在进程池中执行，不占用提交线程的 GIL
+- 结果按原图内容哈希与处理参数缓存，同一张图片只处理一次
+
+需要安装 Pillow::
+
+    generator.preprocessor = ImagePreprocessor()
+    generator.image_to_video(request)  # 提交前自动处理 image_url
+"""
+
+import base64
+import dataclasses
+import hashlib
+import io
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Callable, Dict, Optional, Tuple
+
+from video_generation.base import ImageToVideoRequest, SubjectReferenceRequest
+from video_generation.deadline import current_deadline, effective_deadline
+from video_generation.errors import DeadlineExceeded
+from video_generation.size_adapter import VideoSizeAdapter
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # pragma: no cover - 可选依赖
+    Image = None
+    ImageOps = None
+
+if TYPE_CHECKING:
+    from video_generation.base import BaseVideoGenerator, VideoRequest
+
+# 各请求类型中图片地址所在的字段
+IMAGE_FIELDS = {
+    ImageToVideoRequest: "image_url",
+    SubjectReferenceRequest: "reference_url",
+}
+
+_MIME_TYPES = {
+    "JPEG": "image/jpeg",
+    "PNG": "image/png",
+    "WEBP": "image/webp",
+}
+
+CacheKey = Tuple[str, int, int, str, int]
+
+
+@dataclass(frozen=True)
+class PreparedImage:
+    """处理后的图片"""
+    data: bytes  # 编码后的图片内容
+    mime_type: str  # 例如: "image/jpeg"
+    width: int  # 处理后的宽度（像素）
+    height: int  # 处理后的高度（像素）
+    source_hash: str  # 原图内容的 SHA-256
+
+    @property
+    def data_url(self) -> str:
+        """base64 形式的 data URL"""
+        return f"data:{self.mime_type};base64,{base64.b64encode(self.data).decode('ascii')}"
+
+
+def read_image(generator: "BaseVideoGenerator", url: str) -> bytes:
+    """读取输入图片：data URL 直接解码，http(s) 地址经生成器的连接下载，其余视为本地路径"""
+    if url.startswith("data:"):
+        return base64.b64decode(url.split(",", 1)[1])
+    if url.startswith(("http://", "https://")):
+        deadline = effective_deadline(generator.timeouts)
+        if deadline is not None:
+            deadline.check("下载输入图片")
+            timeout = deadline.http_timeout(generator.timeouts)
+        else:
+            timeout = (generator.timeouts.connect, generator.timeouts.read)
+        response = generator.transport.request("GET", url, timeout=timeout)
+        response.raise_for_status()
+        return response.content
+    if url.startswith("file://"):
+        url = url[len("file://"):]
+    with open(os.path.expanduser(url), "rb") as f:
+        return f.read()
+
+
+def _transform(data: bytes, width: int, height: int, fmt: str, quality: int) -> Tuple[bytes, int, int]:
+    """在工作进程中执行：居中裁剪到目标宽高比，缩小到不超过目标尺寸后重新编码"""
+    with Image.open(io.BytesIO(data)) as image:
+        image = ImageOps.exif_transpose(image)
+        ratio = width / height
+        if abs(image.width / image.height - ratio) > 0.01:
+            if image.width / image.height > ratio:
+                size = (round(image.height * ratio), image.height)
+            else:
+                size = (image.width, round(image.width / ratio))
+            image = ImageOps.fit(image, size, Image.LANCZOS)
+        if image.width > width or image.height > height:
+            image = image.resize((width, height), Image.LANCZOS)
+        if fmt == "JPEG" and image.mode != "RGB":
+            image = image.convert("RGB")
+        out = io.BytesIO()
+        image.save(out, format=fmt, quality=quality, optimize=True)
+        return out.getvalue(), image.width, image.height
+
+
+class ImagePreprocessor:
+    """
+    输入图片预处理器
+
+    设置到生成器的 preprocessor 属性后，图片类请求在获取密钥租约之前完成预处理，
+    请求的副本中图片地址被替换为 publish 返回的地址，原请求不会被修改。
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, fmt: str = "JPEG", quality: int = 90,
+                 cache_bytes: int = 64 * 1024 * 1024,
+                 publish: Optional[Callable[[PreparedImage], str]] = None):
+        """
+        Args:
+            max_workers: 进程池大小，默认为 CPU 核数
+            fmt: 输出格式，JPEG、PNG 或 WEBP
+            quality: JPEG/WEBP 编码质量
+            cache_bytes: 结果缓存的最大字节数
+            publish: 将处理结果转换为供应商可访问的地址，默认使用 data URL；
+                需要自行上传图片的供应商（如 Stability）通过 read_image 读取，同样支持 data URL
+
+        Raises:
+            ImportError: 未安装 Pillow
+            ValueError: 不支持的输出格式
+        """
+        if Image is None:
+            raise ImportError("图片预处理需要安装 Pillow")
+        fmt = fmt.upper()
+        if fmt not in _MIME_TYPES:
+            raise ValueError(f"不支持的图片格式: {fmt}")
+        self.max_workers = max_workers
+        self.fmt = fmt
+        self.quality = quality
+        self.cache_bytes = cache_bytes
+        self.publish = publish or (lambda image: image.data_url)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._cache: "OrderedDict[CacheKey, PreparedImage]" = OrderedDict()
+        self._cached_bytes = 0
+        self._pending: Dict[CacheKey, Future] = {}
+        self._lock = threading.Lock()
+
+    def prepare(self, generator: "BaseVideoGenerator", request: "VideoRequest") -> "VideoRequest":
+        """
+        处理请求中的图片，返回替换了图片地址的请求副本
+
+        Args:
+            generator: 目标生成器，用于确定供应商、模型与下载图片使用的连接
+            request: 图片生成视频或参考主体生成视频请求，其他请求原样返回
+
+        Returns:
+            VideoRequest: 请求副本
+        """
+        field = IMAGE_FIELDS.get(type(request))
+        if field is None:
+            return request
+        width, height = self.target_size(generator, request)
+        image = self.process(read_image(generator, getattr(request, field)), width, height)
+        return dataclasses.replace(request, **{field: self.publish(image)})
+
+    @staticmethod
+    def target_size(generator: "BaseVideoGenerator", request: "VideoRequest") -> Tuple[int, int]:
+        """
+        按请求的宽高比（或宽高）选出供应商支持的尺寸
+
+        设置了 aspect_ratio 时保持请求宽高中较长的一边，另一边按宽高比计算；
+        没有尺寸表的供应商直接使用该尺寸，图片不会大于请求的视频尺寸。
+        """
+        width, height = request.width, request.height
+        if request.aspect_ratio:
+            try:
+                ratio_w, ratio_h = (float(part) for part in request.aspect_ratio.split(":", 1))
+            except ValueError:
+                ratio_w = ratio_h = 0.0
+            if ratio_w > 0 and ratio_h > 0:
+                longest = max(width, height)
+                if ratio_w >= ratio_h:
+                    width, height = longest, max(1, round(longest * ratio_h / ratio_w))
+                else:
+                    width, height = max(1, round(longest * ratio_w / ratio_h)), longest
+        return VideoSizeAdapter.adapt_size(width, height, generator.provider, generator.model)
+
+    def process(self, data: bytes, width: int, height: int) -> PreparedImage:
+        """
+        处理图片内容，同一内容与参数的并发调用只处理一次
+
+        Args:
+            data: 原图内容
+            width: 目标宽度
+            height: 目标高度
+
+        Returns:
+            PreparedImage: 处理结果
+
+        Raises:
+            DeadlineExceeded: 当前截止时间前没有处理完
+        """
+        source_hash = hashlib.sha256(data).hexdigest()
+        key = (source_hash, width, height, self.fmt, self.quality)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                return cached
+            future = self._pending.get(key)
+            owner = future is None
+            if owner:
+                if self._executor is None:
+                    self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+                future = self._executor.submit(_transform, data, width, height, self.fmt, self.quality)
+                self._pending[key] = future
+        deadline = current_deadline()
+        image = None
+        try:
+            try:
+                encoded, out_width, out_height = future.result(
+                    timeout=deadline.remaining() if deadline is not None else None)
+            except FutureTimeoutError:
+                raise DeadlineExceeded("图片预处理超过截止时间") from None
+            image = PreparedImage(encoded, _MIME_TYPES[self.fmt], out_width, out_height, source_hash)
+        finally:
+            if owner:
+                with self._lock:
+                    self._pending.pop(key, None)
+                    if image is not None:
+                        self._remember(key, image)
+        return image
+
+    def _remember(self, key: CacheKey, image: PreparedImage):
+        """在持有锁时调用，超出容量时淘汰最久未使用的结果"""
+        self._cache[key] = image
+        self._cached_bytes += len(image.data)
+        while self._cached_bytes > self.cache_bytes and len(self._cache) > 1:
+            _, evicted = self._cache.popitem(last=False)
+            self._cached_bytes -= len(evicted.data)
+
+    def close(self):
+        """关闭进程池"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown()
+
+    def __enter__(self) -> "ImagePreprocessor":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
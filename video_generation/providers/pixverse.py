@@ -1,39 +1,43 @@
-import requests
 from datetime import datetime
 from typing import Optional
 from video_generation.base import (
     BaseVideoGenerator, VideoProvider, TaskStatus,
     TextToVideoRequest, ImageToVideoRequest, SubjectReferenceRequest,
-    VideoTaskResponse, VideoTaskStatus
+    VideoTaskResponse, VideoTaskStatus, task_submission, task_query
 )
 
 
 class PixverseVideoGenerator(BaseVideoGenerator):
     """PixVerse AI V3视频生成器"""
 
+    ENDPOINTS = ("https://api.pixverse.ai/v3",)
+
     def __init__(self, api_key: str, api_secret: Optional[str] = None, model: Optional[str] = None):
         super().__init__(api_key, api_secret, model)
-        self.base_url = "https://api.pixverse.ai/v3"
         self.model = model or "pixverse-v3"  # 默认使用 pixverse-v3 模型
 
     def _get_provider(self) -> VideoProvider:
         return VideoProvider.PIXVERSE
 
+    @task_submission
     def text_to_video(self, request: TextToVideoRequest) -> VideoTaskResponse:
         """文本生成视频"""
         # TODO: 根据PixVerse实际API文档实现
         raise NotImplementedError("PixVerse text_to_video 待实现")
 
+    @task_submission
     def image_to_video(self, request: ImageToVideoRequest) -> VideoTaskResponse:
         """图片生成视频"""
         # TODO: 根据PixVerse实际API文档实现
         raise NotImplementedError("PixVerse image_to_video 待实现")
 
+    @task_submission
     def subject_reference(self, request: SubjectReferenceRequest) -> VideoTaskResponse:
         """参考主体生成视频"""
         # TODO: 根据PixVerse实际API文档实现
         raise NotImplementedError("PixVerse subject_reference 待实现")
 
+    @task_query
     def get_task_status(self, task_id: str) -> VideoTaskStatus:
         """获取任务状态"""
         # TODO: 根据PixVerse实际API文档实现
@@ -1,35 +1,33 @@
-import requests
-import json
 from datetime import datetime
-from typing import Optional
+from video_generation import codec, preprocess
 from video_generation.base import (
     BaseVideoGenerator, VideoProvider, TaskStatus,
     TextToVideoRequest, ImageToVideoRequest, SubjectReferenceRequest,
-    VideoTaskResponse, VideoTaskStatus
+    VideoTaskResponse, VideoTaskStatus, task_submission, task_query
 )
 
 
 class StabilityVideoGenerator(BaseVideoGenerator):
     """Stability.ai 视频生成器"""
 
-    def __init__(self, api_key: str, api_secret: Optional[str] = None, model: Optional[str] = None):
-        super().__init__(api_key, api_secret, model)
-        self.base_url = "https://api.stability.ai/v2beta"
+    ENDPOINTS = ("https://api.stability.ai/v2beta",)
 
     def _get_provider(self) -> VideoProvider:
         return VideoProvider.STABILITY
 
+    @task_submission
     def text_to_video(self, request: TextToVideoRequest) -> VideoTaskResponse:
         """文本生成视频 - 未实现"""
         raise NotImplementedError("Stability.ai 不支持文本生成视频")
 
+    @task_submission
     def image_to_video(self, request: ImageToVideoRequest) -> VideoTaskResponse:
         """图片生成视频"""
         url = f"{self.base_url}/image-to-video"
 
-        # 构建请求参数
+        # 构建请求参数，输入图片不经 _send 读取，图床的错误不计入密钥状态
         files = {
-            'image': ('image.png', requests.get(request.image_url).content)
+            'image': ('image.png', preprocess.read_image(self, request.image_url))
         }
 
         data = {
@@ -42,9 +40,9 @@ class StabilityVideoGenerator(BaseVideoGenerator):
             "Authorization": f"Bearer {self.api_key}"
         }
 
-        response = requests.post(url, files=files, data=data, headers=headers)
+        response = self._send("POST", url, headers, files=files, data=data)
         response.raise_for_status()
-        data = response.json()
+        data = codec.decode(response.content)
 
         return VideoTaskResponse(
             task_id=data["id"],
@@ -54,10 +52,19 @@ class StabilityVideoGenerator(BaseVideoGenerator):
             message="Task created"
         )
 
+    @task_submission
     def subject_reference(self, request: SubjectReferenceRequest) -> VideoTaskResponse:
         """参考主体生成视频 - 未实现"""
         raise NotImplementedError("Stability.ai 不支持参考主体生成视频")
 
+    def _download_headers(self) -> dict:
+        # 结果地址即查询接口，需要鉴权并声明接收视频
+        return {
+            "Authorization": f"Bearer {self.api_key}",
+            "Accept": "video/*"
+        }
+
+    @task_query
     def get_task_status(self, task_id: str) -> VideoTaskStatus:
         """获取任务状态"""
         url = f"{self.base_url}/image-to-video/result/{task_id}"
@@ -66,10 +73,10 @@ class StabilityVideoGenerator(BaseVideoGenerator):
             "Accept": "video/*"
         }
 
-        response = requests.get(url, headers=headers)
+        response = self._send("GET", url, headers)
 
         if response.status_code == 202:
-            data = response.json()
+            data = codec.decode(response.content)
             return VideoTaskStatus(
                 task_id=task_id,
                 provider=self.provider,
@@ -98,7 +105,7 @@ class StabilityVideoGenerator(BaseVideoGenerator):
             )
         else:
             # 处理错误情况
-            error_data = response.json()
+            error_data = codec.decode(response.content)
             return VideoTaskStatus(
                 task_id=task_id,
                 provider=self.provider,
@@ -1,203 +1,130 @@
-import requests
-from datetime import datetime
-from typing import Optional
+from typing import Optional, Dict, List
 from video_generation.base import (
-    BaseVideoGenerator, VideoProvider, TaskStatus,
+    VideoProvider, TaskStatus,
     TextToVideoRequest, ImageToVideoRequest, SubjectReferenceRequest,
-    VideoTaskResponse, VideoTaskStatus
+    VideoTaskStatus, task_cancel
 )
 from video_generation.size_adapter import VideoSizeAdapter, TongyiModel
+from video_generation.spec import Computed, FromModel, FromRequest, ProviderSpec, SpecVideoGenerator, Submission
 
 
-class TongyiVideoGenerator(BaseVideoGenerator):
-    """通义万相视频生成器"""
-
-    def __init__(self, api_key: str, api_secret: Optional[str] = None, model: Optional[str] = None):
-        super().__init__(api_key, api_secret, model)
-        self.base_url = "https://dashscope.aliyuncs.com/api/v1/services/aigc/video-generation"
-        self.model = model or TongyiModel.T2V_TURBO.value
-
-    def _get_provider(self) -> VideoProvider:
-        return VideoProvider.TONGYI
-
-    def text_to_video(self, request: TextToVideoRequest) -> VideoTaskResponse:
-        """文本生成视频"""
-        url = f"{self.base_url}/video-synthesis"
-
-        # 使用尺寸适配器获取合适的尺寸
-        width, height = VideoSizeAdapter.adapt_size(
-            request.width,
-            request.height,
-            self.provider,
-            self.model
-        )
-
-        payload = {
-            "model": self.model,
-            "input": {
-                "prompt": request.prompt
-            },
-            "parameters": {
-                "size": VideoSizeAdapter.get_size_string(width, height)
-            }
-        }
+def _size(generator, request) -> str:
+    """使用尺寸适配器获取合适的尺寸"""
+    width, height = VideoSizeAdapter.adapt_size(
+        request.width,
+        request.height,
+        generator.provider,
+        generator.model
+    )
+    return VideoSizeAdapter.get_size_string(width, height)
 
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json",
-            "X-DashScope-Async": "enable"  # 启用异步调用
-        }
-
-        response = requests.post(url, json=payload, headers=headers)
-        response.raise_for_status()
-        data = response.json()
-
-        return VideoTaskResponse(
-            task_id=data["output"]["task_id"],
-            provider=self.provider,
-            status=TaskStatus.PENDING,
-            create_time=datetime.now(),
-            message=data.get("message")
-        )
-
-    def image_to_video(self, request: ImageToVideoRequest) -> VideoTaskResponse:
-        """图片生成视频"""
-        url = f"{self.base_url}/video-synthesis"
-
-        # 使用尺寸适配器获取合适的尺寸
-        width, height = VideoSizeAdapter.adapt_size(
-            request.width,
-            request.height,
-            self.provider,
-            self.model,  # 默认使用turbo模型
-        )
-
-        payload = {
-            "model": self.model,  # 或使用 wanx2.1-i2v-plus
-            "input": {
-                "image_url": request.image_url,
-                "prompt": request.prompt
-            },
-            "parameters": {
-                "size": VideoSizeAdapter.get_size_string(width, height),
-                "motion_strength": request.motion_strength if request.motion_strength else 0.5  # 默认值为0.5
-            }
-        }
-
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json",
-            "X-DashScope-Async": "enable"  # 启用异步调用
-        }
 
-        response = requests.post(url, json=payload, headers=headers)
-        response.raise_for_status()
-        data = response.json()
-
-        return VideoTaskResponse(
-            task_id=data["output"]["task_id"],
-            provider=self.provider,
-            status=TaskStatus.PENDING,
-            create_time=datetime.now(),
-            message=data.get("message")
-        )
-
-    def subject_reference(self, request: SubjectReferenceRequest) -> VideoTaskResponse:
-        """参考主体生成视频"""
-        url = f"{self.base_url}/video-synthesis"
-
-        # 使用尺寸适配器获取合适的尺寸
-        width, height = VideoSizeAdapter.adapt_size(
-            request.width,
-            request.height,
-            self.provider,
-            self.model
-        )
-
-        payload = {
-            "model": self.model,
-            "input": {
-                "function": "image_reference",
-                "prompt": request.prompt,
-                "ref_images_url": [request.reference_url]
-            },
-            "parameters": {
-                "obj_or_bg": ["obj"],  # 指定参考图为对象
-                "size": VideoSizeAdapter.get_size_string(width, height)
-            }
-        }
-
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json",
-            "X-DashScope-Async": "enable"  # 启用异步调用
-        }
-
-        response = requests.post(url, json=payload, headers=headers)
-        response.raise_for_status()
-        data = response.json()
-
-        return VideoTaskResponse(
-            task_id=data["output"]["task_id"],
-            provider=self.provider,
-            status=TaskStatus.PENDING,
-            create_time=datetime.now(),
-            message=data.get("message")
-        )
-
-    def get_task_status(self, task_id: str) -> VideoTaskStatus:
-        """获取任务状态"""
-        url = f"https://dashscope.aliyuncs.com/api/v1/tasks/{task_id}"
-        headers = {
-            "Authorization": f"Bearer {self.api_key}"
-        }
-
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()
-        data = response.json()
+class TongyiVideoGenerator(SpecVideoGenerator):
+    """通义万相视频生成器"""
 
-        # 通义万相状态映射
-        status_map = {
+    ENDPOINTS = ("https://dashscope.aliyuncs.com/api/v1",)  # 国际站（需对应地域密钥）: https://dashscope-intl.aliyuncs.com/api/v1
+    supports_bulk_status = True
+    supports_cancel = True
+
+    SPEC = ProviderSpec(
+        submissions={
+            TextToVideoRequest: Submission("/services/aigc/video-generation/video-synthesis", {
+                "model": FromModel(),
+                "input": {
+                    "prompt": FromRequest("prompt")
+                },
+                "parameters": {
+                    "size": Computed(_size)
+                }
+            }),
+            ImageToVideoRequest: Submission("/services/aigc/video-generation/video-synthesis", {
+                "model": FromModel(),  # 或使用 wanx2.1-i2v-plus
+                "input": {
+                    "image_url": FromRequest("image_url"),
+                    "prompt": FromRequest("prompt")
+                },
+                "parameters": {
+                    "size": Computed(_size),
+                    "motion_strength": FromRequest("motion_strength", 0.5)  # 默认值为0.5
+                }
+            }),
+            SubjectReferenceRequest: Submission("/services/aigc/video-generation/video-synthesis", {
+                "model": FromModel(),
+                "input": {
+                    "function": "image_reference",
+                    "prompt": FromRequest("prompt"),
+                    "ref_images_url": [FromRequest("reference_url")]
+                },
+                "parameters": {
+                    "obj_or_bg": ["obj"],  # 指定参考图为对象
+                    "size": Computed(_size)
+                }
+            }),
+        },
+        status_path="/tasks/{task_id}",
+        status_map={
             "PENDING": TaskStatus.PENDING,
             "RUNNING": TaskStatus.PROCESSING,
             "SUCCEEDED": TaskStatus.COMPLETED,
             "FAILED": TaskStatus.FAILED,
             "CANCELED": TaskStatus.FAILED,
             "UNKNOWN": TaskStatus.FAILED
-        }
-
-        output = data.get("output", {})
-
-        return VideoTaskStatus(
-            task_id=task_id,
-            provider=self.provider,
-            status=status_map.get(output.get("task_status"), TaskStatus.PENDING),
-            progress=1.0 if output.get("task_status") == "SUCCEEDED" else 0.0,
-            video_url=output.get("video_url"),
-            thumbnail_url=None,  # API不返回缩略图
-            error_message=output.get("message") if output.get("task_status") == "FAILED" else None,
-            create_time=datetime.fromisoformat(output.get("submit_time")) if output.get(
-                "submit_time") else datetime.now(),
-            update_time=datetime.fromisoformat(output.get("end_time")) if output.get("end_time") else datetime.now(),
-            estimated_time=None  # API不返回预计时间
-        )
-
-    def _make_request(self, url: str, payload: dict) -> dict:
-        """发起HTTP请求"""
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
+        },
+        state="output.task_status",
+        task_id="output.task_id",
+        headers={},  # 查询与取消只需鉴权头
+        submit_headers={
             "Content-Type": "application/json",
             "X-DashScope-Async": "enable"  # 启用异步调用
-        }
+        },
+        message="message",
+        create_time="output.submit_time",
+        update_time="output.end_time",
+        video_url="output.video_url",  # API不返回缩略图与预计时间
+        error="output.message",
+        error_on_failure_only=True
+    )
 
-        # 过滤None值
-        def filter_none(obj):
-            if isinstance(obj, dict):
-                return {k: filter_none(v) for k, v in obj.items() if v is not None}
-            return obj
+    def __init__(self, api_key: str, api_secret: Optional[str] = None, model: Optional[str] = None):
+        super().__init__(api_key, api_secret, model)
+        self.model = model or TongyiModel.T2V_TURBO.value
 
-        payload = filter_none(payload)
+    def _get_provider(self) -> VideoProvider:
+        return VideoProvider.TONGYI
 
-        response = requests.post(url, json=payload, headers=headers)
-        response.raise_for_status()
-        return response.json()
+    @task_cancel
+    def cancel_task(self, task_id: str) -> bool:
+        """取消任务，仅排队中(PENDING)的任务可以取消"""
+        url = f"{self.base_url}/tasks/{task_id}/cancel"
+
+        self._request("POST", url)
+        return True
+
+    def _list_task_statuses(self, task_ids: List[str]) -> Dict[str, VideoTaskStatus]:
+        """
+        通过批量任务查询接口（默认最近24小时）获取进行中任务的状态
+
+        列表项与单个查询结果的 output 字段一致（task_status、submit_time、end_time），按同一描述解析；
+        列表项不含视频地址和错误信息，已进入终态的任务不在返回结果中，交由逐个查询获取详情。
+        """
+        wanted = set(task_ids)
+        seen = set()
+        found = {}
+        for page_no in range(1, self.LIST_MAX_PAGES + 1):
+            url = f"{self.base_url}/tasks?page_no={page_no}&page_size={self.LIST_PAGE_SIZE}"
+            data = self._request("GET", url)
+
+            for item in data.get("data") or []:
+                task_id = item.get("task_id")
+                if task_id not in wanted:
+                    continue
+                seen.add(task_id)
+                if "task_status" not in item:
+                    item = {**item, "task_status": item.get("status")}
+                status = self._parse_status(task_id, {"output": item})
+                if status.status.is_terminal:
+                    continue
+                found[task_id] = status
+            if len(seen) == len(wanted) or page_no >= (data.get("total_page") or 0):
+                break
+        return found
@@ -0,0 +1,292 @@
+"""
+声明式供应商描述
+
+各供应商的差异集中在接口路径、请求体字段映射、状态映射与响应字段位置上。
+ProviderSpec 以数据的形式描述这些差异，在类定义时编译一次：
+- 请求体模板编译为构造函数，调用时只分配请求体本身
+- 响应字段路径编译为取值函数
+- 请求头按密钥预先构造并复用
+
+新增一个 JSON 接口的供应商只需声明 SPEC，无需重复编写提交、查询与解析代码。
+"""
+
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple, Type, Union
+
+from video_generation import codec
+from video_generation.base import (
+    BaseVideoGenerator, TaskStatus, VideoProvider,
+    TextToVideoRequest, ImageToVideoRequest, SubjectReferenceRequest,
+    VideoRequest, VideoTaskResponse, VideoTaskStatus, task_submission, task_query
+)
+
+Builder = Callable[[BaseVideoGenerator, Any], Any]
+Getter = Callable[[Any], Any]
+
+
+class FromRequest:
+    """取请求字段，字段为空时使用默认值，非空时可先转换"""
+    __slots__ = ("attr", "default", "convert")
+
+    def __init__(self, attr: str, default: Any = None, convert: Optional[Callable[[Any], Any]] = None):
+        self.attr = attr
+        self.default = default
+        self.convert = convert
+
+
+class FromModel:
+    """取生成器的模型名称，未设置时使用默认值"""
+    __slots__ = ("default",)
+
+    def __init__(self, default: Optional[str] = None):
+        self.default = default
+
+
+class Computed:
+    """由生成器与请求计算得到的值"""
+    __slots__ = ("fn",)
+
+    def __init__(self, fn: Builder):
+        self.fn = fn
+
+
+class Const:
+    """响应解析中的固定值"""
+    __slots__ = ("value",)
+
+    def __init__(self, value: Any):
+        self.value = value
+
+
+Path = Union[str, Const, None]
+
+
+@dataclass(frozen=True)
+class Submission:
+    """一种请求类型的提交方式"""
+    path: str  # 相对接入点的路径，例如: "/generations"
+    payload: Dict[str, Any]  # 请求体模板
+
+
+@dataclass(frozen=True)
+class ProviderSpec:
+    """供应商接口描述"""
+    submissions: Mapping[Type[VideoRequest], Submission]  # 支持的请求类型
+    status_path: str  # 查询路径，{task_id} 会被替换，例如: "/tasks/{task_id}"
+    status_map: Mapping[Any, TaskStatus]  # 供应商状态到通用状态的映射，未知状态视为等待中
+    state: str  # 查询结果中状态字段的路径，例如: "output.task_status"
+    task_id: str = "id"  # 提交结果中任务ID的路径
+    status_method: str = "GET"  # 查询使用的HTTP方法
+    status_payload_key: Optional[str] = None  # 查询需要请求体时任务ID所在的字段
+    auth_scheme: str = "Bearer"  # Authorization 前缀
+    headers: Mapping[str, str] = field(default_factory=lambda: {"Content-Type": codec.JSON_CONTENT_TYPE})
+    submit_headers: Mapping[str, str] = field(default_factory=dict)  # 仅提交时附加的请求头
+    submit_state: Path = None  # 提交结果中状态字段的路径，为空时视为等待中
+    message: Path = None  # 提交结果中消息字段的路径
+    create_time: Path = None  # 创建时间(ISO格式)的路径，提交结果与查询结果通用
+    update_time: Path = None  # 查询结果中更新时间(ISO格式)的路径
+    video_url: Path = None  # 查询结果中视频地址的路径
+    thumbnail_url: Path = None  # 查询结果中缩略图地址的路径
+    error: Path = None  # 查询结果中错误信息的路径
+    error_on_failure_only: bool = False  # 只在失败时读取错误信息
+    failure_message: Optional[str] = None  # 失败但没有错误信息时使用的说明
+
+
+def _compile_value(template: Any) -> Builder:
+    """将请求体模板编译为 (generator, request) -> 值 的函数"""
+    if isinstance(template, FromRequest):
+        attr, default, convert = template.attr, template.default, template.convert
+        if convert is None:
+            def get(generator, request):
+                value = getattr(request, attr, None)
+                return value if value else default
+        else:
+            def get(generator, request):
+                value = getattr(request, attr, None)
+                return convert(value) if value else default
+        return get
+    if isinstance(template, FromModel):
+        default = template.default
+        return lambda generator, request: generator.model or default
+    if isinstance(template, Computed):
+        return template.fn
+    if isinstance(template, dict):
+        items = tuple((key, _compile_value(value)) for key, value in template.items())
+        return lambda generator, request: {key: build(generator, request) for key, build in items}
+    if isinstance(template, list):
+        builders = tuple(_compile_value(value) for value in template)
+        return lambda generator, request: [build(generator, request) for build in builders]
+    return lambda generator, request: template
+
+
+def _compile_path(path: Path) -> Getter:
+    """将 "a.b.0.c" 形式的路径编译为取值函数，任一层缺失时返回 None"""
+    if path is None:
+        return lambda data: None
+    if isinstance(path, Const):
+        value = path.value
+        return lambda data: value
+    keys = tuple(int(part) if part.isdigit() else part for part in path.split("."))
+
+    def get(data):
+        for key in keys:
+            if isinstance(key, int):
+                if not isinstance(data, list) or len(data) <= key:
+                    return None
+                data = data[key]
+            else:
+                if not isinstance(data, dict):
+                    return None
+                data = data.get(key)
+            if data is None:
+                return None
+        return data
+    return get
+
+
+def _parse_time(value: Any, default: datetime) -> datetime:
+    if not value:
+        return default
+    try:
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return default
+
+
+class CompiledSpec:
+    """编译后的供应商描述"""
+
+    def __init__(self, spec: ProviderSpec):
+        self.spec = spec
+        self.status_map = dict(spec.status_map)
+        self.submissions: Dict[type, Tuple[str, Builder]] = {
+            request_type: (submission.path, _compile_value(submission.payload))
+            for request_type, submission in spec.submissions.items()
+        }
+        self._task_id = _compile_path(spec.task_id)
+        self._state = _compile_path(spec.state)
+        self._submit_state = _compile_path(spec.submit_state) if spec.submit_state else None
+        self._message = _compile_path(spec.message)
+        self._create_time = _compile_path(spec.create_time)
+        self._update_time = _compile_path(spec.update_time)
+        self._video_url = _compile_path(spec.video_url)
+        self._thumbnail_url = _compile_path(spec.thumbnail_url)
+        self._error = _compile_path(spec.error)
+        self._headers: Dict[Tuple[str, bool], Dict[str, str]] = {}
+
+    def headers(self, api_key: str, submit: bool = False) -> Dict[str, str]:
+        """按密钥缓存的请求头，调用方不应修改"""
+        headers = self._headers.get((api_key, submit))
+        if headers is None:
+            headers = {"Authorization": f"{self.spec.auth_scheme} {api_key}", **self.spec.headers}
+            if submit:
+                headers.update(self.spec.submit_headers)
+            self._headers[(api_key, submit)] = headers
+        return headers
+
+    def parse_submission(self, provider: VideoProvider, data: Dict[str, Any]) -> VideoTaskResponse:
+        """解析提交结果"""
+        status = TaskStatus.PENDING
+        if self._submit_state is not None:
+            status = self.status_map.get(self._submit_state(data), TaskStatus.PENDING)
+        return VideoTaskResponse(
+            task_id=self._task_id(data),
+            provider=provider,
+            status=status,
+            create_time=_parse_time(self._create_time(data), datetime.now()),
+            message=self._message(data)
+        )
+
+    def parse_status(self, provider: VideoProvider, task_id: str, data: Dict[str, Any]) -> VideoTaskStatus:
+        """解析查询结果"""
+        status = self.status_map.get(self._state(data), TaskStatus.PENDING)
+        failed = status == TaskStatus.FAILED
+        error = self._error(data) if failed or not self.spec.error_on_failure_only else None
+        if error is None and failed:
+            error = self.spec.failure_message
+        now = datetime.now()
+        return VideoTaskStatus(
+            task_id=task_id,
+            provider=provider,
+            status=status,
+            progress=1.0 if status == TaskStatus.COMPLETED else 0.0,
+            video_url=self._video_url(data),
+            thumbnail_url=self._thumbnail_url(data),
+            error_message=error,
+            create_time=_parse_time(self._create_time(data), now),
+            update_time=_parse_time(self._update_time(data), now),
+            estimated_time=None
+        )
+
+
+_REQUEST_LABELS = {
+    TextToVideoRequest: "文本生成视频",
+    ImageToVideoRequest: "图片生成视频",
+    SubjectReferenceRequest: "参考主体生成视频",
+}
+
+
+class SpecVideoGenerator(BaseVideoGenerator):
+    """
+    由 SPEC 驱动的生成器
+
+    子类声明 ENDPOINTS 与 SPEC 即可，提交、查询与解析由编译后的描述完成，
+    特殊接口（批量查询、取消等）仍可按需覆盖。
+    """
+
+    SPEC: ProviderSpec
+    _compiled: CompiledSpec
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if "SPEC" in cls.__dict__:
+            cls._compiled = CompiledSpec(cls.SPEC)
+
+    @task_submission
+    def text_to_video(self, request: TextToVideoRequest) -> VideoTaskResponse:
+        """文本生成视频"""
+        return self._submit(request)
+
+    @task_submission
+    def image_to_video(self, request: ImageToVideoRequest) -> VideoTaskResponse:
+        """图片生成视频"""
+        return self._submit(request)
+
+    @task_submission
+    def subject_reference(self, request: SubjectReferenceRequest) -> VideoTaskResponse:
+        """参考主体生成视频"""
+        return self._submit(request)
+
+    @task_query
+    def get_task_status(self, task_id: str) -> VideoTaskStatus:
+        """获取任务状态"""
+        spec = self._compiled.spec
+        url = self.base_url + spec.status_path.format(task_id=task_id)
+        payload = {spec.status_payload_key: task_id} if spec.status_payload_key else None
+        return self._parse_status(task_id, self._request(spec.status_method, url, payload))
+
+    def parse_callback(self, payload: Dict[str, Any]) -> VideoTaskStatus:
+        """解析回调内容，回调体与查询结果格式一致且带有任务 id"""
+        if not self.supports_callback:
+            return super().parse_callback(payload)
+        return self._parse_status(payload["id"], payload)
+
+    def _submit(self, request: VideoRequest) -> VideoTaskResponse:
+        submission = self._compiled.submissions.get(type(request))
+        if submission is None:
+            label = _REQUEST_LABELS.get(type(request), type(request).__name__)
+            raise NotImplementedError(f"{self.provider.value} 暂不支持{label}")
+        path, build = submission
+        data = self._request("POST", self.base_url + path, build(self, request), submit=True)
+        return self._compiled.parse_submission(self.provider, data)
+
+    def _parse_status(self, task_id: str, data: Dict[str, Any]) -> VideoTaskStatus:
+        """将查询结果转换为任务状态"""
+        return self._compiled.parse_status(self.provider, task_id, data)
+
+    def _request(self, method: str, url: str, payload: Any = None, submit: bool = False) -> Dict[str, Any]:
+        """发起HTTP请求并解码JSON响应，空响应返回空字典"""
+        response = self._send(method, url, self._compiled.headers(self.api_key, submit), payload)
+        response.raise_for_status()
+        return codec.decode(response.content) if response.content else {}
@@ -0,0 +1,192 @@
+"""
+任务状态缓存
+
+看板、接口服务、流水线等多个调用方会独立查询同一批任务，
+状态按 (供应商, 任务ID) 缓存：终态永久有效，进行中的状态在短暂的 TTL 后过期。
+MemoryStatusCache 在进程内共享，SqliteStatusCache 在同一主机的多个进程间共享。
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, fields, is_dataclass
+from datetime import datetime
+from enum import Enum
+from typing import TYPE_CHECKING, Any, Dict, Optional, Tuple
+
+from video_generation import codec
+
+if TYPE_CHECKING:
+    from video_generation.base import VideoTaskStatus
+
+
+class StatusCache:
+    """状态缓存接口"""
+
+    def get(self, provider: str, task_id: str) -> Optional["VideoTaskStatus"]:
+        """获取未过期的缓存状态"""
+        raise NotImplementedError
+
+    def put(self, status: "VideoTaskStatus"):
+        """写入任务状态"""
+        raise NotImplementedError
+
+    def invalidate(self, provider: str, task_id: str):
+        """删除任务的缓存状态"""
+        raise NotImplementedError
+
+
+class MemoryStatusCache(StatusCache):
+    """进程内状态缓存"""
+
+    def __init__(self, ttl: float = 2.0, max_entries: int = 100000):
+        """
+        Args:
+            ttl: 进行中状态的有效期(秒)
+            max_entries: 最多缓存的任务数，超出后淘汰最久未访问的任务
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[VideoTaskStatus, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, provider: str, task_id: str) -> Optional["VideoTaskStatus"]:
+        key = (provider, task_id)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            status, stored_at = entry
+            if not status.status.is_terminal and time.monotonic() - stored_at >= self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return status
+
+    def put(self, status: "VideoTaskStatus"):
+        key = (status.provider.value, status.task_id)
+        with self._lock:
+            self._entries[key] = (status, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, provider: str, task_id: str):
+        with self._lock:
+            self._entries.pop((provider, task_id), None)
+
+
+def _encode_status(status: "VideoTaskStatus") -> bytes:
+    data: Dict[str, Any] = {}
+    for f in fields(status):
+        value = getattr(status, f.name)
+        if isinstance(value, Enum):
+            value = value.value
+        elif isinstance(value, datetime):
+            value = value.isoformat()
+        elif is_dataclass(value):
+            value = asdict(value)
+        data[f.name] = value
+    return codec.encode(data)
+
+
+def _decode_status(payload: bytes) -> "VideoTaskStatus":
+    from video_generation.base import TaskStatus, VideoMetadata, VideoProvider, VideoTaskStatus
+
+    data = codec.decode(payload)
+    data["provider"] = VideoProvider(data["provider"])
+    data["status"] = TaskStatus(data["status"])
+    data["create_time"] = datetime.fromisoformat(data["create_time"])
+    data["update_time"] = datetime.fromisoformat(data["update_time"])
+    if data.get("metadata"):
+        data["metadata"] = VideoMetadata(**data["metadata"])
+    known = {f.name for f in fields(VideoTaskStatus)}
+    return VideoTaskStatus(**{k: v for k, v in data.items() if k in known})
+
+
+class SqliteStatusCache(StatusCache):
+    """
+    基于 SQLite 的跨进程状态缓存
+
+    同一主机上的多个工作进程指向同一个数据库文件即可共享查询结果::
+
+        BaseVideoGenerator.status_cache = SqliteStatusCache("/var/run/video/status.db")
+    """
+
+    def __init__(self, path: str, ttl: float = 2.0, busy_timeout: float = 5.0):
+        """
+        Args:
+            path: 数据库文件路径
+            ttl: 进行中状态的有效期(秒)
+            busy_timeout: 等待其他进程释放写锁的时间(秒)
+        """
+        self.path = path
+        self.ttl = ttl
+        self.busy_timeout = busy_timeout
+        self._local = threading.local()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = self._connection()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS task_status ("
+            " provider TEXT NOT NULL,"
+            " task_id TEXT NOT NULL,"
+            " terminal INTEGER NOT NULL,"
+            " stored_at REAL NOT NULL,"
+            " payload BLOB NOT NULL,"
+            " PRIMARY KEY (provider, task_id))"
+        )
+
+    def _connection(self) -> sqlite3.Connection:
+        # sqlite3 连接不能跨线程使用，每个线程各自持有一个
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.busy_timeout, isolation_level=None)
+            self._local.conn = conn
+        return conn
+
+    def get(self, provider: str, task_id: str) -> Optional["VideoTaskStatus"]:
+        row = self._connection().execute(
+            "SELECT terminal, stored_at, payload FROM task_status WHERE provider = ? AND task_id = ?",
+            (provider, task_id),
+        ).fetchone()
+        if row is None:
+            return None
+        terminal, stored_at, payload = row
+        # 跨进程只能使用墙上时间
+        if not terminal and time.time() - stored_at >= self.ttl:
+            return None
+        return _decode_status(payload)
+
+    def put(self, status: "VideoTaskStatus"):
+        self._connection().execute(
+            "INSERT OR REPLACE INTO task_status (provider, task_id, terminal, stored_at, payload)"
+            " VALUES (?, ?, ?, ?, ?)",
+            (status.provider.value, status.task_id, int(status.status.is_terminal), time.time(),
+             _encode_status(status)),
+        )
+
+    def invalidate(self, provider: str, task_id: str):
+        self._connection().execute(
+            "DELETE FROM task_status WHERE provider = ? AND task_id = ?", (provider, task_id)
+        )
+
+    def prune(self, older_than: float) -> int:
+        """
+        删除早于指定时长的记录，包括终态记录
+
+        Args:
+            older_than: 保留时长(秒)
+
+        Returns:
+            int: 删除的记录数
+        """
+        cursor = self._connection().execute(
+            "DELETE FROM task_status WHERE stored_at < ?", (time.time() - older_than,)
+        )
+        return cursor.rowcount
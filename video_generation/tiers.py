@@ -0,0 +1,195 @@
+"""
+模型档位选择
+
+通义万相、SiliconFlow、Luma 同时提供加速档（turbo/flash）与标准档模型。
+调用方给出耗时或画质目标，由选择器按实时数据决定使用哪一档：
+- 预计耗时 = 等待运行额度的时间 + 该档模型近期的生成耗时（来自 EtaEstimator）
+- 满足耗时目标的档位中选画质最高的，都不满足时选最快的
+- 尺寸由请求宽高决定的供应商（通义万相）可以进一步降低分辨率
+
+排队积压时交互请求会自动转到加速档::
+
+    selector = TierSelector(max_latency=90)
+    task = selector.submit(generator, request)
+"""
+
+import copy
+import dataclasses
+import math
+import threading
+import weakref
+from dataclasses import dataclass
+from enum import IntEnum
+from typing import Dict, List, Optional, Tuple
+
+from video_generation.base import (
+    BaseVideoGenerator, ImageToVideoRequest, SubjectReferenceRequest, TextToVideoRequest,
+    VideoProvider, VideoRequest, VideoTaskResponse
+)
+from video_generation.deadline import Deadline
+from video_generation.eta import eta_key
+from video_generation.size_adapter import LumaModel, SiliconFlowModel, TongyiModel, VideoSizeAdapter
+
+
+class Tier(IntEnum):
+    """模型档位，数值越大画质越高"""
+    FAST = 0  # 加速档，例如: wanx2.1-t2v-turbo, ray-flash-2
+    FULL = 1  # 标准档，例如: wanx2.1-t2v-plus, ray-2
+
+
+_LUMA_TIERS = {Tier.FAST: LumaModel.RAY_2_FLASH.value, Tier.FULL: LumaModel.RAY_2.value}
+
+# 供应商 -> 请求类型 -> 档位 -> 模型
+MODEL_TIERS: Dict[VideoProvider, Dict[type, Dict[Tier, str]]] = {
+    VideoProvider.TONGYI: {
+        TextToVideoRequest: {Tier.FAST: TongyiModel.T2V_TURBO.value, Tier.FULL: TongyiModel.T2V_PLUS.value},
+        ImageToVideoRequest: {Tier.FAST: TongyiModel.I2V_TURBO.value, Tier.FULL: TongyiModel.I2V_PLUS.value},
+    },
+    VideoProvider.SILICONFLOW: {
+        TextToVideoRequest: {Tier.FAST: SiliconFlowModel.T2V_14B_TURBO.value,
+                             Tier.FULL: SiliconFlowModel.T2V_14B.value},
+        ImageToVideoRequest: {Tier.FAST: SiliconFlowModel.I2V_14B_720P_TURBO.value,
+                              Tier.FULL: SiliconFlowModel.I2V_14B_720P.value},
+    },
+    VideoProvider.LUMA: {
+        TextToVideoRequest: _LUMA_TIERS,
+        ImageToVideoRequest: _LUMA_TIERS,
+        SubjectReferenceRequest: _LUMA_TIERS,
+    },
+}
+
+# 输出尺寸由请求宽高决定的供应商，可以通过降低分辨率进一步缩短耗时
+RESIZABLE_PROVIDERS = frozenset({VideoProvider.TONGYI})
+
+
+@dataclass(frozen=True)
+class TierChoice:
+    """选择结果"""
+    tier: Tier  # 档位
+    model: str  # 模型名称
+    width: int  # 请求宽度（像素）
+    height: int  # 请求高度（像素）
+    predicted_latency: Optional[float] = None  # 预计耗时(秒)，缺少数据时为 None
+
+
+class TierSelector:
+    """按耗时或画质目标选择模型档位"""
+
+    def __init__(self, max_latency: Optional[float] = None, min_tier: Tier = Tier.FAST,
+                 allow_downscale: bool = False):
+        """
+        Args:
+            max_latency: 从提交到完成的耗时目标(秒)，为空时总是使用允许的最高档
+            min_tier: 画质下限，设为 Tier.FULL 时不会降档
+            allow_downscale: 加速档仍不满足目标时，是否降低分辨率（仅限尺寸由宽高决定的供应商）
+        """
+        self.max_latency = max_latency
+        self.min_tier = min_tier
+        self.allow_downscale = allow_downscale
+        self._variants: "weakref.WeakKeyDictionary[BaseVideoGenerator, Dict[str, BaseVideoGenerator]]" = (
+            weakref.WeakKeyDictionary())
+        self._lock = threading.Lock()
+
+    def choose(self, generator: BaseVideoGenerator, request: VideoRequest) -> Optional[TierChoice]:
+        """
+        为请求选择档位
+
+        Returns:
+            Optional[TierChoice]: 供应商或请求类型没有可选档位时返回 None
+        """
+        tiers = MODEL_TIERS.get(generator.provider, {}).get(type(request))
+        if not tiers:
+            return None
+        candidates = self._candidates(generator, request, tiers)
+        if self.max_latency is None:
+            return candidates[0]
+
+        scored = [dataclasses.replace(choice, predicted_latency=self._predict(generator, request, choice))
+                  for choice in candidates]
+        for choice in scored:
+            if choice.predicted_latency is not None and choice.predicted_latency <= self.max_latency:
+                return choice
+        if all(choice.predicted_latency is None for choice in scored):
+            # 没有耗时数据时，只在出现排队积压时降到最快的选项
+            return scored[-1] if self._backlogged(generator) else scored[0]
+        known = [choice for choice in scored if choice.predicted_latency is not None]
+        return min(known, key=lambda choice: choice.predicted_latency)
+
+    def submit(self, generator: BaseVideoGenerator, request: VideoRequest,
+               deadline: Optional[Deadline] = None) -> VideoTaskResponse:
+        """
+        按选择结果提交任务
+
+        使用与 generator 共享密钥池、连接与轮询器的同供应商生成器副本，原生成器的模型不会被修改；
+        任务状态可以通过原生成器查询。
+        """
+        choice = self.choose(generator, request)
+        if choice is None:
+            return generator.submit(request, deadline=deadline)
+        if (choice.width, choice.height) != (request.width, request.height):
+            request = dataclasses.replace(request, width=choice.width, height=choice.height)
+        return self.variant(generator, choice.model).submit(request, deadline=deadline)
+
+    def variant(self, generator: BaseVideoGenerator, model: str) -> BaseVideoGenerator:
+        """使用指定模型的生成器副本，按模型缓存"""
+        if generator.model == model:
+            return generator
+        with self._lock:
+            variants = self._variants.setdefault(generator, {})
+            clone = variants.get(model)
+            if clone is None:
+                clone = variants[model] = copy.copy(generator)
+                clone.model = model
+            return clone
+
+    def _candidates(self, generator: BaseVideoGenerator, request: VideoRequest,
+                    tiers: Dict[Tier, str]) -> List[TierChoice]:
+        """按画质从高到低排列的候选：先是各档位的原始尺寸，最后是加速档的较低分辨率"""
+        candidates = []
+        for tier in sorted(tiers, reverse=True):
+            if tier < self.min_tier:
+                continue
+            width, height = VideoSizeAdapter.adapt_size(request.width, request.height,
+                                                        generator.provider, tiers[tier])
+            candidates.append(TierChoice(tier, tiers[tier], width, height))
+        if self.allow_downscale and generator.provider in RESIZABLE_PROVIDERS and candidates:
+            fastest = candidates[-1]
+            for width, height in self._smaller_sizes(generator.provider, fastest):
+                candidates.append(dataclasses.replace(fastest, width=width, height=height))
+        return candidates
+
+    @staticmethod
+    def _smaller_sizes(provider: VideoProvider, choice: TierChoice) -> List[Tuple[int, int]]:
+        """模型支持的、宽高比相同且面积更小的尺寸，从大到小"""
+        ratio = choice.width / choice.height
+        sizes = {
+            (size.width, size.height)
+            for size in VideoSizeAdapter.get_supported_sizes(provider, choice.model).values()
+            if abs(size.width / size.height - ratio) < 0.05 and size.width * size.height < choice.width * choice.height
+        }
+        return sorted(sizes, key=lambda size: size[0] * size[1], reverse=True)
+
+    @staticmethod
+    def _backlogged(generator: BaseVideoGenerator) -> bool:
+        running, capacity, queued = generator.key_pool.backlog()
+        return queued > 0 or (capacity is not None and running >= capacity)
+
+    @staticmethod
+    def _predict(generator: BaseVideoGenerator, request: VideoRequest, choice: TierChoice) -> Optional[float]:
+        """等待运行额度的时间加上该档的生成耗时"""
+        estimator = generator.eta_estimator
+        if estimator is None:
+            return None
+        sized = dataclasses.replace(request, width=choice.width, height=choice.height)
+        run = estimator.expected_duration(eta_key(generator.provider.value, choice.model, sized), exact_model=True)
+        if run is None:
+            return None
+        running, capacity, queued = generator.key_pool.backlog()
+        wait = 0.0
+        if capacity:
+            ahead = running + queued + 1 - capacity
+            if ahead > 0:
+                # 每一轮释放 capacity 个额度，每轮按供应商整体的耗时估算
+                typical = estimator.expected_duration((generator.provider.value,)) or run
+                wait = math.ceil(ahead / capacity) * typical
+        return wait + run
@@ -0,0 +1,189 @@
+"""
+HTTP传输层
+
+生成器的所有HTTP调用经由 transport 发出，连接在同一个生成器的调用之间复用。
+安装 httpx[http2] 后可使用 HTTP2Transport，大量并发的状态查询共享少数几个多路复用连接。
+"""
+
+import socket
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional, Tuple, Union
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+Timeout = Union[float, Tuple[float, float], None]
+
+
+def _resolve(url: str) -> bool:
+    """预先解析DNS，解析失败说明该地址当前不可用"""
+    parts = urlsplit(url)
+    try:
+        socket.getaddrinfo(parts.hostname, parts.port or (443 if parts.scheme == "https" else 80))
+    except OSError:
+        return False
+    return True
+
+
+class RequestsTransport:
+    """基于 requests.Session 的连接池传输"""
+
+    def __init__(self, pool_maxsize: int = 32):
+        """
+        Args:
+            pool_maxsize: 每个主机保留的最大空闲连接数
+        """
+        self.pool_maxsize = pool_maxsize
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=8, pool_maxsize=pool_maxsize)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def request(self, method: str, url: str, headers: Optional[Dict[str, str]] = None,
+                timeout: Timeout = None, **kwargs: Any) -> requests.Response:
+        """发送请求"""
+        return self.session.request(method, url, headers=headers, timeout=timeout, **kwargs)
+
+    def warm(self, url: str, connections: int = 2, timeout: float = 5.0) -> int:
+        """
+        预热到指定地址的连接
+
+        先解析DNS，再并发发送轻量的 HEAD 请求完成TCP与TLS握手，
+        响应状态码无关紧要，建立的连接会留在连接池中供后续请求复用。
+
+        Args:
+            url: 目标地址
+            connections: 预先建立的连接数
+            timeout: 单个连接的超时(秒)
+
+        Returns:
+            int: 成功建立的连接数
+        """
+        if not _resolve(url):
+            return 0
+
+        def head(_):
+            try:
+                self.session.head(url, timeout=timeout, allow_redirects=False).close()
+                return True
+            except requests.RequestException:
+                return False
+
+        count = min(connections, self.pool_maxsize)
+        with ThreadPoolExecutor(max_workers=count) as executor:
+            return sum(executor.map(head, range(count)))
+
+    def close(self):
+        """关闭所有连接"""
+        self.session.close()
+
+
+class HTTP2Transport:
+    """
+    基于 httpx 的 HTTP/2 多路复用传输
+
+    每个主机只保留少量连接，并发请求作为独立的流在同一连接上复用；
+    接入点不支持 HTTP/2 时通过 ALPN 自动回退到 HTTP/1.1。
+    响应转换为 requests.Response，异常转换为对应的 requests 异常，
+    供应商代码无需区分传输实现。流式下载仍使用 RequestsTransport。
+
+    用法::
+
+        generator.transport = HTTP2Transport()
+    """
+
+    def __init__(self, max_connections: int = 4):
+        """
+        Args:
+            max_connections: 每个主机的最大连接数
+
+        Raises:
+            ImportError: 未安装 httpx[http2]
+        """
+        if httpx is None:
+            raise ImportError("HTTP/2 传输需要安装 httpx[http2]")
+        self.max_connections = max_connections
+        self.client = httpx.Client(http2=True,
+                                   limits=httpx.Limits(max_connections=max_connections,
+                                                       max_keepalive_connections=max_connections))
+        self.fallback = RequestsTransport(pool_maxsize=max_connections)
+
+    @staticmethod
+    def _timeout(timeout: Timeout) -> "httpx.Timeout":
+        if isinstance(timeout, tuple):
+            connect, read = timeout
+            return httpx.Timeout(read, connect=connect)
+        return httpx.Timeout(timeout)
+
+    @staticmethod
+    def _response(response: "httpx.Response") -> requests.Response:
+        result = requests.Response()
+        result.status_code = response.status_code
+        result.headers = CaseInsensitiveDict(response.headers.multi_items())
+        result._content = response.content
+        result.url = str(response.url)
+        result.reason = response.reason_phrase
+        result.encoding = response.encoding
+        result.elapsed = response.elapsed
+        return result
+
+    def request(self, method: str, url: str, headers: Optional[Dict[str, str]] = None,
+                timeout: Timeout = None, stream: bool = False, **kwargs: Any) -> requests.Response:
+        """发送请求"""
+        if stream:
+            return self.fallback.request(method, url, headers=headers, timeout=timeout, stream=True, **kwargs)
+
+        # requests 的 data 既可以是原始字节也可以是表单字段，httpx 分为 content 与 data
+        data = kwargs.pop("data", None)
+        if isinstance(data, (bytes, str)):
+            kwargs["content"] = data
+        elif data is not None:
+            kwargs["data"] = data
+
+        try:
+            response = self.client.request(method, url, headers=headers, timeout=self._timeout(timeout), **kwargs)
+        except httpx.ConnectTimeout as e:
+            raise requests.ConnectTimeout(str(e)) from e
+        except httpx.TimeoutException as e:
+            raise requests.ReadTimeout(str(e)) from e
+        except httpx.TransportError as e:
+            raise requests.ConnectionError(str(e)) from e
+        return self._response(response)
+
+    def warm(self, url: str, connections: int = 1, timeout: float = 5.0) -> int:
+        """
+        预热到指定地址的连接
+
+        HTTP/2 下一个连接即可承载所有并发请求，connections 不会超过 max_connections。
+
+        Returns:
+            int: 成功完成的预热请求数
+        """
+        if not _resolve(url):
+            return 0
+
+        def head(_):
+            try:
+                self.client.head(url, timeout=timeout)
+                return True
+            except httpx.HTTPError:
+                return False
+
+        count = min(connections, self.max_connections)
+        with ThreadPoolExecutor(max_workers=count) as executor:
+            return sum(executor.map(head, range(count)))
+
+    def close(self):
+        """关闭所有连接"""
+        self.client.close()
+        self.fallback.close()
+
+
+Transport = Union[RequestsTransport, HTTP2Transport]